@@ -6,11 +6,14 @@ from typing import Dict, List
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import principal_cache
 from app.core.security import TokenDecodeError, decode_token
 from app.db.models import Permission, Role, RolePermission, User, UserRole
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -23,14 +26,13 @@ class CurrentUser:
     permissions: List[str]
 
 
-def _load_permissions(db: Session, user_id: str) -> tuple[list[str], list[str]]:
-    rows = (
-        db.query(Role.name, Permission.name)
+async def _load_permissions(db: AsyncSession, user_id: str) -> tuple[list[str], list[str]]:
+    rows = await db.execute(
+        select(Role.name, Permission.name)
         .join(UserRole, UserRole.role_id == Role.id)
         .join(RolePermission, RolePermission.role_id == Role.id)
         .join(Permission, Permission.id == RolePermission.permission_id)
-        .filter(UserRole.user_id == user_id)
-        .all()
+        .where(UserRole.user_id == user_id)
     )
 
     role_names = set()
@@ -40,20 +42,25 @@ def _load_permissions(db: Session, user_id: str) -> tuple[list[str], list[str]]:
         permissions.add(perm_name)
 
     # Include roles even if no direct permission rows exist.
-    role_only_rows = db.query(Role.name).join(UserRole, UserRole.role_id == Role.id).filter(UserRole.user_id == user_id).all()
+    role_only_rows = await db.execute(
+        select(Role.name).join(UserRole, UserRole.role_id == Role.id).where(UserRole.user_id == user_id)
+    )
     for role_name, in role_only_rows:
         role_names.add(role_name)
 
     return sorted(role_names), sorted(permissions)
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
 ) -> CurrentUser:
     if credentials is None:
         raise HTTPException(status_code=401, detail={"code": "unauthorized", "message": "Missing authorization token"})
 
+    cached = principal_cache.get(credentials.credentials)
+    if cached is not None:
+        return cached
+
     try:
         payload = decode_token(credentials.credentials)
     except TokenDecodeError as exc:
@@ -66,16 +73,23 @@ def get_current_user(
     if not user_id:
         raise HTTPException(status_code=401, detail={"code": "unauthorized", "message": "Invalid token subject"})
 
-    user = db.query(User).filter(User.id == user_id, User.is_active.is_(True)).first()
-    if not user:
-        raise HTTPException(status_code=401, detail={"code": "unauthorized", "message": "User is not active"})
+    # A dependency-scoped session would hold its connection until the response is sent, so a route that
+    # opens its own session would need two at once and starve the pool under load. Release it right away.
+    async with AsyncSessionLocal() as db:
+        user = (
+            await db.execute(select(User.id, User.username).where(User.id == user_id, User.is_active.is_(True)))
+        ).first()
+        if not user:
+            raise HTTPException(status_code=401, detail={"code": "unauthorized", "message": "User is not active"})
 
-    roles, permissions = _load_permissions(db, user.id)
-    return CurrentUser(id=user.id, username=user.username, roles=roles, permissions=permissions)
+        roles, permissions = await _load_permissions(db, user.id)
+    current_user = CurrentUser(id=user.id, username=user.username, roles=roles, permissions=permissions)
+    principal_cache.put(credentials.credentials, user.id, current_user, payload["exp"])
+    return current_user
 
 
 def require_permission(permission_name: str):
-    def _dependency(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    async def _dependency(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if permission_name not in current_user.permissions and "admin" not in current_user.roles:
             raise HTTPException(
                 status_code=403,
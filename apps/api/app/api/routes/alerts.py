@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission
-from app.db.models import AlertEvent, AlertRule
-from app.db.session import get_db
+from app.db.models import AlertRule
+from app.db.reads import afetch_page, alert_events_page_query
+from app.db.session import get_async_read_db, get_db
 from app.schemas.api import AlertRuleCreateRequest
 from app.services.alerts import evaluate_alert_rules
 from app.services.audit import log_audit_event
-from app.utils.pagination import apply_pagination, pagination_params
-from app.utils.responses import pagination_payload, success_response
+from app.utils.pagination import pagination_params
+from app.utils.responses import fast_success_response, pagination_payload, success_response
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
@@ -58,32 +60,15 @@ def create_rule(
 
 
 @router.get("")
-def list_alerts(
+async def list_alerts(
     request: Request,
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: CurrentUser = Depends(require_permission("alerts.read")),
 ):
     page, page_size = page_data
-    query = db.query(AlertEvent).order_by(AlertEvent.created_at.desc())
-    total = query.count()
-    rows = apply_pagination(query, page, page_size).all()
-
-    data = [
-        {
-            "id": row.id,
-            "rule_id": row.rule_id,
-            "metric": row.metric,
-            "value": row.value,
-            "severity": row.severity,
-            "message": row.message,
-            "status": row.status,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-        }
-        for row in rows
-    ]
-
-    return success_response(request, data, pagination_payload(page, page_size, total))
+    rows, total = await afetch_page(db, alert_events_page_query(page=page, page_size=page_size))
+    return fast_success_response(request, rows, pagination_payload(page, page_size, total))
 
 
 @router.post("/evaluate")
@@ -6,17 +6,17 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.api.deps import serialize_user
+from app.core.auth_cache import revocations
 from app.core.config import get_settings
+from app.core.password_hashing import PasswordHasherBusy, hash_password, verify_password_for_login
 from app.core.security import (
     PasswordPolicyError,
     TokenDecodeError,
     create_access_token,
     create_refresh_token,
     decode_token,
-    get_password_hash,
     hash_token,
     validate_password_policy,
-    verify_password,
 )
 from app.db.models import RefreshToken, Role, User, UserRole
 from app.db.session import get_db
@@ -41,7 +41,13 @@ def _user_roles(db: Session, user_id: str) -> list[str]:
 @router.post("/login")
 def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == payload.username).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail={"code": "invalid_credentials", "message": "Invalid username or password"})
+    try:
+        verified, new_hash = verify_password_for_login(payload.password, user.hashed_password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail={"code": "auth_busy", "message": str(exc)}) from exc
+    if not verified:
         raise HTTPException(status_code=401, detail={"code": "invalid_credentials", "message": "Invalid username or password"})
 
     if not user.is_active:
@@ -51,6 +57,9 @@ def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)
     access_token = create_access_token(user_id=user.id, role_names=roles)
     refresh_token = create_refresh_token(user_id=user.id)
 
+    if new_hash:
+        user.hashed_password = new_hash
+
     settings = get_settings()
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes)
     db.add(
@@ -94,6 +103,9 @@ def refresh(payload: RefreshRequest, request: Request, db: Session = Depends(get
         raise HTTPException(status_code=401, detail={"code": "invalid_token", "message": "Invalid refresh token"})
 
     token_hash = hash_token(payload.refresh_token)
+    if revocations.is_revoked(token_hash):
+        raise HTTPException(status_code=401, detail={"code": "invalid_token", "message": "Refresh token expired or revoked"})
+
     record = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
     if not record or record.is_revoked or record.expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail={"code": "invalid_token", "message": "Refresh token expired or revoked"})
@@ -114,6 +126,7 @@ def logout(payload: LogoutRequest, request: Request, db: Session = Depends(get_d
     if record:
         record.is_revoked = True
         db.commit()
+        revocations.revoke_refresh(token_hash, record.expires_at)
     return success_response(request, {"logged_out": True})
 
 
@@ -144,7 +157,10 @@ def reset_password(payload: ResetPasswordRequest, request: Request, db: Session
     except PasswordPolicyError as exc:
         raise HTTPException(status_code=422, detail={"code": "weak_password", "message": str(exc)}) from exc
 
-    user.hashed_password = get_password_hash(payload.new_password)
+    try:
+        user.hashed_password = hash_password(payload.new_password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail={"code": "auth_busy", "message": str(exc)}) from exc
     db.commit()
 
     log_audit_event(
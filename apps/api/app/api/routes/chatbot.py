@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import CurrentUser, get_current_user
 from app.schemas.api import ChatMessageRequest
-from app.services.openrouter_chat import generate_chat_response
-from app.utils.responses import success_response
+from app.services.openrouter_chat import generate_chat_response, stream_chat_response
+from app.utils.responses import sse_event, success_response
 
 router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
@@ -22,3 +25,25 @@ async def chat_message(
     )
     return success_response(request, data)
 
+
+@router.post("/message/stream")
+async def chat_message_stream(
+    payload: ChatMessageRequest,
+    request: Request,
+    _: CurrentUser = Depends(get_current_user),
+):
+    request_id = getattr(request.state, "request_id", "unknown")
+    events = stream_chat_response(
+        message=payload.message,
+        history=[{"role": item.role, "content": item.content} for item in payload.history],
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        async for event, data in events:
+            yield sse_event(event, {"request_id": request_id, **data})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Request-Id": request_id},
+    )
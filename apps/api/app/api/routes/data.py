@@ -2,20 +2,26 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from io import BytesIO
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import pandas as pd
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission
+from app.core.metrics import POINTS_INGESTED
 from app.db.models import Dataset, DatasetVersion, TimeseriesPoint
-from app.db.session import SessionLocal, get_db
+from app.db.reads import afetch_page, timeseries_page_query
+from app.db.session import SessionLocal, get_async_read_db, get_db, get_read_db
 from app.schemas.api import DatasetCreate, TimeseriesBulkRequest
 from app.services.audit import log_audit_event
 from app.services.data_quality import quality_report_from_dataframe
 from app.utils.pagination import apply_pagination, pagination_params
-from app.utils.responses import pagination_payload, success_response
+from app.utils.responses import fast_success_response, pagination_payload, success_response
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 router = APIRouter(tags=["data-management"])
 
@@ -38,7 +44,7 @@ def list_datasets(
     request: Request,
     category: Optional[str] = Query(default=None),
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("data.read")),
 ):
     page, page_size = page_data
@@ -87,6 +93,9 @@ def create_dataset(
 
 
 def _parse_uploaded_file(file: UploadFile) -> pd.DataFrame:
+    # pandas costs several hundred ms to import, so it is only loaded once an upload actually arrives.
+    import pandas as pd
+
     if file.filename is None:
         raise HTTPException(status_code=400, detail={"code": "bad_request", "message": "Filename is required"})
 
@@ -155,46 +164,25 @@ def upload_dataset(
 
 
 @router.get("/timeseries")
-def list_timeseries(
+async def list_timeseries(
     request: Request,
     entity: Optional[str] = Query(default=None, description="entity_type filter"),
     metric: Optional[str] = Query(default=None),
     from_ts: Optional[datetime] = Query(default=None, alias="from"),
     to_ts: Optional[datetime] = Query(default=None, alias="to"),
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: CurrentUser = Depends(require_permission("data.read")),
 ):
     page, page_size = page_data
 
-    query = db.query(TimeseriesPoint)
-    if entity:
-        query = query.filter(TimeseriesPoint.entity_type == entity)
-    if metric:
-        query = query.filter(TimeseriesPoint.metric == metric)
-    if from_ts:
-        query = query.filter(TimeseriesPoint.ts >= from_ts)
-    if to_ts:
-        query = query.filter(TimeseriesPoint.ts <= to_ts)
-
-    query = query.order_by(TimeseriesPoint.ts.desc())
-    total = query.count()
-    rows = apply_pagination(query, page, page_size).all()
-
-    data = [
-        {
-            "id": row.id,
-            "entity_type": row.entity_type,
-            "entity_id": row.entity_id,
-            "metric": row.metric,
-            "ts": row.ts.isoformat(),
-            "value": row.value,
-            "quality_flag": row.quality_flag,
-            "source": row.source,
-        }
-        for row in rows
-    ]
-    return success_response(request, data, pagination_payload(page, page_size, total))
+    rows, total = await afetch_page(
+        db,
+        timeseries_page_query(
+            entity=entity, metric=metric, from_ts=from_ts, to_ts=to_ts, page=page, page_size=page_size
+        ),
+    )
+    return fast_success_response(request, rows, pagination_payload(page, page_size, total))
 
 
 @router.post("/timeseries/bulk")
@@ -236,6 +224,7 @@ def bulk_upsert_timeseries(
         inserted += 1
 
     db.commit()
+    POINTS_INGESTED.labels("timeseries_points", "bulk_api").inc(inserted)
 
     log_audit_event(
         db,
@@ -306,3 +295,92 @@ def trigger_scheduled_import(
     # DEMO: run background task immediately.
     bg.add_task(_scheduled_import_job, dataset_id, current_user.id)
     return success_response(request, {"scheduled": True, "dataset_id": dataset_id})
+
+
+def _columnar_dataset(dataset: str) -> str:
+    # Same reasoning as pandas above: pyarrow is imported on the first columnar request, not at startup.
+    from app.services.columnar import DATASETS as COLUMNAR_DATASETS
+
+    if dataset not in COLUMNAR_DATASETS:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "not_found",
+                "message": f"Unknown dataset '{dataset}'",
+                "details": {"available": sorted(COLUMNAR_DATASETS)},
+            },
+        )
+    return dataset
+
+
+@router.get("/exports/{dataset}")
+def export_columnar(
+    dataset: str,
+    request: Request,
+    format: str = Query(default="arrow", pattern="^(arrow|parquet)$"),
+    entity: Optional[str] = Query(default=None, description="entity_type filter"),
+    metric: Optional[str] = Query(default=None),
+    sector: Optional[str] = Query(default=None),
+    scenario: Optional[str] = Query(default=None),
+    run_id: Optional[str] = Query(default=None),
+    from_ts: Optional[datetime] = Query(default=None, alias="from"),
+    to_ts: Optional[datetime] = Query(default=None, alias="to"),
+    _: CurrentUser = Depends(require_permission("data.read")),
+):
+    from app.services.columnar import FILE_EXTENSIONS, MEDIA_TYPES, stream_export
+
+    dataset = _columnar_dataset(dataset)
+    filters = {"entity": entity, "metric": metric, "sector": sector, "scenario": scenario, "run_id": run_id}
+    return StreamingResponse(
+        stream_export(dataset, format, filters=filters, from_ts=from_ts, to_ts=to_ts),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename={dataset}.{FILE_EXTENSIONS[format]}",
+            "X-Request-Id": getattr(request.state, "request_id", "unknown"),
+        },
+    )
+
+
+def _columnar_format(file: UploadFile, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    lower_name = (file.filename or "").lower()
+    if lower_name.endswith(".parquet"):
+        return "parquet"
+    if lower_name.endswith((".arrow", ".arrows", ".ipc", ".feather")):
+        return "arrow"
+    raise HTTPException(
+        status_code=400,
+        detail={"code": "unsupported_file", "message": "Only Arrow IPC or Parquet files are supported"},
+    )
+
+
+@router.post("/imports/{dataset}")
+def import_columnar_file(
+    dataset: str,
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(default=None, pattern="^(arrow|parquet)$"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(require_permission("data.import")),
+):
+    from app.services.columnar import ColumnarFormatError, import_columnar
+
+    dataset = _columnar_dataset(dataset)
+    fmt = _columnar_format(file, format)
+
+    try:
+        result = import_columnar(db, dataset, file.file.read(), fmt)
+    except ColumnarFormatError as exc:
+        db.rollback()
+        raise HTTPException(status_code=422, detail={"code": "invalid_columnar_file", "message": str(exc)}) from exc
+
+    log_audit_event(
+        db,
+        actor_user_id=current_user.id,
+        action="columnar.import",
+        entity=dataset,
+        details={"file_name": file.filename, "format": fmt, **result},
+    )
+
+    return success_response(request, {"dataset": dataset, "format": fmt, **result})
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission
 from app.db.models import ForecastPoint, ForecastRun
-from app.db.session import get_db
+from app.db.reads import afetch_page, forecast_runs_page_query
+from app.db.session import get_async_read_db, get_db, get_read_db
 from app.schemas.api import ForecastRunRequest, ForecastTrainRequest
 from app.services.audit import log_audit_event
 from app.services.forecasting import run_forecast, train_forecast_model
-from app.utils.pagination import apply_pagination, pagination_params
-from app.utils.responses import pagination_payload, success_response
+from app.utils.pagination import pagination_params
+from app.utils.responses import fast_success_response, pagination_payload, rows_to_dicts, success_response
 
 router = APIRouter(prefix="/forecast", tags=["forecasting"])
 
+FORECAST_POINT_FIELDS = ("id", "metric", "ts", "predicted_value", "lower_bound", "upper_bound")
+
 
 def _entity_name(entity: str) -> str:
     if entity == "state":
@@ -99,30 +103,34 @@ def run(
 
 
 @router.get("/runs")
-def list_runs(
+async def list_runs(
     request: Request,
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: CurrentUser = Depends(require_permission("forecast.read")),
 ):
     page, page_size = page_data
-    query = db.query(ForecastRun).order_by(ForecastRun.created_at.desc())
-    total = query.count()
-    rows = apply_pagination(query, page, page_size).all()
-    data = [_run_payload(r) for r in rows]
-    return success_response(request, data, pagination_payload(page, page_size, total))
+    rows, total = await afetch_page(db, forecast_runs_page_query(page=page, page_size=page_size))
+    return fast_success_response(request, rows, pagination_payload(page, page_size, total))
 
 
 @router.get("/runs/{run_id}")
 def get_run(
     run_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("forecast.read")),
 ):
     run = db.query(ForecastRun).filter(ForecastRun.id == run_id).first()
     if not run:
         raise HTTPException(status_code=404, detail={"code": "not_found", "message": "Forecast run not found"})
 
-    run.points = db.query(ForecastPoint).filter(ForecastPoint.run_id == run.id).order_by(ForecastPoint.ts.asc()).all()
-    return success_response(request, _run_payload(run, include_points=True))
+    points = (
+        db.query(*[getattr(ForecastPoint, name) for name in FORECAST_POINT_FIELDS])
+        .filter(ForecastPoint.run_id == run.id)
+        .order_by(ForecastPoint.ts.asc())
+        .all()
+    )
+    payload = _run_payload(run)
+    payload["points"] = rows_to_dicts(FORECAST_POINT_FIELDS, points)
+    return fast_success_response(request, payload)
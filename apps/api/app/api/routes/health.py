@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.metrics import render_metrics
+from app.db.session import get_async_db
 from app.utils.responses import success_response
 from fastapi import Depends
 
@@ -24,11 +25,22 @@ def root(request: Request):
 
 
 @router.get("/health")
-def health(request: Request):
+async def health(request: Request):
     return success_response(request, {"status": "ok"})
 
 
 @router.get("/ready")
-def ready(request: Request, db: Session = Depends(get_db)):
-    db.execute(text("SELECT 1"))
+async def ready(request: Request, db: AsyncSession = Depends(get_async_db)):
+    if getattr(request.app.state, "seed_error", False):
+        raise HTTPException(status_code=503, detail={"code": "seed_failed", "message": "Startup seeding failed"})
+    seeding = getattr(request.app.state, "seeding", None)
+    if seeding is not None and not seeding.is_set():
+        raise HTTPException(status_code=503, detail={"code": "not_ready", "message": "Startup seeding in progress"})
+    await db.execute(text("SELECT 1"))
     return success_response(request, {"status": "ready"})
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
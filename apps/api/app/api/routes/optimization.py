@@ -1,22 +1,22 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission
 from app.db.models import OptimizationRun
-from app.db.session import get_db
+from app.db.reads import afetch_page, fetch_release_plan, optimization_runs_page_query
+from app.db.session import get_async_read_db, get_db, get_read_db
 from app.schemas.api import OptimizationRunRequest
 from app.services.audit import log_audit_event
-from app.services.optimization import (
-    export_release_plan_csv,
-    export_release_plan_pdf,
-    release_plan_rows,
-    run_optimization,
-)
-from app.utils.pagination import apply_pagination, pagination_params
-from app.utils.responses import pagination_payload, success_response
+from app.services.explanations import precompute_explanation
+from app.services.network import NetworkTopologyError
+from app.services.optimization import export_release_plan_csv, release_plan_rows, reservoir_names, run_optimization
+from app.services.reports import ReportRenderTimeout, build_release_plan_report, cached_report_path
+from app.utils.pagination import pagination_params
+from app.utils.responses import fast_success_response, pagination_payload, success_response
 
 router = APIRouter(tags=["optimization"])
 
@@ -38,18 +38,24 @@ def _run_payload(run: OptimizationRun) -> dict:
 def create_run(
     payload: OptimizationRunRequest,
     request: Request,
+    bg: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(require_permission("optimization.run")),
 ):
-    run = run_optimization(
-        db,
-        name=payload.name,
-        horizon_days=payload.horizon_days,
-        scenario=payload.scenario,
-        weights=payload.weights,
-        constraints=payload.constraints,
-        created_by=current_user.id,
-    )
+    try:
+        run = run_optimization(
+            db,
+            name=payload.name,
+            horizon_days=payload.horizon_days,
+            scenario=payload.scenario,
+            weights=payload.weights,
+            constraints=payload.constraints,
+            created_by=current_user.id,
+            mode=payload.mode,
+        )
+    except NetworkTopologyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=422, detail={"code": "invalid_network", "message": str(exc)}) from exc
 
     log_audit_event(
         db,
@@ -59,34 +65,34 @@ def create_run(
         entity_id=run.id,
         details={
             "scenario": payload.scenario,
+            "mode": payload.mode,
             "horizon_days": payload.horizon_days,
             "weights": payload.weights,
             "constraints": payload.constraints,
         },
     )
+    # Explanations are immutable per run and context; build the default one now so /llm/explain reads it.
+    bg.add_task(precompute_explanation, run.id)
     return success_response(request, _run_payload(run))
 
 
 @router.get("/optimization/runs")
-def list_runs(
+async def list_runs(
     request: Request,
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: CurrentUser = Depends(require_permission("optimization.read")),
 ):
     page, page_size = page_data
-    query = db.query(OptimizationRun).order_by(OptimizationRun.created_at.desc())
-    total = query.count()
-    rows = apply_pagination(query, page, page_size).all()
-    data = [_run_payload(r) for r in rows]
-    return success_response(request, data, pagination_payload(page, page_size, total))
+    rows, total = await afetch_page(db, optimization_runs_page_query(page=page, page_size=page_size))
+    return fast_success_response(request, rows, pagination_payload(page, page_size, total))
 
 
 @router.get("/optimization/runs/{run_id}")
 def get_run(
     run_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("optimization.read")),
 ):
     run = db.query(OptimizationRun).filter(OptimizationRun.id == run_id).first()
@@ -99,27 +105,14 @@ def get_run(
 def get_release_plan(
     run_id: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("optimization.read")),
 ):
     run = db.query(OptimizationRun).filter(OptimizationRun.id == run_id).first()
     if not run:
         raise HTTPException(status_code=404, detail={"code": "not_found", "message": "Optimization run not found"})
 
-    rows = release_plan_rows(db, run_id)
-    data = [
-        {
-            "id": row.id,
-            "ts": row.ts.isoformat(),
-            "release_value": row.release_value,
-            "sector_allocations": row.sector_allocations,
-            "storage_projection": row.storage_projection,
-            "risk_index": row.risk_index,
-        }
-        for row in rows
-    ]
-
-    return success_response(request, {"run": _run_payload(run), "rows": data})
+    return fast_success_response(request, {"run": _run_payload(run), "rows": fetch_release_plan(db, run_id)})
 
 
 @router.get("/release-plans/{run_id}/export")
@@ -127,32 +120,38 @@ def export_release_plan(
     run_id: str,
     request: Request,
     format: str = Query(default="csv", pattern="^(csv|pdf)$"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("report.export")),
 ):
     run = db.query(OptimizationRun).filter(OptimizationRun.id == run_id).first()
     if not run:
         raise HTTPException(status_code=404, detail={"code": "not_found", "message": "Optimization run not found"})
 
-    rows = release_plan_rows(db, run_id)
-
-    if format == "csv":
-        content = export_release_plan_csv(rows)
-        return Response(
-            content=content,
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=release-plan-{run_id}.csv",
-                "X-Request-Id": getattr(request.state, "request_id", "unknown"),
-            },
+    request_id = getattr(request.state, "request_id", "unknown")
+
+    if format == "pdf":
+        path = cached_report_path(run_id)
+        if path is None:
+            try:
+                rows = fetch_release_plan(db, run_id)
+                reservoirs = reservoir_names(db, (row["reservoir_id"] for row in rows))
+                path = build_release_plan_report(_run_payload(run), rows, reservoirs)
+            except ReportRenderTimeout as exc:
+                raise HTTPException(status_code=504, detail={"code": "report_timeout", "message": str(exc)}) from exc
+        return FileResponse(
+            path,
+            media_type="application/pdf",
+            filename=f"release-plan-{run_id}.pdf",
+            headers={"X-Request-Id": request_id},
         )
 
-    pdf_bytes = export_release_plan_pdf(run, rows)
+    rows = release_plan_rows(db, run_id)
+    content = export_release_plan_csv(rows, reservoir_names(db, (row.reservoir_id for row in rows)))
     return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
+        content=content,
+        media_type="text/csv",
         headers={
-            "Content-Disposition": f"attachment; filename=release-plan-{run_id}.pdf",
-            "X-Request-Id": getattr(request.state, "request_id", "unknown"),
+            "Content-Disposition": f"attachment; filename=release-plan-{run_id}.csv",
+            "X-Request-Id": request_id,
         },
     )
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission
 from app.db.models import Scenario, ScenarioResult
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.api import ScenarioCreateRequest
 from app.services.audit import log_audit_event
 from app.services.scenario import simulate_scenario
@@ -55,7 +55,7 @@ def create_scenario(
 def list_scenarios(
     request: Request,
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("scenario.read")),
 ):
     page, page_size = page_data
@@ -114,7 +114,7 @@ def list_results(
     scenario_id: str,
     request: Request,
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _: CurrentUser = Depends(require_permission("scenario.read")),
 ):
     if not db.query(Scenario).filter(Scenario.id == scenario_id).first():
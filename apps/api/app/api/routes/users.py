@@ -3,17 +3,20 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import CurrentUser, require_permission, serialize_user
-from app.core.security import PasswordPolicyError, get_password_hash, validate_password_policy
-from app.db.models import AuditEvent, Permission, Role, RolePermission, User, UserRole
-from app.db.session import get_db
+from app.core.auth_cache import revocations
+from app.core.password_hashing import PasswordHasherBusy, hash_password
+from app.core.security import PasswordPolicyError, validate_password_policy
+from app.db.models import Permission, Role, RolePermission, User, UserRole
+from app.db.reads import afetch_page, audit_events_page_query
+from app.db.session import get_async_read_db, get_db
 from app.schemas.api import RoleCreate, UserCreate, UserUpdate
 from app.services.audit import log_audit_event
 from app.utils.pagination import apply_pagination, pagination_params
-from app.utils.responses import pagination_payload, success_response
+from app.utils.responses import fast_success_response, pagination_payload, success_response
 
 router = APIRouter(tags=["users-rbac"])
 
@@ -51,11 +54,16 @@ def create_user(
     except PasswordPolicyError as exc:
         raise HTTPException(status_code=422, detail={"code": "weak_password", "message": str(exc)}) from exc
 
+    try:
+        hashed_password = hash_password(payload.password)
+    except PasswordHasherBusy as exc:
+        raise HTTPException(status_code=503, detail={"code": "auth_busy", "message": str(exc)}) from exc
+
     user = User(
         username=payload.username,
         full_name=payload.full_name,
         email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=hashed_password,
         is_active=True,
     )
     db.add(user)
@@ -124,6 +132,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    revocations.invalidate_user(user.id)
 
     log_audit_event(
         db,
@@ -151,6 +160,7 @@ def delete_user(
     username = user.username
     db.delete(user)
     db.commit()
+    revocations.invalidate_user(user_id)
 
     log_audit_event(
         db,
@@ -252,37 +262,16 @@ def list_permissions(
 
 
 @router.get("/audit-logs")
-def list_audit_logs(
+async def list_audit_logs(
     request: Request,
     filter: Optional[str] = Query(default=None),
     page_data=Depends(pagination_params),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     _: CurrentUser = Depends(require_permission("audit.read")),
 ):
     page, page_size = page_data
 
-    query = db.query(AuditEvent)
-    if filter:
-        query = query.filter(
-            (AuditEvent.action.ilike(f"%{filter}%"))
-            | (AuditEvent.entity.ilike(f"%{filter}%"))
-        )
-
-    query = query.order_by(desc(AuditEvent.created_at))
-    total = query.count()
-    rows = apply_pagination(query, page, page_size).all()
-
-    data = [
-        {
-            "id": row.id,
-            "actor_user_id": row.actor_user_id,
-            "action": row.action,
-            "entity": row.entity,
-            "entity_id": row.entity_id,
-            "details": row.details,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-        }
-        for row in rows
-    ]
-
-    return success_response(request, data, pagination_payload(page, page_size, total))
+    rows, total = await afetch_page(
+        db, audit_events_page_query(text_filter=filter, page=page, page_size=page_size)
+    )
+    return fast_success_response(request, rows, pagination_payload(page, page_size, total))
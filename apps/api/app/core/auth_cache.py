@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("golestan.auth")
+
+REVOCATION_CHANNEL = "golestan:auth:revocations"
+REDIS_RETRY_SECONDS = 5.0
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return value
+
+    def put(self, token: str, user_id: str, value: Any, token_expires_at: float) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        expires_at = min(token_expires_at, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._entries[token] = (expires_at, user_id, value)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for token in [token for token, (_, owner, _) in self._entries.items() if owner == user_id]:
+                del self._entries[token]
+
+    def compact(self) -> None:
+        now = time.time()
+        with self._lock:
+            for token in [token for token, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RevocationSet:
+    # Revoked refresh-token hashes kept in memory until the token would have expired anyway. With the redis
+    # backend every revocation is also published, and each worker applies what the others publish, so a
+    # logout or a user change reaches all workers without a per-request lookup. The database stays the
+    # source of truth; this only lets a revoked token be rejected before touching it.
+    def __init__(self, principals: PrincipalCache, redis_url: Optional[str] = None):
+        self.principals = principals
+        self.redis_url = redis_url
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._redis_retry_at = 0.0
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def is_revoked(self, token_hash: str) -> bool:
+        with self._lock:
+            expires_at = self._revoked.get(token_hash)
+        return expires_at is not None and expires_at > time.time()
+
+    def revoke_refresh(self, token_hash: str, expires_at: datetime) -> None:
+        self._apply(f"refresh:{token_hash}:{expires_at.timestamp()}")
+        self._publish(f"refresh:{token_hash}:{expires_at.timestamp()}")
+
+    def invalidate_user(self, user_id: str) -> None:
+        self._apply(f"user:{user_id}")
+        self._publish(f"user:{user_id}")
+
+    def compact(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [token_hash for token_hash, expires_at in self._revoked.items() if expires_at <= now]
+            for token_hash in expired:
+                del self._revoked[token_hash]
+        self.principals.compact()
+        return len(expired)
+
+    def _apply(self, message: str) -> None:
+        kind, _, rest = message.partition(":")
+        if kind == "refresh":
+            token_hash, _, expires_at = rest.partition(":")
+            with self._lock:
+                self._revoked[token_hash] = float(expires_at)
+        elif kind == "user":
+            self.principals.invalidate_user(rest)
+
+    def _redis(self):
+        if not self.redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        return self._client
+
+    def _publish(self, message: str) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.publish(REVOCATION_CHANNEL, message)
+        except Exception:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.warning("Could not publish token revocation; other workers fall back to the database", exc_info=True)
+
+    def start(self) -> None:
+        if not self.redis_url or self._listener is not None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="auth-revocations", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2.0)
+            self._listener = None
+
+    def _listen(self) -> None:
+        import redis
+
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = redis.Redis.from_url(self.redis_url, socket_connect_timeout=1.0).pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(REVOCATION_CHANNEL)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._apply(message["data"].decode("utf-8"))
+            except Exception:
+                logger.warning("Token revocation listener disconnected; retrying", exc_info=True)
+                self._stop.wait(REDIS_RETRY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+
+settings = get_settings()
+principal_cache = PrincipalCache(settings.auth_principal_cache_max_entries, settings.auth_principal_cache_seconds)
+revocations = RevocationSet(principal_cache, settings.redis_url if settings.auth_revocation_backend == "redis" else None)
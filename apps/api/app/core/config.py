@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,21 +11,95 @@ class Settings(BaseSettings):
     debug: bool = True
 
     database_url: str = "postgresql+psycopg2://postgres:postgres@db:5432/golestan"
+    database_read_url: str = ""
     redis_url: str = "redis://redis:6379/0"
 
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 10.0
+    db_pool_recycle_seconds: int = 1800
+    # always: SELECT 1 on every checkout; idle: only after db_pre_ping_idle_seconds unused; never.
+    db_pool_pre_ping: Literal["always", "idle", "never"] = "idle"
+    db_pre_ping_idle_seconds: float = 30.0
+    db_statement_timeout_ms: int = 0
+
+    sql_profile_enabled: bool = False
+    sql_profile_n_plus_one_threshold: int = 5
+
     secret_key: str = "change-me-in-production"
     access_token_expire_minutes: int = 60
     refresh_token_expire_minutes: int = 60 * 24 * 7
+    # Resolved user/roles/permissions per access token; user changes reach other workers within this window
+    # unless AUTH_REVOCATION_BACKEND=redis, which pushes them (and refresh-token revocations) immediately.
+    auth_principal_cache_seconds: int = 30
+    auth_principal_cache_max_entries: int = 10_000
+    auth_revocation_backend: Literal["memory", "redis"] = "memory"
+    refresh_token_purge_interval_minutes: int = 60
+
+    # argon2id cost; changing it rehashes each user's password on their next successful login.
+    argon2_time_cost: int = 2
+    argon2_memory_cost_kib: int = 19456
+    argon2_parallelism: int = 1
+    # Hashing runs in this many worker processes (0 = inline). Beyond max_pending queued calls, auth returns 503.
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+    password_hash_timeout_seconds: float = 10.0
 
     cors_origins: List[str] = Field(default_factory=lambda: ["*"])
 
     rate_limit_per_minute: int = 120
     demo_auto_seed: bool = True
+    seed_years: int = 5
+    # Serve /health immediately and seed in a background thread; /ready returns 503 until it finishes.
+    seed_in_background: bool = False
 
     openrouter_api_key: str = ""
     openrouter_model: str = "openai/gpt-4o-mini"
     openrouter_site_url: str = "http://localhost:3000"
     openrouter_app_name: str = "Golestan Water DSS Demo"
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    openrouter_timeout_seconds: float = 30.0
+    openrouter_http2: bool = True
+    openrouter_max_connections: int = 20
+    openrouter_max_keepalive_connections: int = 10
+    openrouter_keepalive_expiry_seconds: float = 60.0
+    # Retries cover connection errors, 429 and 5xx (honouring Retry-After), with jittered exponential backoff.
+    openrouter_max_retries: int = 2
+    openrouter_retry_backoff_seconds: float = 0.5
+
+    # Model behind /chatbot and /llm/explain. gateway: the OpenRouter-compatible API above. local: an
+    # OpenAI-compatible server on the host (llama.cpp llama-server, vLLM, Ollama) for air-gapped sites.
+    llm_backend: Literal["gateway", "local"] = "gateway"
+    local_llm_base_url: str = "http://127.0.0.1:8080/v1"
+    local_llm_model: str = "local"
+    local_llm_timeout_seconds: float = 120.0
+    # Requests arriving within the window are sent together, batch_size at a time (match llama-server
+    # --parallel); beyond queue_max waiting requests, or after request_timeout, callers get a busy answer.
+    local_llm_batch_window_ms: float = 25.0
+    local_llm_batch_size: int = 4
+    local_llm_queue_max: int = 32
+    local_llm_request_timeout_seconds: float = 60.0
+
+    # Successful LLM answers are reused while the data watermark (newest point, run, dataset version or alert)
+    # is unchanged. A threshold above 0 also serves context-free questions whose trigram similarity reaches it.
+    chat_cache_enabled: bool = True
+    chat_cache_backend: Literal["memory", "redis"] = "memory"
+    chat_cache_ttl_seconds: int = 600
+    chat_cache_max_entries: int = 2000
+    chat_cache_similarity_threshold: float = 0.0
+    chat_cache_watermark_seconds: float = 5.0
+    # Live reservoir state, latest forecasts, the latest optimization summary and open alerts are summarized
+    # once per data watermark and added to LLM prompts, most relevant sections first, within this token budget.
+    chat_context_enabled: bool = True
+    chat_context_max_tokens: int = 600
+    chat_context_max_alerts: int = 5
+
+    report_cache_dir: str = "/tmp/golestan-reports"
+    report_workers: int = 2
+    report_render_timeout_seconds: float = 20.0
+
+    # Network optimization solves independent reservoir cascades in this many worker processes (0 = inline).
+    optimization_workers: int = 2
 
     model_config = SettingsConfigDict(
         env_file=(".env", ".env.local", "/app/.env", "/app/.env.docker"),
@@ -11,7 +11,7 @@ class JsonFormatter(logging.Formatter):
             "logger": record.name,
             "message": record.getMessage(),
         }
-        for key in ("request_id", "path", "method", "status_code"):
+        for key in ("request_id", "path", "method", "status_code", "query_profile"):
             value = getattr(record, key, None)
             if value is not None:
                 payload[key] = value
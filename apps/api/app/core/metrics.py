@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233)
+ROW_COUNT_BUCKETS = (0, 1, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000)
+SERIALIZATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "End-to-end request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_DB_ROWS = Histogram(
+    "http_request_db_rows_loaded",
+    "ORM objects and read-layer rows loaded per request",
+    ["method", "route"],
+    buckets=ROW_COUNT_BUCKETS,
+)
+HTTP_REQUEST_SERIALIZATION_SECONDS = Histogram(
+    "http_request_serialization_seconds",
+    "Time spent encoding the JSON response body",
+    ["method", "route"],
+    buckets=SERIALIZATION_BUCKETS,
+)
+
+FORECAST_RUNS = Counter("forecast_runs_total", "Forecast runs completed", ["kind", "scenario"])
+OPTIMIZATION_RUNS = Counter("optimization_runs_total", "Optimization runs completed", ["scenario"])
+OPTIMIZATION_SOLVE_SECONDS = Histogram(
+    "optimization_solve_seconds", "Time spent in the MPC release solver", ["start"], buckets=SERIALIZATION_BUCKETS
+)
+SCENARIO_RUNS = Counter("scenario_simulations_total", "Scenario simulations completed")
+POINTS_INGESTED = Counter("points_ingested_total", "Rows written by ingestion endpoints", ["dataset", "channel"])
+ALERT_EVENTS_CREATED = Counter("alert_events_created_total", "Alert events raised by rule evaluation", ["severity"])
+CHAT_CACHE_LOOKUPS = Counter("chat_cache_lookups_total", "Chatbot response cache lookups by outcome", ["result"])
+CHAT_CONTEXT_BUILD_SECONDS = Histogram(
+    "chat_context_build_seconds", "Time spent rebuilding the chatbot's live-data context", buckets=LATENCY_BUCKETS
+)
+LLM_EXPLANATIONS = Counter("llm_explanations_total", "Release-plan explanations served by source", ["source"])
+LLM_BATCH_SIZE = Histogram(
+    "llm_batch_size", "Requests dispatched together to the local LLM", ["backend"], buckets=(1, 2, 3, 4, 6, 8, 12, 16)
+)
+LLM_QUEUE_SECONDS = Histogram(
+    "llm_queue_seconds", "Time an LLM request waited for a batch slot", ["backend"], buckets=LATENCY_BUCKETS
+)
+LLM_REJECTED = Counter("llm_rejected_total", "LLM requests refused or abandoned for lack of capacity", ["backend", "reason"])
+
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds",
+    "Time a password hash or verify waited for a hashing worker",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent computing a password hash or verify",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password operations refused for lack of hashing capacity", ["operation", "reason"]
+)
+
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool", ["engine"])
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection", ["engine"])
+DB_POOL_CONNECTS = Counter("db_pool_connects_total", "New DBAPI connections opened by the pool", ["engine"])
+DB_POOL_INVALIDATIONS = Counter(
+    "db_pool_invalidations_total", "Pooled connections invalidated", ["engine", "soft"]
+)
+DB_POOL_PINGS = Counter("db_pool_pings_total", "Liveness pings issued on checkout", ["engine", "result"])
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    # With several uvicorn/gunicorn workers every process writes its samples to PROMETHEUS_MULTIPROC_DIR
+    # and the scrape aggregates the files. Live per-process collectors (pool gauges) are not included.
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exit() -> None:
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS
+from app.core.security import get_password_hash, verify_and_update_password
+
+_executor: ProcessPoolExecutor | None = None
+_pending: BoundedSemaphore | None = None
+_executor_lock = Lock()
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _password_executor() -> Tuple[ProcessPoolExecutor, BoundedSemaphore]:
+    global _executor, _pending
+    with _executor_lock:
+        if _executor is None:
+            settings = get_settings()
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.password_hash_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pending = BoundedSemaphore(max(1, settings.password_hash_max_pending))
+        return _executor, _pending
+
+
+def shutdown_password_executor() -> None:
+    global _executor, _pending
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+            _pending = None
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+def _run(operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+    settings = get_settings()
+    if settings.password_hash_workers <= 0:
+        result, started, finished = _timed(fn, *args)
+        PASSWORD_HASH_SECONDS.labels(operation).observe(finished - started)
+        return result
+
+    executor, pending = _password_executor()
+    # Waiting request threads are capped here, so a login burst cannot occupy the whole request threadpool.
+    if not pending.acquire(blocking=False):
+        PASSWORD_HASH_REJECTED.labels(operation, "queue_full").inc()
+        raise PasswordHasherBusy("Too many password operations in flight")
+    try:
+        submitted = time.time()
+        future = executor.submit(_timed, fn, *args)
+        try:
+            result, started, finished = future.result(timeout=settings.password_hash_timeout_seconds)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            PASSWORD_HASH_REJECTED.labels(operation, "timeout").inc()
+            raise PasswordHasherBusy(f"Password {operation} exceeded {settings.password_hash_timeout_seconds}s") from exc
+    finally:
+        pending.release()
+
+    PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(max(0.0, started - submitted))
+    PASSWORD_HASH_SECONDS.labels(operation).observe(finished - started)
+    return result
+
+
+def hash_password(password: str) -> str:
+    return _run("hash", get_password_hash, password)
+
+
+def verify_password_for_login(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _run("verify", verify_and_update_password, plain_password, hashed_password)
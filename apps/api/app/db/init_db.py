@@ -1,6 +1,33 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
 from app.db.base import Base
 from app.db.session import engine
 
 
+def upgrade_schema(bind: Engine) -> None:
+    # create_all() never alters a table that already exists. Columns added to a model since its table was
+    # created are added here as nullable (existing rows read NULL), together with any missing indexes.
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(
+                        text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+                    )
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+
 def create_all() -> None:
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
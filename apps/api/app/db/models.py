@@ -101,7 +101,7 @@ class RefreshToken(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     token_hash: Mapped[str] = mapped_column(String(128), unique=True, index=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
 
@@ -129,6 +129,12 @@ class Reservoir(Base):
     max_level: Mapped[float] = mapped_column(Float, default=130.0)
     min_level: Mapped[float] = mapped_column(Float, default=95.0)
     storage_capacity: Mapped[float] = mapped_column(Float, default=1200.0)
+    # entity_id of the reservoir's own series in timeseries_points (storage, inflow).
+    code: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    # Releases not consumed by this reservoir's nodes flow into the downstream reservoir.
+    downstream_reservoir_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("reservoirs.id", ondelete="SET NULL"), nullable=True
+    )
 
 
 class Station(Base):
@@ -148,6 +154,11 @@ class DownstreamNode(Base):
     name: Mapped[str] = mapped_column(String(128), unique=True)
     node_type: Mapped[str] = mapped_column(String(64), default="canal")
     priority: Mapped[int] = mapped_column(Integer, default=1)
+    reservoir_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("reservoirs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    # Daily demand; when unset, the node takes an equal share of its sector's average demand.
+    demand: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
 
 class Dataset(Base):
@@ -186,6 +197,8 @@ class TimeseriesPoint(Base):
     __table_args__ = (
         UniqueConstraint("entity_type", "entity_id", "metric", "ts", name="uq_ts_point"),
         Index("ix_ts_entity_metric_ts", "entity_type", "metric", "ts"),
+        # Forecast refreshes read one metric across entities from a point in time onwards.
+        Index("ix_ts_metric_ts", "metric", "ts"),
     )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
@@ -244,6 +257,8 @@ class ForecastRun(Base):
     metrics: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     confidence: Mapped[float] = mapped_column(Float, default=0.8)
     scenario: Mapped[str] = mapped_column(String(16), default="normal")
+    # Incremental model state after data_window_end; the next refresh of this entity continues from it.
+    state: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON(none_as_null=True), nullable=True)
     created_by: Mapped[Optional[str]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -283,6 +298,9 @@ class OptimizationRun(Base):
     release_plans: Mapped[List["ReleasePlan"]] = relationship(
         "ReleasePlan", back_populates="run", cascade="all, delete-orphan"
     )
+    explanations: Mapped[List["RunExplanation"]] = relationship(
+        "RunExplanation", back_populates="run", cascade="all, delete-orphan"
+    )
 
 
 class ReleasePlan(Base):
@@ -292,14 +310,33 @@ class ReleasePlan(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     run_id: Mapped[str] = mapped_column(ForeignKey("optimization_runs.id", ondelete="CASCADE"), index=True)
     ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # Set for network runs, which plan one row per reservoir and day.
+    reservoir_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("reservoirs.id", ondelete="SET NULL"), nullable=True
+    )
     release_value: Mapped[float] = mapped_column(Float)
     sector_allocations: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    node_allocations: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     storage_projection: Mapped[float] = mapped_column(Float, default=0.0)
     risk_index: Mapped[float] = mapped_column(Float, default=0.0)
 
     run: Mapped["OptimizationRun"] = relationship("OptimizationRun", back_populates="release_plans")
 
 
+class RunExplanation(Base):
+    __tablename__ = "run_explanations"
+    __table_args__ = (UniqueConstraint("run_id", "context_hash", name="uq_run_explanation_context"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    run_id: Mapped[str] = mapped_column(ForeignKey("optimization_runs.id", ondelete="CASCADE"), index=True)
+    context_hash: Mapped[str] = mapped_column(String(64))
+    context: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    result: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+    run: Mapped["OptimizationRun"] = relationship("OptimizationRun", back_populates="explanations")
+
+
 class Scenario(Base):
     __tablename__ = "scenarios"
 
@@ -356,3 +393,11 @@ class AlertEvent(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
 
     rule: Mapped["AlertRule"] = relationship("AlertRule", back_populates="events")
+
+
+class SeedMarker(Base):
+    __tablename__ = "seed_markers"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+    seeded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc, onupdate=now_utc)
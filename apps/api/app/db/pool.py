@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import time
+
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import (
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_CONNECTS,
+    DB_POOL_INVALIDATIONS,
+    DB_POOL_PINGS,
+    DB_POOL_TIMEOUTS,
+)
+
+_instrumented_engines: dict[str, Engine] = {}
+
+
+def _pool_label(pool) -> str:
+    return getattr(pool, "_orig_logging_name", None) or "primary"
+
+
+class _CheckoutTimingMixin:
+    def _do_get(self):
+        label = _pool_label(self)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolStatusCollector:
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["engine"])
+        checked_in = GaugeMetricFamily("db_pool_checked_in", "Idle connections held by the pool", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool_size", labels=["engine"])
+        for label, engine in _instrumented_engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            size.add_metric([label], pool.size())
+            checked_out.add_metric([label], pool.checkedout())
+            checked_in.add_metric([label], pool.checkedin())
+            overflow.add_metric([label], max(pool.overflow(), 0))
+        yield from (size, checked_out, checked_in, overflow)
+
+
+REGISTRY.register(PoolStatusCollector())
+
+
+def instrument_engine(engine: Engine, label: str, *, pre_ping: str, idle_ping_seconds: float) -> None:
+    _instrumented_engines[label] = engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.labels(label).inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(label).inc()
+        if pre_ping != "idle":
+            return
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin < idle_ping_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as err:
+            DB_POOL_PINGS.labels(label, "failed").inc()
+            # Tells the pool to discard this connection and retry the checkout with a fresh one.
+            raise exc.DisconnectionError() from err
+        finally:
+            cursor.close()
+        DB_POOL_PINGS.labels(label, "ok").inc()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.labels(label, "false").inc()
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.labels(label, "true").inc()
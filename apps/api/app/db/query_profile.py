@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\(.*\)(?:\s*,\s*\(.*\))*", re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_SQL_CHARS = 240
+
+
+def normalize_sql(statement: str) -> str:
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub("VALUES (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class _Shape:
+    count: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class QueryProfile:
+    n_plus_one_threshold: int
+    shapes: Dict[str, _Shape] = field(default_factory=dict)
+    queries: int = 0
+    seconds: float = 0.0
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = self.shapes.setdefault(normalize_sql(statement), _Shape())
+        shape.count += 1
+        shape.seconds += seconds
+        self.queries += 1
+        self.seconds += seconds
+
+    def n_plus_one(self) -> List[str]:
+        # executemany batches arrive as a single cursor call, so a repeated shape means a loop of round trips.
+        return [sql for sql, shape in self.shapes.items() if shape.count >= self.n_plus_one_threshold]
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        suspects = set(self.n_plus_one())
+        ranked = sorted(self.shapes.items(), key=lambda item: item[1].seconds, reverse=True)
+        return {
+            "queries": self.queries,
+            "distinct": len(self.shapes),
+            "db_ms": round(self.seconds * 1000, 2),
+            "n_plus_one": [
+                {"sql": sql[:MAX_SQL_CHARS], "count": shape.count, "db_ms": round(shape.seconds * 1000, 2)}
+                for sql, shape in ranked
+                if sql in suspects
+            ],
+            "top": [
+                {"sql": sql[:MAX_SQL_CHARS], "count": shape.count, "db_ms": round(shape.seconds * 1000, 2)}
+                for sql, shape in ranked[:top]
+            ],
+        }
+
+    def header_value(self) -> str:
+        return (
+            f"queries={self.queries}; distinct={len(self.shapes)}; "
+            f"db_ms={round(self.seconds * 1000, 2)}; n_plus_one={len(self.n_plus_one())}"
+        )
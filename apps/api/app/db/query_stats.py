@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.query_profile import QueryProfile
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+    rows_loaded: int = 0
+    serialization_seconds: float = 0.0
+    profile: Optional[QueryProfile] = None
+
+
+# The stats object is shared by reference, so threadpool handlers, SQLAlchemy's async greenlets and the
+# middleware task all add to the same counters even though each runs in a copied context.
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def begin_request_stats(profile: Optional[QueryProfile] = None) -> tuple[RequestStats, Token]:
+    stats = RequestStats(profile=profile)
+    return stats, _current.set(stats)
+
+
+def end_request_stats(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def add_rows_loaded(count: int) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.rows_loaded += count
+
+
+def add_serialization_time(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.queries += 1
+    stats.query_seconds += elapsed
+    if stats.profile is not None:
+        stats.profile.record(statement, elapsed)
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def _loaded_as_persistent(session, instance):
+    stats = _current.get()
+    if stats is not None:
+        stats.rows_loaded += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.db.models import (
+    AlertEvent,
+    AuditEvent,
+    DatasetVersion,
+    ForecastRun,
+    OptimizationRun,
+    ReleasePlan,
+    ScenarioResult,
+    TimeseriesPoint,
+)
+from app.db.query_stats import add_rows_loaded
+
+# Pages at least this large are streamed from the cursor in chunks instead of fetched in one go.
+YIELD_PER_THRESHOLD = 200
+
+TIMESERIES_COLUMNS = (
+    TimeseriesPoint.id,
+    TimeseriesPoint.entity_type,
+    TimeseriesPoint.entity_id,
+    TimeseriesPoint.metric,
+    TimeseriesPoint.ts,
+    TimeseriesPoint.value,
+    TimeseriesPoint.quality_flag,
+    TimeseriesPoint.source,
+)
+ALERT_EVENT_COLUMNS = (
+    AlertEvent.id,
+    AlertEvent.rule_id,
+    AlertEvent.metric,
+    AlertEvent.value,
+    AlertEvent.severity,
+    AlertEvent.message,
+    AlertEvent.status,
+    AlertEvent.created_at,
+)
+AUDIT_EVENT_COLUMNS = (
+    AuditEvent.id,
+    AuditEvent.actor_user_id,
+    AuditEvent.action,
+    AuditEvent.entity,
+    AuditEvent.entity_id,
+    AuditEvent.details,
+    AuditEvent.created_at,
+)
+FORECAST_RUN_COLUMNS = (
+    ForecastRun.id,
+    ForecastRun.entity,
+    ForecastRun.model_name,
+    ForecastRun.status,
+    ForecastRun.scenario,
+    ForecastRun.metrics,
+    ForecastRun.confidence,
+    ForecastRun.data_window_start,
+    ForecastRun.data_window_end,
+    ForecastRun.created_at,
+    ForecastRun.completed_at,
+)
+OPTIMIZATION_RUN_COLUMNS = (
+    OptimizationRun.id,
+    OptimizationRun.name,
+    OptimizationRun.params,
+    OptimizationRun.status,
+    OptimizationRun.summary,
+    OptimizationRun.created_by,
+    OptimizationRun.created_at,
+    OptimizationRun.completed_at,
+)
+RELEASE_PLAN_COLUMNS = (
+    ReleasePlan.id,
+    ReleasePlan.ts,
+    ReleasePlan.reservoir_id,
+    ReleasePlan.release_value,
+    ReleasePlan.sector_allocations,
+    ReleasePlan.node_allocations,
+    ReleasePlan.storage_projection,
+    ReleasePlan.risk_index,
+)
+
+
+def _fields(columns) -> Tuple[str, ...]:
+    return tuple(column.key for column in columns)
+
+
+TIMESERIES_FIELDS = _fields(TIMESERIES_COLUMNS)
+ALERT_EVENT_FIELDS = _fields(ALERT_EVENT_COLUMNS)
+AUDIT_EVENT_FIELDS = _fields(AUDIT_EVENT_COLUMNS)
+FORECAST_RUN_FIELDS = _fields(FORECAST_RUN_COLUMNS)
+OPTIMIZATION_RUN_FIELDS = _fields(OPTIMIZATION_RUN_COLUMNS)
+RELEASE_PLAN_FIELDS = _fields(RELEASE_PLAN_COLUMNS)
+
+
+@dataclass(frozen=True)
+class PageQuery:
+    count: Optional[StatementLambdaElement]
+    rows: StatementLambdaElement
+    fields: Tuple[str, ...]
+    size: int
+
+
+def _page_window(stmt: StatementLambdaElement, page: int, page_size: int) -> StatementLambdaElement:
+    offset = (page - 1) * page_size
+    return stmt + (lambda s: s.offset(offset).limit(page_size))
+
+
+def timeseries_page_query(
+    *,
+    entity: Optional[str],
+    metric: Optional[str],
+    from_ts: Optional[datetime],
+    to_ts: Optional[datetime],
+    page: int,
+    page_size: int,
+) -> PageQuery:
+    rows = lambda_stmt(lambda: select(*TIMESERIES_COLUMNS))
+    count = lambda_stmt(lambda: select(func.count()).select_from(TimeseriesPoint))
+
+    def criteria(stmt: StatementLambdaElement) -> StatementLambdaElement:
+        if entity:
+            stmt += lambda s: s.where(TimeseriesPoint.entity_type == entity)
+        if metric:
+            stmt += lambda s: s.where(TimeseriesPoint.metric == metric)
+        if from_ts:
+            stmt += lambda s: s.where(TimeseriesPoint.ts >= from_ts)
+        if to_ts:
+            stmt += lambda s: s.where(TimeseriesPoint.ts <= to_ts)
+        return stmt
+
+    rows = criteria(rows) + (lambda s: s.order_by(TimeseriesPoint.ts.desc()))
+    return PageQuery(criteria(count), _page_window(rows, page, page_size), TIMESERIES_FIELDS, page_size)
+
+
+def alert_events_page_query(*, page: int, page_size: int) -> PageQuery:
+    rows = lambda_stmt(lambda: select(*ALERT_EVENT_COLUMNS).order_by(AlertEvent.created_at.desc()))
+    count = lambda_stmt(lambda: select(func.count()).select_from(AlertEvent))
+    return PageQuery(count, _page_window(rows, page, page_size), ALERT_EVENT_FIELDS, page_size)
+
+
+def audit_events_page_query(*, text_filter: Optional[str], page: int, page_size: int) -> PageQuery:
+    rows = lambda_stmt(lambda: select(*AUDIT_EVENT_COLUMNS))
+    count = lambda_stmt(lambda: select(func.count()).select_from(AuditEvent))
+    if text_filter:
+        pattern = f"%{text_filter}%"
+        rows += lambda s: s.where(AuditEvent.action.ilike(pattern) | AuditEvent.entity.ilike(pattern))
+        count += lambda s: s.where(AuditEvent.action.ilike(pattern) | AuditEvent.entity.ilike(pattern))
+    rows += lambda s: s.order_by(AuditEvent.created_at.desc())
+    return PageQuery(count, _page_window(rows, page, page_size), AUDIT_EVENT_FIELDS, page_size)
+
+
+def forecast_runs_page_query(*, page: int, page_size: int) -> PageQuery:
+    rows = lambda_stmt(lambda: select(*FORECAST_RUN_COLUMNS).order_by(ForecastRun.created_at.desc()))
+    count = lambda_stmt(lambda: select(func.count()).select_from(ForecastRun))
+    return PageQuery(count, _page_window(rows, page, page_size), FORECAST_RUN_FIELDS, page_size)
+
+
+def optimization_runs_page_query(*, page: int, page_size: int) -> PageQuery:
+    rows = lambda_stmt(lambda: select(*OPTIMIZATION_RUN_COLUMNS).order_by(OptimizationRun.created_at.desc()))
+    count = lambda_stmt(lambda: select(func.count()).select_from(OptimizationRun))
+    return PageQuery(count, _page_window(rows, page, page_size), OPTIMIZATION_RUN_FIELDS, page_size)
+
+
+def release_plan_query(run_id: str) -> PageQuery:
+    rows = lambda_stmt(
+        lambda: select(*RELEASE_PLAN_COLUMNS)
+        .where(ReleasePlan.run_id == run_id)
+        .order_by(ReleasePlan.ts.asc(), ReleasePlan.reservoir_id.asc())
+    )
+    # A release plan is one row per horizon day (and reservoir, for network runs), so it is always read in chunks.
+    return PageQuery(None, rows, RELEASE_PLAN_FIELDS, YIELD_PER_THRESHOLD)
+
+
+def _execution_options(query: PageQuery) -> Dict[str, Any]:
+    if query.size >= YIELD_PER_THRESHOLD:
+        return {"yield_per": query.size}
+    return {}
+
+
+def fetch_rows(db: Session, query: PageQuery) -> List[Dict[str, Any]]:
+    result = db.execute(query.rows, execution_options=_execution_options(query))
+    fields = query.fields
+    rows = [dict(zip(fields, row)) for partition in result.partitions() for row in partition]
+    add_rows_loaded(len(rows))
+    return rows
+
+
+def fetch_page(db: Session, query: PageQuery) -> Tuple[List[Dict[str, Any]], int]:
+    total = int(db.execute(query.count).scalar_one()) if query.count is not None else 0
+    return fetch_rows(db, query), total
+
+
+def fetch_release_plan(db: Session, run_id: str) -> List[Dict[str, Any]]:
+    return fetch_rows(db, release_plan_query(run_id))
+
+
+async def afetch_rows(db: AsyncSession, query: PageQuery) -> List[Dict[str, Any]]:
+    fields = query.fields
+    options = _execution_options(query)
+    if not options:
+        result = await db.execute(query.rows)
+        rows = [dict(zip(fields, row)) for row in result]
+    else:
+        stream = await db.stream(query.rows, execution_options=options)
+        rows = [dict(zip(fields, row)) async for partition in stream.partitions() for row in partition]
+    add_rows_loaded(len(rows))
+    return rows
+
+
+async def afetch_page(db: AsyncSession, query: PageQuery) -> Tuple[List[Dict[str, Any]], int]:
+    total = int((await db.execute(query.count)).scalar_one()) if query.count is not None else 0
+    return await afetch_rows(db, query), total
+
+
+# Latest write time of everything derived answers depend on, in one round trip. The point count moves it for
+# back-fills older than the newest point and for deleted points; the API never rewrites a stored point (imports
+# skip duplicates), so a correction arrives as one of those. Edits made directly in the database are only
+# picked up once cached answers expire (CHAT_CACHE_TTL_SECONDS).
+DATA_WATERMARK_QUERY = select(
+    select(func.max(TimeseriesPoint.ts)).scalar_subquery(),
+    select(func.count()).select_from(TimeseriesPoint).scalar_subquery(),
+    select(func.max(DatasetVersion.created_at)).scalar_subquery(),
+    select(func.max(ForecastRun.created_at)).scalar_subquery(),
+    select(func.max(OptimizationRun.created_at)).scalar_subquery(),
+    select(func.max(ScenarioResult.created_at)).scalar_subquery(),
+    select(func.max(AlertEvent.created_at)).scalar_subquery(),
+)
+
+
+def data_watermark(db: Session) -> str:
+    row = db.execute(DATA_WATERMARK_QUERY).one()
+    return "|".join("" if value is None else str(value) for value in row)
+
+
+async def adata_watermark(db: AsyncSession) -> str:
+    row = (await db.execute(DATA_WATERMARK_QUERY)).one()
+    return "|".join("" if value is None else str(value) for value in row)
@@ -1,20 +1,89 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from typing import Any, Dict
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
 settings = get_settings()
 
-engine_kwargs = {"pool_pre_ping": True}
-if settings.database_url.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
+ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "sqlite:///": "sqlite+aiosqlite:///",
+}
+
+
+def async_database_url(url: str) -> str:
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix) :]
+    return url
+
+
+def _engine_kwargs(url: str, label: str, settings: Settings, *, is_async: bool = False) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping == "always", "pool_logging_name": label}
+    timeout_ms = settings.db_statement_timeout_ms
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if url.endswith(("://", ":memory:")):
+            return kwargs
+    elif timeout_ms > 0 and is_async:
+        kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    elif timeout_ms > 0 and url.startswith("postgresql"):
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+
+    kwargs.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    return kwargs
+
+
+def _create_engine(url: str, label: str) -> Engine:
+    created = create_engine(url, **_engine_kwargs(url, label, settings))
+    instrument_engine(
+        created,
+        label,
+        pre_ping=settings.db_pool_pre_ping,
+        idle_ping_seconds=settings.db_pre_ping_idle_seconds,
+    )
+    return created
+
+
+def _create_async_engine(url: str, label: str) -> AsyncEngine:
+    url = async_database_url(url)
+    created = create_async_engine(url, **_engine_kwargs(url, label, settings, is_async=True))
+    instrument_engine(
+        created.sync_engine,
+        label,
+        pre_ping=settings.db_pool_pre_ping,
+        idle_ping_seconds=settings.db_pre_ping_idle_seconds,
+    )
+    return created
+
+
+engine = _create_engine(settings.database_url, "primary")
+read_engine = _create_engine(settings.database_read_url, "replica") if settings.database_read_url else engine
+
+async_engine = _create_async_engine(settings.database_url, "primary_async")
+async_read_engine = (
+    _create_async_engine(settings.database_read_url, "replica_async") if settings.database_read_url else async_engine
+)
 
-engine = create_engine(settings.database_url, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=Session)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=Session)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -23,3 +92,27 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines() -> None:
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
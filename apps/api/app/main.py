@@ -1,20 +1,41 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import alerts, auth, chatbot, data, forecast, health, llm, optimization, scenario, users
+from app.core.auth_cache import revocations
 from app.core.config import get_settings
 from app.core.logging import configure_logging
+from app.core.metrics import (
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_ROWS,
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_SERIALIZATION_SECONDS,
+    HTTP_REQUESTS,
+    mark_worker_exit,
+)
+from app.core.password_hashing import shutdown_password_executor
 from app.core.rate_limit import RateLimitMiddleware
 from app.db.init_db import create_all
-from app.db.session import SessionLocal
+from app.db.query_profile import QueryProfile
+from app.db.query_stats import begin_request_stats, end_request_stats
+from app.db.session import SessionLocal, dispose_async_engines
+from app.services.chat_context import context_store
+from app.services.llm_backends import close_llm_backends
+from app.services.llm_gateway import close_llm_client
+from app.services.network import shutdown_network_executor
+from app.services.refresh_tokens import purge_expired_refresh_tokens
+from app.services.reports import shutdown_report_executor
 from app.services.seeding import ensure_seed_data
 from app.utils.errors import install_exception_handlers
 from app.utils.request_id import RequestIdMiddleware
+from app.utils.responses import TimedJSONResponse
 
 settings = get_settings()
 configure_logging()
@@ -26,6 +47,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=TimedJSONResponse,
 )
 
 app.add_middleware(RequestIdMiddleware)
@@ -41,33 +63,120 @@ app.add_middleware(
 install_exception_handlers(app)
 
 
+def _route_template(request: Request) -> str:
+    # Label by the matched path template, never the raw URL, to keep series cardinality bounded.
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
+    profile = QueryProfile(settings.sql_profile_n_plus_one_threshold) if settings.sql_profile_enabled else None
+    stats, token = begin_request_stats(profile)
     start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
-
-    logger.info(
-        f"{request.method} {request.url.path} -> {response.status_code} ({elapsed_ms}ms)",
-        extra={
-            "request_id": getattr(request.state, "request_id", "unknown"),
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-        },
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        end_request_stats(token)
+        method = request.method
+        route = _route_template(request)
+        HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+        HTTP_REQUEST_DURATION.labels(method, route, str(status_code)).observe(elapsed)
+        HTTP_REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+        HTTP_REQUEST_DB_SECONDS.labels(method, route).observe(stats.query_seconds)
+        HTTP_REQUEST_DB_ROWS.labels(method, route).observe(stats.rows_loaded)
+        HTTP_REQUEST_SERIALIZATION_SECONDS.labels(method, route).observe(stats.serialization_seconds)
+
+    elapsed_ms = round(elapsed * 1000, 2)
+    extra = {
+        "request_id": getattr(request.state, "request_id", "unknown"),
+        "method": request.method,
+        "path": request.url.path,
+        "status_code": response.status_code,
+    }
+    if profile is not None:
+        extra["query_profile"] = profile.summary()
+        if settings.debug:
+            response.headers["X-Query-Profile"] = profile.header_value()
+    logger.log(
+        logging.WARNING if profile is not None and profile.n_plus_one() else logging.INFO,
+        f"{request.method} {request.url.path} -> {response.status_code} ({elapsed_ms}ms, {stats.queries} queries)",
+        extra=extra,
     )
     return response
 
 
-@app.on_event("startup")
-def on_startup() -> None:
-    create_all()
-    if settings.demo_auto_seed:
+def _run_seed(done: threading.Event | None = None) -> None:
+    db = SessionLocal()
+    try:
+        ensure_seed_data(db)
+    except Exception:
+        if done is None:
+            raise
+        logger.exception("Background seeding failed")
+        app.state.seed_error = True
+        return
+    finally:
+        db.close()
+    if done is not None:
+        done.set()
+
+
+_token_compaction_stop = threading.Event()
+
+
+def _compact_tokens_periodically(interval_seconds: float) -> None:
+    while not _token_compaction_stop.wait(interval_seconds):
+        revocations.compact()
         db = SessionLocal()
         try:
-            ensure_seed_data(db)
+            purged = purge_expired_refresh_tokens(db)
+        except Exception:
+            logger.exception("Refresh token purge failed")
+            continue
         finally:
             db.close()
+        if purged:
+            logger.info(f"Purged {purged} expired or revoked refresh tokens")
+
+
+@app.on_event("startup")
+def on_startup() -> None:
+    create_all()
+    revocations.start()
+    if settings.refresh_token_purge_interval_minutes > 0:
+        _token_compaction_stop.clear()
+        threading.Thread(
+            target=_compact_tokens_periodically,
+            args=(settings.refresh_token_purge_interval_minutes * 60,),
+            name="token-compaction",
+            daemon=True,
+        ).start()
+    if settings.demo_auto_seed:
+        if settings.seed_in_background:
+            app.state.seeding = threading.Event()
+            threading.Thread(target=_run_seed, args=(app.state.seeding,), name="demo-seed", daemon=True).start()
+        else:
+            _run_seed()
+    if settings.chat_context_enabled:
+        # Rebuilt again on the first message after a background seed moves the watermark.
+        context_store.refresh_in_background()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    _token_compaction_stop.set()
+    revocations.stop()
+    shutdown_report_executor()
+    shutdown_password_executor()
+    shutdown_network_executor()
+    await close_llm_client()
+    await close_llm_backends()
+    await dispose_async_engines()
+    mark_worker_exit()
 
 
 app.include_router(health.router)
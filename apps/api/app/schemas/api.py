@@ -83,6 +83,7 @@ class OptimizationRunRequest(BaseModel):
     name: str = "Demo Optimization Run"
     horizon_days: int = Field(ge=1, le=90, default=14)
     scenario: Literal["wet", "normal", "dry"] = "normal"
+    mode: Literal["rule", "mpc", "network"] = "rule"
     weights: Dict[str, float] = Field(
         default_factory=lambda: {
             "drinking": 1.2,
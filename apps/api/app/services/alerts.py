@@ -4,6 +4,7 @@ from typing import List
 
 from sqlalchemy.orm import Session
 
+from app.core.metrics import ALERT_EVENTS_CREATED
 from app.db.models import AlertEvent, AlertRule, TimeseriesPoint
 
 
@@ -46,4 +47,5 @@ def evaluate_alert_rules(db: Session) -> List[AlertEvent]:
     db.commit()
     for ev in created_events:
         db.refresh(ev)
+        ALERT_EVENTS_CREATED.labels(ev.severity).inc()
     return created_events
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+
+from app.core.config import get_settings
+from app.core.metrics import CHAT_CACHE_LOOKUPS
+from app.db.reads import adata_watermark
+from app.db.session import AsyncReadSessionLocal
+from app.services.llm_backends import llm_backend
+from app.utils.text import normalize_text
+
+logger = logging.getLogger("golestan.chat_cache")
+
+REDIS_PREFIX = "golestan:chat:"
+REDIS_RETRY_SECONDS = 30.0
+NGRAM_SIZE = 3
+
+_PUNCTUATION = re.compile(r"[?؟!.,،؛;:«»\"'()\[\]]+")
+
+
+def normalize_question(message: str) -> str:
+    return normalize_text(_PUNCTUATION.sub(" ", message))
+
+
+def _ngrams(text: str) -> FrozenSet[str]:
+    padded = f" {text} "
+    return frozenset(padded[i : i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1)))
+
+
+@dataclass(frozen=True)
+class ChatCacheKey:
+    key: str
+    question: str
+    watermark: str
+    contextual: bool
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    question: str
+    watermark: str
+    grams: FrozenSet[str]
+    contextual: bool
+    answer: Dict[str, Any]
+
+
+class ChatResponseCache:
+    # LRU of answers by exact key, plus a character-trigram inverted index over the context-free questions
+    # so near-duplicates ("current storage?" / "what is the current storage") can reuse an answer.
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.answer
+
+    def get_similar(self, question: str, watermark: str, threshold: float) -> Optional[Dict[str, Any]]:
+        grams = _ngrams(question)
+        now = time.time()
+        with self._lock:
+            overlap: Dict[str, int] = {}
+            for gram in grams:
+                for key in self._index.get(gram, ()):
+                    overlap[key] = overlap.get(key, 0) + 1
+            best_key, best_score = None, threshold
+            for key, shared in overlap.items():
+                entry = self._entries[key]
+                if entry.watermark != watermark or entry.expires_at <= now:
+                    continue
+                score = 2 * shared / (len(grams) + len(entry.grams))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key].answer
+
+    def put(self, cache_key: ChatCacheKey, answer: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        entry = _Entry(
+            expires_at=time.time() + self.ttl_seconds,
+            question=cache_key.question,
+            watermark=cache_key.watermark,
+            grams=_ngrams(cache_key.question),
+            contextual=cache_key.contextual,
+            answer=answer,
+        )
+        with self._lock:
+            self._drop(cache_key.key)
+            self._entries[cache_key.key] = entry
+            if not entry.contextual:
+                for gram in entry.grams:
+                    self._index.setdefault(gram, set()).add(cache_key.key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.contextual:
+            return
+        for gram in entry.grams:
+            keys = self._index.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[gram]
+
+
+settings = get_settings()
+response_cache = ChatResponseCache(settings.chat_cache_max_entries, settings.chat_cache_ttl_seconds)
+
+_watermark: tuple[str, float] | None = None
+_redis = None
+_redis_loop: asyncio.AbstractEventLoop | None = None
+_redis_retry_at = 0.0
+
+
+def watermark_digest(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+async def current_watermark() -> Optional[str]:
+    global _watermark
+    refresh = get_settings().chat_cache_watermark_seconds
+    if _watermark is not None and time.monotonic() - _watermark[1] < refresh:
+        return _watermark[0]
+    # Without a watermark no cached answer can be trusted to be current, so callers skip the cache and answer live.
+    try:
+        async with AsyncReadSessionLocal() as db:
+            value = watermark_digest(await adata_watermark(db))
+    except Exception:
+        logger.warning("Chat cache watermark unavailable; answering without the cache", exc_info=True)
+        return None
+    _watermark = (value, time.monotonic())
+    return value
+
+
+def _redis_client():
+    global _redis, _redis_loop
+    settings = get_settings()
+    if settings.chat_cache_backend != "redis" or time.monotonic() < _redis_retry_at:
+        return None
+    loop = asyncio.get_running_loop()
+    if _redis is None or _redis_loop is not loop:
+        import redis.asyncio
+
+        _redis = redis.asyncio.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        _redis_loop = loop
+    return _redis
+
+
+def _redis_failed() -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+    logger.warning("Chat cache Redis unavailable; using the in-process cache only", exc_info=True)
+
+
+async def cache_key_for(message: str, history: List[Dict[str, str]]) -> Optional[ChatCacheKey]:
+    settings = get_settings()
+    if not settings.chat_cache_enabled:
+        return None
+    question = normalize_question(message)
+    watermark = await current_watermark()
+    if watermark is None:
+        return None
+    backend = llm_backend()
+    material = json.dumps(
+        [backend.provider, backend.model, watermark, question, [[item["role"], item["content"]] for item in history]],
+        ensure_ascii=False,
+    )
+    key = hashlib.sha256(material.encode("utf-8")).hexdigest()
+    return ChatCacheKey(key=key, question=question, watermark=watermark, contextual=bool(history))
+
+
+async def lookup(cache_key: Optional[ChatCacheKey]) -> Optional[Dict[str, Any]]:
+    if cache_key is None:
+        return None
+    answer = response_cache.get(cache_key.key)
+    if answer is not None:
+        CHAT_CACHE_LOOKUPS.labels("exact").inc()
+        return {**answer, "cached": "exact"}
+
+    client = _redis_client()
+    if client is not None:
+        try:
+            raw = await client.get(REDIS_PREFIX + cache_key.key)
+        except Exception:
+            _redis_failed()
+            raw = None
+        if raw is not None:
+            answer = json.loads(raw)
+            response_cache.put(cache_key, answer)
+            CHAT_CACHE_LOOKUPS.labels("exact").inc()
+            return {**answer, "cached": "exact"}
+
+    threshold = get_settings().chat_cache_similarity_threshold
+    if threshold > 0 and not cache_key.contextual:
+        answer = response_cache.get_similar(cache_key.question, cache_key.watermark, threshold)
+        if answer is not None:
+            CHAT_CACHE_LOOKUPS.labels("similar").inc()
+            return {**answer, "cached": "similar"}
+
+    CHAT_CACHE_LOOKUPS.labels("miss").inc()
+    return None
+
+
+async def store(cache_key: Optional[ChatCacheKey], answer: Dict[str, Any]) -> None:
+    if cache_key is None:
+        return
+    response_cache.put(cache_key, answer)
+    client = _redis_client()
+    if client is not None:
+        try:
+            await client.set(
+                REDIS_PREFIX + cache_key.key,
+                json.dumps(answer, ensure_ascii=False),
+                ex=get_settings().chat_cache_ttl_seconds,
+            )
+        except Exception:
+            _redis_failed()
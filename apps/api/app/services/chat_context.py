@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.metrics import CHAT_CONTEXT_BUILD_SECONDS
+from app.db.models import AlertEvent, ForecastPoint, ForecastRun, OptimizationRun, ReleasePlan, TimeseriesPoint
+from app.db.reads import data_watermark
+from app.db.session import ReadSessionLocal
+from app.services import chat_cache
+from app.utils.text import KeywordMatcher, normalize_text
+
+logger = logging.getLogger("golestan.chat_context")
+
+FORECAST_SUMMARY_DAYS = 7
+
+# Section order when the question names no topic; sections it does name move to the front.
+TOPIC_ORDER = ("reservoir", "alerts", "optimization", "forecast", "hydrology", "meteorology", "downstream")
+TOPIC_KEYWORDS = {
+    "reservoir": ("مخزن", "سد", "حجم", "تراز", "ذخیره", "reservoir", "storage", "level"),
+    "alerts": ("هشدار", "بحران", "سیلاب", "خشکسالی", "alert", "flood", "drought"),
+    "optimization": (
+        "بهینه‌سازی",
+        "رهاسازی",
+        "برنامه",
+        "تخصیص",
+        "تامین",
+        "شرب",
+        "کشاورزی",
+        "صنعت",
+        "محیط‌زیست",
+        "optimization",
+        "release",
+        "allocation",
+    ),
+    "forecast": ("پیش‌بینی", "آینده", "روز آینده", "forecast"),
+    "hydrology": ("دبی", "ورودی", "خروجی", "هیدرولوژی", "inflow", "outflow"),
+    "meteorology": ("هواشناسی", "بارش", "باران", "دما", "تبخیر", "رطوبت", "برف", "precipitation", "temperature"),
+    "downstream": ("پایین‌دست", "پایین دست", "شبکه", "downstream"),
+}
+TOPICS_BY_KEYWORD: Dict[str, Set[str]] = defaultdict(set)
+for _topic, _keywords in TOPIC_KEYWORDS.items():
+    for _keyword in _keywords:
+        TOPICS_BY_KEYWORD[normalize_text(_keyword)].add(_topic)
+TOPIC_MATCHER = KeywordMatcher(TOPICS_BY_KEYWORD)
+
+_latest_ts = (
+    select(
+        TimeseriesPoint.entity_type,
+        TimeseriesPoint.entity_id,
+        TimeseriesPoint.metric,
+        func.max(TimeseriesPoint.ts).label("ts"),
+    )
+    .group_by(TimeseriesPoint.entity_type, TimeseriesPoint.entity_id, TimeseriesPoint.metric)
+    .subquery()
+)
+LATEST_VALUES_QUERY = (
+    select(
+        TimeseriesPoint.entity_type,
+        TimeseriesPoint.entity_id,
+        TimeseriesPoint.metric,
+        TimeseriesPoint.ts,
+        TimeseriesPoint.value,
+    )
+    .join(
+        _latest_ts,
+        and_(
+            TimeseriesPoint.entity_type == _latest_ts.c.entity_type,
+            TimeseriesPoint.entity_id == _latest_ts.c.entity_id,
+            TimeseriesPoint.metric == _latest_ts.c.metric,
+            TimeseriesPoint.ts == _latest_ts.c.ts,
+        ),
+    )
+    .order_by(TimeseriesPoint.entity_type, TimeseriesPoint.entity_id, TimeseriesPoint.metric)
+)
+
+_latest_forecast = (
+    select(ForecastRun.entity, func.max(ForecastRun.created_at).label("created_at"))
+    .where(ForecastRun.status == "completed")
+    .group_by(ForecastRun.entity)
+    .subquery()
+)
+LATEST_FORECASTS_QUERY = (
+    select(ForecastRun)
+    .join(
+        _latest_forecast,
+        and_(ForecastRun.entity == _latest_forecast.c.entity, ForecastRun.created_at == _latest_forecast.c.created_at),
+    )
+    .order_by(ForecastRun.entity)
+)
+
+
+def _tokens(text: str) -> int:
+    # Deliberately pessimistic for Persian text, which tokenizes at roughly three characters per token.
+    return len(text) // 3 + 1
+
+
+def _number(value: float) -> str:
+    return f"{value:,.2f}".rstrip("0").rstrip(".")
+
+
+def _day(value) -> str:
+    return value.date().isoformat() if value is not None else "-"
+
+
+@dataclass
+class ContextSection:
+    topic: str
+    lines: List[Tuple[str, int]]
+
+
+class ContextSnapshot:
+    # Pre-rendered context lines with their token cost, built once per data watermark so assembling a
+    # message's context is one keyword scan plus a walk over a few short lists.
+    def __init__(self, watermark: str, sections: List[ContextSection], built_at: float):
+        self.watermark = watermark
+        self.sections = sorted(sections, key=lambda section: TOPIC_ORDER.index(section.topic))
+        self.built_at = built_at
+
+    def render(self, question: str, max_tokens: int) -> str:
+        topics: Set[str] = set()
+        for keyword in TOPIC_MATCHER.find_all(normalize_text(question)):
+            topics |= TOPICS_BY_KEYWORD[keyword]
+
+        lines: List[str] = []
+        used = 0
+        for section in sorted(self.sections, key=lambda section: section.topic not in topics):
+            for line, cost in section.lines:
+                if used + cost > max_tokens:
+                    break
+                lines.append(line)
+                used += cost
+        return "\n".join(lines)
+
+
+def _series_sections(db: Session) -> List[ContextSection]:
+    grouped: Dict[Tuple[str, str], List[Tuple[str, object, float]]] = defaultdict(list)
+    for entity_type, entity_id, metric, ts, value in db.execute(LATEST_VALUES_QUERY):
+        grouped[(entity_type, entity_id)].append((metric, ts, float(value)))
+
+    lines_by_topic: Dict[str, List[str]] = defaultdict(list)
+    for (entity_type, entity_id), metrics in grouped.items():
+        topic = entity_type if entity_type in TOPIC_KEYWORDS else "downstream"
+        newest = max(ts for _, ts, _ in metrics)
+        values = "، ".join(f"{metric}={_number(value)}" for metric, _, value in metrics)
+        lines_by_topic[topic].append(f"آخرین مقادیر {entity_type}/{entity_id} ({_day(newest)}): {values}")
+    return [
+        ContextSection(topic, [(line, _tokens(line)) for line in lines]) for topic, lines in lines_by_topic.items()
+    ]
+
+
+def _forecast_section(db: Session) -> Optional[ContextSection]:
+    runs = db.execute(LATEST_FORECASTS_QUERY).scalars().all()
+    if not runs:
+        return None
+    points: Dict[str, List[Tuple[float, float, float]]] = defaultdict(list)
+    rows = db.execute(
+        select(ForecastPoint.run_id, ForecastPoint.predicted_value, ForecastPoint.lower_bound, ForecastPoint.upper_bound)
+        .where(ForecastPoint.run_id.in_([run.id for run in runs]))
+        .order_by(ForecastPoint.run_id, ForecastPoint.ts)
+    )
+    for run_id, predicted, lower, upper in rows:
+        points[run_id].append((float(predicted), float(lower), float(upper)))
+
+    lines = []
+    for run in runs:
+        metrics = run.metrics or {}
+        line = f"پیش‌بینی {run.entity} (سناریو {run.scenario}، {_day(run.created_at)})"
+        horizon = points.get(run.id, [])
+        if horizon:
+            window = horizon[:FORECAST_SUMMARY_DAYS]
+            mean = sum(point[0] for point in window) / len(window)
+            low = min(point[1] for point in window)
+            high = max(point[2] for point in window)
+            line += (
+                f": میانگین {len(window)} روز آینده {_number(mean)} [{_number(low)} تا {_number(high)}]"
+                f"، افق {len(horizon)} روز"
+            )
+        line += f"، MAE {metrics.get('mae', 0)}، RMSE {metrics.get('rmse', 0)}، MAPE {metrics.get('mape', 0)}%"
+        lines.append(line)
+    return ContextSection("forecast", [(line, _tokens(line)) for line in lines])
+
+
+def _optimization_section(db: Session) -> Optional[ContextSection]:
+    run = db.execute(
+        select(OptimizationRun)
+        .where(OptimizationRun.status == "completed")
+        .order_by(OptimizationRun.created_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    if run is None:
+        return None
+    summary = run.summary or {}
+    params = run.params or {}
+    sectors = "، ".join(f"{sector} {value}" for sector, value in (summary.get("satisfaction_by_sector") or {}).items())
+    lines = [
+        f"آخرین بهینه‌سازی «{run.name}» (سناریو {params.get('scenario', 'normal')}، {_day(run.created_at)}): "
+        f"رضایت کل {summary.get('overall_satisfaction', '-')}؛ رضایت بخش‌ها: {sectors or '-'}؛ "
+        f"ریسک خشکسالی {summary.get('drought_risk', '-')}، ریسک سیلاب {summary.get('flood_risk', '-')}"
+    ]
+    release = db.execute(
+        select(func.avg(ReleasePlan.release_value), func.count(ReleasePlan.id)).where(ReleasePlan.run_id == run.id)
+    ).one()
+    if release[1]:
+        lines.append(f"برنامه رهاسازی همین اجرا: میانگین {_number(float(release[0]))} در {release[1]} روز")
+    return ContextSection("optimization", [(line, _tokens(line)) for line in lines])
+
+
+def _alerts_section(db: Session, limit: int) -> Optional[ContextSection]:
+    events = db.execute(
+        select(AlertEvent.severity, AlertEvent.message, AlertEvent.created_at)
+        .where(AlertEvent.status == "open")
+        .order_by(AlertEvent.created_at.desc())
+        .limit(limit)
+    ).all()
+    if not events:
+        return None
+    lines = [f"هشدار باز [{severity}] {message} ({_day(created_at)})" for severity, message, created_at in events]
+    return ContextSection("alerts", [(line, _tokens(line)) for line in lines])
+
+
+def build_snapshot(db: Session) -> ContextSnapshot:
+    start = time.perf_counter()
+    watermark = chat_cache.watermark_digest(data_watermark(db))
+    sections = _series_sections(db)
+    for section in (
+        _forecast_section(db),
+        _optimization_section(db),
+        _alerts_section(db, get_settings().chat_context_max_alerts),
+    ):
+        if section is not None:
+            sections.append(section)
+    CHAT_CONTEXT_BUILD_SECONDS.observe(time.perf_counter() - start)
+    return ContextSnapshot(watermark, sections, time.time())
+
+
+class ChatContextStore:
+    # Holds the current snapshot. A message that sees a newer watermark gets the previous snapshot and starts
+    # one background rebuild, so no query ever runs on the message path.
+    def __init__(self):
+        self._snapshot: Optional[ContextSnapshot] = None
+        self._refreshing = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[ContextSnapshot]:
+        return self._snapshot
+
+    def refresh(self) -> ContextSnapshot:
+        db = ReadSessionLocal()
+        try:
+            self._snapshot = build_snapshot(db)
+        finally:
+            db.close()
+        return self._snapshot
+
+    def refresh_in_background(self) -> None:
+        if not self._refreshing.acquire(blocking=False):
+            return
+        threading.Thread(target=self._refresh_and_release, name="chat-context", daemon=True).start()
+
+    def _refresh_and_release(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Chat context refresh failed")
+        finally:
+            self._refreshing.release()
+
+    def render(self, question: str, watermark: Optional[str]) -> Tuple[str, Optional[str]]:
+        snapshot = self._snapshot
+        if snapshot is None or (watermark is not None and snapshot.watermark != watermark):
+            self.refresh_in_background()
+        if snapshot is None:
+            return "", None
+        return snapshot.render(question, get_settings().chat_context_max_tokens), snapshot.watermark
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+
+context_store = ChatContextStore()
+
+
+async def context_for(message: str) -> Tuple[str, Optional[str]]:
+    # Returns the context with the watermark of the data it was built from (None when there is no snapshot yet).
+    # An answer may only be cached under a key carrying that same watermark.
+    watermark = await chat_cache.current_watermark()
+    if not get_settings().chat_context_enabled:
+        return "", watermark
+    return context_store.render(message, watermark)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.metrics import POINTS_INGESTED
+from app.db.models import ForecastPoint, ForecastRun, OptimizationRun, ReleasePlan, SectorDemand, TimeseriesPoint
+from app.db.session import SessionLocal
+
+SECTORS = ["drinking", "environment", "industry", "agriculture"]
+TS_TYPE = pa.timestamp("us", tz="UTC")
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+FILE_EXTENSIONS = {"arrow": "arrows", "parquet": "parquet"}
+
+
+class ColumnarFormatError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ColumnarDataset:
+    model: Any
+    schema: pa.Schema
+    required: Tuple[str, ...]
+    order_by: Tuple[str, ...]
+    filters: Dict[str, str] = field(default_factory=dict)
+    to_row: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    from_row: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def _release_plan_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: v for k, v in row.items() if k not in SECTORS}
+    out["sector_allocations"] = {s: float(row.get(s) or 0.0) for s in SECTORS}
+    # Arrow maps come back as (key, value) pairs.
+    out["node_allocations"] = {name: float(value) for name, value in row.get("node_allocations") or ()}
+    return out
+
+
+def _release_plan_to_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    alloc = row.pop("sector_allocations", None) or {}
+    for sector in SECTORS:
+        row[sector] = float(alloc.get(sector, 0.0))
+    return row
+
+
+DATASETS: Dict[str, ColumnarDataset] = {
+    "timeseries_points": ColumnarDataset(
+        model=TimeseriesPoint,
+        schema=pa.schema(
+            [
+                ("entity_type", pa.string()),
+                ("entity_id", pa.string()),
+                ("metric", pa.string()),
+                ("ts", TS_TYPE),
+                ("value", pa.float64()),
+                ("quality_flag", pa.string()),
+                ("source", pa.string()),
+            ]
+        ),
+        required=("entity_type", "entity_id", "metric", "ts", "value"),
+        order_by=("ts", "metric", "entity_id"),
+        filters={"entity": "entity_type", "metric": "metric"},
+    ),
+    "sector_demands": ColumnarDataset(
+        model=SectorDemand,
+        schema=pa.schema(
+            [
+                ("sector", pa.string()),
+                ("ts", TS_TYPE),
+                ("value", pa.float64()),
+                ("scenario", pa.string()),
+            ]
+        ),
+        required=("sector", "ts", "value"),
+        order_by=("ts", "sector"),
+        filters={"sector": "sector", "scenario": "scenario"},
+    ),
+    "forecast_points": ColumnarDataset(
+        model=ForecastPoint,
+        schema=pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("metric", pa.string()),
+                ("ts", TS_TYPE),
+                ("predicted_value", pa.float64()),
+                ("lower_bound", pa.float64()),
+                ("upper_bound", pa.float64()),
+            ]
+        ),
+        required=("run_id", "ts", "predicted_value", "lower_bound", "upper_bound"),
+        order_by=("run_id", "ts"),
+        filters={"run_id": "run_id"},
+    ),
+    "release_plans": ColumnarDataset(
+        model=ReleasePlan,
+        schema=pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("ts", TS_TYPE),
+                # Network runs plan one row per reservoir and day; other runs leave it null.
+                ("reservoir_id", pa.string()),
+                ("release_value", pa.float64()),
+                ("storage_projection", pa.float64()),
+                ("risk_index", pa.float64()),
+            ]
+            + [(sector, pa.float64()) for sector in SECTORS]
+            + [("node_allocations", pa.map_(pa.string(), pa.float64()))]
+        ),
+        required=("run_id", "ts", "release_value"),
+        order_by=("run_id", "ts", "reservoir_id"),
+        filters={"run_id": "run_id"},
+        to_row=_release_plan_to_row,
+        from_row=_release_plan_from_row,
+    ),
+}
+
+RUN_MODELS = {"forecast_points": ForecastRun, "release_plans": OptimizationRun}
+
+
+# Write-only file object that hands back whatever pyarrow wrote since the last drain.
+class _ChunkSink:
+    def __init__(self) -> None:
+        self._buffer = BytesIO()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        written = self._buffer.write(data)
+        self._position += written
+        return written
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return chunk
+
+
+def _export_statement(spec: ColumnarDataset, filters: Dict[str, Any], from_ts: datetime | None, to_ts: datetime | None):
+    columns = [name for name in spec.schema.names if name not in SECTORS]
+    if spec.to_row is not None:
+        columns.append("sector_allocations")
+    stmt = select(*[getattr(spec.model, name) for name in columns])
+
+    for param, column in spec.filters.items():
+        value = filters.get(param)
+        if value:
+            stmt = stmt.where(getattr(spec.model, column) == value)
+    if from_ts:
+        stmt = stmt.where(spec.model.ts >= from_ts)
+    if to_ts:
+        stmt = stmt.where(spec.model.ts <= to_ts)
+    return stmt.order_by(*[getattr(spec.model, name) for name in spec.order_by]), columns
+
+
+def _record_batch(spec: ColumnarDataset, columns: List[str], rows) -> pa.RecordBatch:
+    if spec.to_row is not None:
+        records = [spec.to_row(dict(zip(columns, row))) for row in rows]
+        return pa.RecordBatch.from_pylist(records, schema=spec.schema)
+    arrays = list(zip(*rows)) if rows else [[] for _ in columns]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=spec.schema.field(name).type) for name, values in zip(columns, arrays)],
+        schema=spec.schema,
+    )
+
+
+def stream_export(
+    dataset: str,
+    fmt: str,
+    *,
+    filters: Dict[str, Any] | None = None,
+    from_ts: datetime | None = None,
+    to_ts: datetime | None = None,
+    batch_size: int = 50_000,
+) -> Iterator[bytes]:
+    spec = DATASETS[dataset]
+    stmt, columns = _export_statement(spec, filters or {}, from_ts, to_ts)
+
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, spec.schema, compression="zstd")
+    else:
+        writer = ipc.new_stream(sink, spec.schema)
+
+    # The request-scoped session is closed before a streaming body runs, so the export owns its own.
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            batch = _record_batch(spec, columns, partition)
+            if fmt == "parquet":
+                writer.write_batch(batch, row_group_size=batch_size)
+            else:
+                writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.drain()
+    finally:
+        db.close()
+
+
+def _iter_import_batches(content: bytes, fmt: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    try:
+        if fmt == "parquet":
+            yield from pq.ParquetFile(BytesIO(content)).iter_batches(batch_size=batch_size)
+            return
+        try:
+            reader = ipc.open_stream(content)
+        except pa.ArrowInvalid:
+            reader = ipc.open_file(content)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+            return
+        yield from reader
+    except pa.ArrowInvalid as exc:
+        raise ColumnarFormatError(f"Unreadable {fmt} payload: {exc}") from exc
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _prepare_batch(spec: ColumnarDataset, batch: pa.RecordBatch) -> List[Dict[str, Any]]:
+    missing = [name for name in spec.required if name not in batch.schema.names]
+    if missing:
+        raise ColumnarFormatError(f"Missing required columns: {', '.join(missing)}")
+
+    known = [name for name in spec.schema.names if name in batch.schema.names]
+    table = pa.Table.from_batches([batch.select(known)])
+    cast_schema = pa.schema([spec.schema.field(name) for name in known])
+    try:
+        table = table.cast(cast_schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise ColumnarFormatError(f"Column types do not match the {spec.model.__tablename__} schema: {exc}") from exc
+
+    rows = table.to_pylist()
+    for row in rows:
+        if any(row.get(name) is None for name in spec.required):
+            raise ColumnarFormatError(f"Null value in required columns: {', '.join(spec.required)}")
+        row["id"] = str(uuid4())
+        if spec.from_row is not None:
+            row.update(spec.from_row(row))
+            for sector in SECTORS:
+                row.pop(sector, None)
+    return rows
+
+
+def _drop_existing_timeseries(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not rows:
+        return rows
+
+    def key(entity_type, entity_id, metric, ts) -> tuple:
+        return (entity_type, entity_id, metric, _as_utc(ts))
+
+    existing = set()
+    stmt = select(
+        TimeseriesPoint.entity_type, TimeseriesPoint.entity_id, TimeseriesPoint.metric, TimeseriesPoint.ts
+    ).where(
+        tuple_(TimeseriesPoint.metric, TimeseriesPoint.entity_id).in_({(r["metric"], r["entity_id"]) for r in rows}),
+        TimeseriesPoint.ts >= min(r["ts"] for r in rows),
+        TimeseriesPoint.ts <= max(r["ts"] for r in rows),
+    )
+    for row in db.execute(stmt):
+        existing.add(key(*row))
+
+    fresh: List[Dict[str, Any]] = []
+    for row in rows:
+        row_key = key(row["entity_type"], row["entity_id"], row["metric"], row["ts"])
+        if row_key in existing:
+            continue
+        existing.add(row_key)
+        fresh.append(row)
+    return fresh
+
+
+def _check_run_ids(db: Session, dataset: str, rows: List[Dict[str, Any]]) -> None:
+    run_model = RUN_MODELS.get(dataset)
+    if run_model is None or not rows:
+        return
+    run_ids = {row["run_id"] for row in rows}
+    found = set(db.execute(select(run_model.id).where(run_model.id.in_(run_ids))).scalars())
+    unknown = sorted(run_ids - found)
+    if unknown:
+        raise ColumnarFormatError(f"Unknown run_id values: {', '.join(unknown[:5])}")
+
+
+def import_columnar(db: Session, dataset: str, content: bytes, fmt: str, batch_size: int = 50_000) -> Dict[str, int]:
+    spec = DATASETS[dataset]
+    defaults = {
+        column.name: column.default.arg
+        for column in spec.model.__table__.columns
+        if column.default is not None and not callable(column.default.arg)
+    }
+
+    inserted = 0
+    skipped = 0
+    batches = 0
+    for batch in _iter_import_batches(content, fmt, batch_size):
+        rows = _prepare_batch(spec, batch)
+        for row in rows:
+            for name, value in defaults.items():
+                if row.get(name) is None:
+                    row[name] = value
+
+        _check_run_ids(db, dataset, rows)
+        if dataset == "timeseries_points":
+            fresh = _drop_existing_timeseries(db, rows)
+            skipped += len(rows) - len(fresh)
+            rows = fresh
+
+        if rows:
+            db.execute(insert(spec.model), rows)
+        inserted += len(rows)
+        batches += 1
+
+    db.commit()
+    POINTS_INGESTED.labels(dataset, "columnar").inc(inserted)
+    return {"inserted": inserted, "skipped": skipped, "batches": batches}
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db.models import Reservoir, SafetyConstraint
+
+SEASON_MONTHS = {
+    "all": tuple(range(1, 13)),
+    "winter": (12, 1, 2),
+    "spring": (3, 4, 5),
+    "summer": (6, 7, 8),
+    "autumn": (9, 10, 11),
+}
+# Month (1-12) of each day of a leap year; timelines are indexed by this 366-day calendar.
+MONTH_OF_DAY = (
+    np.arange("2024-01-01", "2025-01-01", dtype="datetime64[D]").astype("datetime64[M]").astype(int) % 12 + 1
+)
+
+
+def _calendar_index(start: datetime, days: int) -> np.ndarray:
+    # Plan days start the day after `start`. Non-leap years skip Feb 29 so March 1 is always index 60.
+    dates = np.datetime64(start.date()) + np.arange(1, days + 1)
+    years = dates.astype("datetime64[Y]")
+    day_of_year = (dates - years).astype(int)
+    year = years.astype(int) + 1970
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return day_of_year + ((~leap) & (day_of_year >= 59))
+
+
+@dataclass(frozen=True)
+class ConstraintTimeline:
+    # Effective limits for every day of the year, resolved once from a reservoir's SafetyConstraint rows.
+    min_level: np.ndarray
+    max_level: np.ndarray
+    max_release: np.ndarray
+
+    def window(self, start: datetime, days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        index = _calendar_index(start, days)
+        return self.min_level[index], self.max_level[index], self.max_release[index]
+
+
+def build_timeline(rows: Iterable) -> Optional[ConstraintTimeline]:
+    # A season's rows replace the "all" rows for its months; rows for the same months combine to the most
+    # restrictive limits. Rows with an unknown season are ignored.
+    limits: Dict[int, Dict[str, Tuple[float, float, float]]] = {}
+    for row in rows:
+        season = (row.season or "all").lower()
+        scope = "all" if season == "all" else "season"
+        for month in SEASON_MONTHS.get(season, ()):
+            current = limits.setdefault(month, {}).get(scope)
+            values = (row.min_level, row.max_level, row.max_release)
+            if current is not None:
+                values = (max(current[0], values[0]), min(current[1], values[1]), min(current[2], values[2]))
+            limits[month][scope] = values
+    if not limits:
+        return None
+
+    table = np.full((13, 3), [-np.inf, np.inf, np.inf])
+    for month, scopes in limits.items():
+        table[month] = scopes.get("season", scopes.get("all"))
+    by_day = table[MONTH_OF_DAY]
+    return ConstraintTimeline(min_level=by_day[:, 0], max_level=by_day[:, 1], max_release=by_day[:, 2])
+
+
+def level_to_storage(reservoir: Reservoir, level):
+    # Linear level-storage curve between the reservoir's minimum (dead storage) and maximum levels.
+    span = max(reservoir.max_level - reservoir.min_level, 1e-6)
+    fraction = (np.asarray(level, dtype=float) - reservoir.min_level) / span
+    return np.clip(fraction, 0.0, 1.0) * reservoir.storage_capacity
+
+
+class TimelineCache:
+    # Timelines per reservoir, each with a fingerprint of the constraint rows it was built from. Every lookup
+    # re-reads those rows (a handful per reservoir) and rebuilds only the timelines whose rows changed, so edits
+    # made through SQL or by another worker apply to the next plan without any invalidation.
+    def __init__(self):
+        self._timelines: Dict[str, Tuple[int, Optional[ConstraintTimeline]]] = {}
+        self._lock = Lock()
+
+    def get_many(self, db: Session, reservoir_ids: List[str]) -> Dict[str, Optional[ConstraintTimeline]]:
+        rows: Dict[str, list] = {rid: [] for rid in reservoir_ids}
+        query = db.query(
+            SafetyConstraint.id,
+            SafetyConstraint.reservoir_id,
+            SafetyConstraint.season,
+            SafetyConstraint.min_level,
+            SafetyConstraint.max_level,
+            SafetyConstraint.max_release,
+        ).filter(SafetyConstraint.reservoir_id.in_(reservoir_ids))
+        for row in query.order_by(SafetyConstraint.id):
+            rows[row.reservoir_id].append(row)
+
+        found: Dict[str, Optional[ConstraintTimeline]] = {}
+        for rid, reservoir_rows in rows.items():
+            fingerprint = hash(tuple(tuple(row) for row in reservoir_rows))
+            with self._lock:
+                cached = self._timelines.get(rid)
+            if cached is None or cached[0] != fingerprint:
+                # Built outside the lock; the entry carries its own fingerprint, so a concurrent build from
+                # older rows is simply rebuilt on the next lookup.
+                cached = (fingerprint, build_timeline(reservoir_rows))
+                with self._lock:
+                    self._timelines[rid] = cached
+            found[rid] = cached[1]
+        return found
+
+    def get(self, db: Session, reservoir_id: str) -> Optional[ConstraintTimeline]:
+        return self.get_many(db, [reservoir_id])[reservoir_id]
+
+
+timelines = TimelineCache()
+
+
+def effective_limits(
+    timeline: Optional[ConstraintTimeline],
+    reservoir: Reservoir,
+    start: datetime,
+    days: int,
+    *,
+    min_storage: float,
+    max_storage: float,
+    max_release: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Per-day storage bounds and release ceiling: the reservoir's safety envelope, tightened by the caller's
+    # own limits. Without any constraint rows the caller's limits apply unchanged.
+    if timeline is None:
+        return np.full(days, min_storage), np.full(days, max_storage), np.full(days, max_release)
+    min_level, max_level, release = timeline.window(start, days)
+    return (
+        np.maximum(level_to_storage(reservoir, min_level), min_storage),
+        np.minimum(level_to_storage(reservoir, max_level), max_storage),
+        np.minimum(release, max_release),
+    )
+
+
+def primary_reservoir(db: Session) -> Optional[Reservoir]:
+    # Single-reservoir planners (rule, MPC, scenarios) follow the only reservoir, or else the largest one at the
+    # bottom of a cascade.
+    reservoirs = db.query(Reservoir).all()
+    if len(reservoirs) <= 1:
+        return reservoirs[0] if reservoirs else None
+    terminal = [reservoir for reservoir in reservoirs if reservoir.downstream_reservoir_id is None] or reservoirs
+    return max(terminal, key=lambda reservoir: (reservoir.storage_capacity, reservoir.name))
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict
 
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def quality_report_from_dataframe(df: pd.DataFrame) -> Dict[str, Any]:
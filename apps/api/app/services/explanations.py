@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import LLM_EXPLANATIONS
+from app.db.models import OptimizationRun, RunExplanation
+from app.db.session import AsyncSessionLocal
+from app.services.llm_backends import LlmBackendError, LlmRequest, llm_backend
+from app.services.llm_stub import explain_release_decision
+
+logger = logging.getLogger("golestan.explanations")
+
+EXPLAIN_SYSTEM_PROMPT = (
+    "شما توضیح‌دهنده برنامه رهاسازی سامانه تصمیم‌یار سد گلستان به وشمگیر هستید. "
+    "با تکیه فقط بر داده‌های داده‌شده، در چهار تا شش جمله فارسی توضیح دهید چرا این برنامه پیشنهاد شده، "
+    "کدام بخش‌ها کمتر تامین شده‌اند و چه ریسک‌هایی باید پایش شود. عدد جدیدی نسازید."
+)
+
+
+def _explain_request(result: Dict[str, Any], context: Dict[str, Any]) -> LlmRequest:
+    facts = {
+        **{key: value for key, value in context.items() if key not in result},
+        "satisfaction_by_sector": result["satisfaction_by_sector"],
+        "reasons": result["reasons"],
+        "warnings": result["warnings"],
+    }
+    return LlmRequest(
+        messages=[
+            {"role": "system", "content": EXPLAIN_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(facts, ensure_ascii=False, sort_keys=True, default=str)},
+        ],
+        max_tokens=350,
+        temperature=0.0,
+    )
+
+
+async def explain_run(run_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    # The rule-based explanation is always computed; a configured model rewrites its prose, and any backend
+    # failure (busy, timeout, unreachable) falls back to the rule text rather than failing the request.
+    result = explain_release_decision(run_id=run_id, context=context)
+    backend = llm_backend()
+    if not backend.available():
+        return result
+    try:
+        completion = await backend.complete(_explain_request(result, context))
+    except LlmBackendError:
+        return result
+    if completion.text:
+        result.update(explanation=completion.text, provider=backend.provider, model=completion.model)
+    return result
+
+
+def run_context(run: OptimizationRun, overrides: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    summary = run.summary or {}
+    context = {
+        "scenario": (run.params or {}).get("scenario", "normal"),
+        "satisfaction_by_sector": summary.get("satisfaction_by_sector", {}),
+        "drought_risk": summary.get("drought_risk", 0.2),
+        "flood_risk": summary.get("flood_risk", 0.2),
+    }
+    context.update(overrides or {})
+    return context
+
+
+def context_hash(context: Dict[str, Any]) -> str:
+    backend = llm_backend()
+    material = json.dumps(
+        [backend.provider if backend.available() else "rule_engine", backend.model, context],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+async def explanation_for(
+    db: AsyncSession, run: OptimizationRun, overrides: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    # An explanation is fixed once a run and its context are, so it is stored per (run, context hash) and
+    # generated at most once; the hash also covers the backend and model that would produce it.
+    context = run_context(run, overrides)
+    key = context_hash(context)
+    stored = (
+        await db.execute(
+            select(RunExplanation.result).where(RunExplanation.run_id == run.id, RunExplanation.context_hash == key)
+        )
+    ).scalar_one_or_none()
+    if stored is not None:
+        LLM_EXPLANATIONS.labels("stored").inc()
+        return stored
+
+    result = await explain_run(run.id, context)
+    backend = llm_backend()
+    if backend.available() and result["provider"] != backend.provider:
+        # The model was busy or unreachable: serve the rule text now and generate again on the next call.
+        LLM_EXPLANATIONS.labels("fallback").inc()
+        return result
+
+    LLM_EXPLANATIONS.labels("generated").inc()
+    db.add(RunExplanation(run_id=run.id, context_hash=key, context=context, result=result))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+    return result
+
+
+async def precompute_explanation(run_id: str) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            run = await db.get(OptimizationRun, run_id)
+            if run is not None:
+                await explanation_for(db, run)
+    except Exception:
+        logger.exception(f"Precomputing the explanation for run {run_id} failed")
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.metrics import FORECAST_RUNS
 from app.db.models import ForecastPoint, ForecastRun, SectorDemand, TimeseriesPoint
 
 SCENARIO_MULTIPLIER = {
@@ -14,98 +15,175 @@ SCENARIO_MULTIPLIER = {
     "normal": 1.0,
     "dry": 0.82,
 }
+# The baseline forecasts the mean (and band) of the most recent observations.
+FORECAST_WINDOW = 30
 
 
-def _load_series(db: Session, entity: str) -> List[Tuple[datetime, float]]:
+def _load_series(db: Session, entity: str, after: datetime | None = None) -> List[Tuple[datetime, float]]:
     if entity == "demand":
-        rows = (
-            db.query(SectorDemand.ts, func.sum(SectorDemand.value))
-            .group_by(SectorDemand.ts)
-            .order_by(SectorDemand.ts.asc())
-            .all()
-        )
+        query = db.query(SectorDemand.ts, func.sum(SectorDemand.value))
+        if after is not None:
+            query = query.filter(SectorDemand.ts > after)
+        rows = query.group_by(SectorDemand.ts).order_by(SectorDemand.ts.asc()).all()
         return [(ts, float(value)) for ts, value in rows]
 
     metric = "inflow" if entity == "inflow" else "storage"
-    rows = (
-        db.query(TimeseriesPoint.ts, TimeseriesPoint.value)
-        .filter(TimeseriesPoint.metric == metric)
-        .order_by(TimeseriesPoint.ts.asc())
-        .all()
-    )
+    query = db.query(TimeseriesPoint.ts, TimeseriesPoint.value).filter(TimeseriesPoint.metric == metric)
+    if after is not None:
+        query = query.filter(TimeseriesPoint.ts > after)
+    rows = query.order_by(TimeseriesPoint.ts.asc()).all()
     return [(ts, float(value)) for ts, value in rows]
 
 
-def _calc_metrics(values: List[float]) -> Dict[str, float]:
-    if len(values) < 3:
+def _empty_state() -> Dict[str, Any]:
+    # Everything the baseline model needs from the history: the last FORECAST_WINDOW values for the level and
+    # volatility, and running sums of the one-step (persistence) errors for MAE/RMSE/MAPE. `rows` counts the
+    # stored rows folded in so far.
+    return {"count": 0, "rows": 0, "window": [], "errors": {"n": 0, "abs": 0.0, "sq": 0.0, "ape": 0.0, "ape_n": 0}}
+
+
+def _advance(state: Dict[str, Any], values: List[float]) -> Dict[str, Any]:
+    # O(1) per observation; returns a new state so the stored one is never mutated in place.
+    window = list(state["window"])
+    errors = dict(state["errors"])
+    for value in values:
+        if window:
+            error = value - window[-1]
+            errors["n"] += 1
+            errors["abs"] += abs(error)
+            errors["sq"] += error * error
+            if abs(value) > 1e-6:
+                errors["ape"] += abs(error / value)
+                errors["ape_n"] += 1
+        window.append(value)
+        if len(window) > FORECAST_WINDOW:
+            del window[0]
+    return {**state, "count": state["count"] + len(values), "window": window, "errors": errors}
+
+
+def _state_metrics(state: Dict[str, Any]) -> Dict[str, float]:
+    errors = state["errors"]
+    if state["count"] < 3:
         return {"mae": 0.0, "rmse": 0.0, "mape": 0.0}
 
-    arr = np.array(values, dtype=float)
-    y_true = arr[1:]
-    y_pred = arr[:-1]
+    mae = errors["abs"] / errors["n"]
+    rmse = float(np.sqrt(errors["sq"] / errors["n"]))
+    mape = errors["ape"] / errors["ape_n"] * 100 if errors["ape_n"] else 0.0
+    return {"mae": round(mae, 3), "rmse": round(rmse, 3), "mape": round(mape, 3)}
+
+
+def _state_level(state: Dict[str, Any]) -> Tuple[float, float]:
+    window = state["window"]
+    if not window:
+        return 100.0, 10.0
+    base = float(np.mean(window))
+    volatility = float(np.std(window)) if len(window) > 1 else max(base * 0.1, 1.0)
+    return base, volatility
+
+
+def _latest_state_run(db: Session, entity: str) -> ForecastRun | None:
+    return (
+        db.query(ForecastRun)
+        .filter(ForecastRun.entity == entity, ForecastRun.status == "completed", ForecastRun.state.isnot(None))
+        .order_by(ForecastRun.created_at.desc())
+        .first()
+    )
 
-    mae = float(np.mean(np.abs(y_true - y_pred)))
-    rmse = float(np.sqrt(np.mean((y_true - y_pred) ** 2)))
 
-    non_zero_mask = np.abs(y_true) > 1e-6
-    if np.any(non_zero_mask):
-        mape = float(np.mean(np.abs((y_true[non_zero_mask] - y_pred[non_zero_mask]) / y_true[non_zero_mask])) * 100)
+def _series_rows(db: Session, entity: str, until: datetime | None) -> int:
+    # Stored rows behind the series up to `until`: an index-only count, used to notice back-filled history.
+    if entity == "demand":
+        query = db.query(func.count()).select_from(SectorDemand)
+        return int(query.filter(SectorDemand.ts <= until).scalar() if until is not None else query.scalar())
+    metric = "inflow" if entity == "inflow" else "storage"
+    query = db.query(func.count()).select_from(TimeseriesPoint).filter(TimeseriesPoint.metric == metric)
+    return int(query.filter(TimeseriesPoint.ts <= until).scalar() if until is not None else query.scalar())
+
+
+def _refresh_state(
+    db: Session, entity: str, *, full: bool = False
+) -> Tuple[Dict[str, Any], datetime | None, datetime | None]:
+    # Continue from the entity's latest stored state with only the observations after its window. Training,
+    # a missing state, or rows back-filled into the stored window fall back to one scan of the whole history.
+    previous = None if full else _latest_state_run(db, entity)
+    if previous is not None and _series_rows(db, entity, previous.data_window_end) != previous.state.get("rows"):
+        previous = None
+    if previous is None:
+        series = _load_series(db, entity)
+        state, window_start = _empty_state(), series[0][0] if series else None
+        window_end = series[-1][0] if series else None
     else:
-        mape = 0.0
+        series = _load_series(db, entity, after=previous.data_window_end)
+        state, window_start = previous.state, previous.data_window_start or (series[0][0] if series else None)
+        window_end = series[-1][0] if series else previous.data_window_end
+    state = _advance(state, [value for _, value in series])
+    state["rows"] = _series_rows(db, entity, window_end)
+    return state, window_start, window_end
 
-    return {"mae": round(mae, 3), "rmse": round(rmse, 3), "mape": round(mape, 3)}
+
+def _forecast_points(
+    run_id: str, now: datetime, horizon_days: int, *, base: float, volatility: float, trend: float
+) -> List[ForecastPoint]:
+    points: List[ForecastPoint] = []
+    for i in range(horizon_days):
+        day = now + timedelta(days=i + 1)
+        growth_factor = 1.0 + trend * (i / max(horizon_days, 1))
+        pred = max(0.0, base * growth_factor)
+        band = max(1.0, volatility * 0.8)
+
+        points.append(
+            ForecastPoint(
+                run_id=run_id,
+                metric="value",
+                ts=day,
+                predicted_value=round(pred, 3),
+                lower_bound=round(max(0.0, pred - band), 3),
+                upper_bound=round(pred + band, 3),
+            )
+        )
+    return points
 
 
 def train_forecast_model(db: Session, entity: str, created_by: str | None = None) -> ForecastRun:
-    series = _load_series(db, entity)
-    values = [v for _, v in series]
-    metrics = _calc_metrics(values)
+    state, window_start, window_end = _refresh_state(db, entity, full=True)
 
     run = ForecastRun(
         entity=entity,
         model_name="demo_baseline_v1",
         status="completed",
-        data_window_start=series[0][0] if series else None,
-        data_window_end=series[-1][0] if series else None,
-        metrics=metrics,
+        data_window_start=window_start,
+        data_window_end=window_end,
+        metrics=_state_metrics(state),
         confidence=0.8,
         scenario="normal",
+        state=state,
         created_by=created_by,
         completed_at=datetime.now(timezone.utc),
     )
     db.add(run)
     db.commit()
     db.refresh(run)
+    FORECAST_RUNS.labels("train", "normal").inc()
     return run
 
 
 def run_forecast(db: Session, entity: str, horizon_days: int, scenario: str, created_by: str | None = None) -> ForecastRun:
-    series = _load_series(db, entity)
-    values = [v for _, v in series]
-    metrics = _calc_metrics(values)
+    state, window_start, window_end = _refresh_state(db, entity)
+    base, volatility = _state_level(state)
 
     multiplier = SCENARIO_MULTIPLIER.get(scenario, 1.0)
     now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    if len(values) >= 30:
-        base = float(np.mean(values[-30:]))
-        volatility = float(np.std(values[-30:]))
-    elif values:
-        base = float(np.mean(values))
-        volatility = float(np.std(values)) if len(values) > 1 else max(base * 0.1, 1.0)
-    else:
-        base = 100.0
-        volatility = 10.0
-
     run = ForecastRun(
         entity=entity,
         model_name="demo_baseline_v1",
         status="completed",
-        data_window_start=series[0][0] if series else None,
-        data_window_end=series[-1][0] if series else None,
-        metrics=metrics,
+        data_window_start=window_start,
+        data_window_end=window_end,
+        metrics=_state_metrics(state),
         confidence=0.8,
         scenario=scenario,
+        state=state,
         created_by=created_by,
         completed_at=datetime.now(timezone.utc),
     )
@@ -113,26 +191,10 @@ def run_forecast(db: Session, entity: str, horizon_days: int, scenario: str, cre
     db.flush()
 
     trend = 0.02 if scenario == "wet" else (-0.02 if scenario == "dry" else 0.0)
-
-    points: List[ForecastPoint] = []
-    for i in range(horizon_days):
-        day = now + timedelta(days=i + 1)
-        growth_factor = 1.0 + trend * (i / max(horizon_days, 1))
-        pred = max(0.0, base * multiplier * growth_factor)
-        band = max(1.0, volatility * 0.8)
-
-        points.append(
-            ForecastPoint(
-                run_id=run.id,
-                metric="value",
-                ts=day,
-                predicted_value=round(pred, 3),
-                lower_bound=round(max(0.0, pred - band), 3),
-                upper_bound=round(pred + band, 3),
-            )
-        )
+    points = _forecast_points(run.id, now, horizon_days, base=base * multiplier, volatility=volatility, trend=trend)
 
     db.add_all(points)
     db.commit()
     db.refresh(run)
+    FORECAST_RUNS.labels("forecast", scenario).inc()
     return run
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from app.core.config import get_settings
+from app.core.metrics import LLM_BATCH_SIZE, LLM_QUEUE_SECONDS, LLM_REJECTED
+from app.services.llm_gateway import post_with_retry, stream_with_retry
+
+
+class LlmBackendError(Exception):
+    pass
+
+
+class LlmBusy(LlmBackendError):
+    pass
+
+
+@dataclass(frozen=True)
+class LlmRequest:
+    messages: List[Dict[str, str]]
+    max_tokens: int = 450
+    temperature: float = 0.2
+
+    def key(self) -> str:
+        return json.dumps([self.messages, self.max_tokens, self.temperature], ensure_ascii=False)
+
+
+@dataclass
+class LlmCompletion:
+    text: str
+    model: str
+
+
+def _completion_payload(model: str, request: LlmRequest, stream: bool = False) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": request.messages,
+        "temperature": request.temperature,
+        "max_tokens": request.max_tokens,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _completion_from(data: Dict[str, Any], model: str) -> LlmCompletion:
+    text = (data.get("choices") or [{}])[0].get("message", {}).get("content") or ""
+    return LlmCompletion(text=text.strip(), model=data.get("model") or model)
+
+
+async def _stream_chunks(response: httpx.Response, model: str) -> AsyncIterator[LlmCompletion]:
+    async for line in response.aiter_lines():
+        # OpenAI-style SSE: "data: {chunk}" lines, ": keep-alive" comments, and a final "data: [DONE]".
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        model = chunk.get("model") or model
+        delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+        if delta:
+            yield LlmCompletion(text=delta, model=model)
+
+
+class LlmBackend(ABC):
+    provider = ""
+
+    @property
+    @abstractmethod
+    def model(self) -> str:
+        ...
+
+    @abstractmethod
+    def available(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def complete(self, request: LlmRequest) -> LlmCompletion:
+        ...
+
+    async def stream(self, request: LlmRequest) -> AsyncIterator[LlmCompletion]:
+        yield await self.complete(request)
+
+
+class GatewayBackend(LlmBackend):
+    # OpenRouter or any other remote OpenAI-compatible API, through the pooled client in llm_gateway.
+    provider = "llm_gateway"
+
+    @property
+    def model(self) -> str:
+        return get_settings().openrouter_model
+
+    def available(self) -> bool:
+        return bool(get_settings().openrouter_api_key)
+
+    def _request(self, request: LlmRequest, stream: bool = False) -> Dict[str, Any]:
+        settings = get_settings()
+        return {
+            "url": f"{settings.openrouter_base_url.rstrip('/')}/chat/completions",
+            "headers": {
+                "Authorization": f"Bearer {settings.openrouter_api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": settings.openrouter_site_url,
+                "X-Title": settings.openrouter_app_name,
+            },
+            "json": _completion_payload(settings.openrouter_model, request, stream),
+        }
+
+    async def complete(self, request: LlmRequest) -> LlmCompletion:
+        try:
+            response = await post_with_retry(**self._request(request))
+            return _completion_from(response.json(), self.model)
+        except (httpx.HTTPError, ValueError) as exc:
+            raise LlmBackendError(str(exc)) from exc
+
+    async def stream(self, request: LlmRequest) -> AsyncIterator[LlmCompletion]:
+        try:
+            async with stream_with_retry(**self._request(request, stream=True)) as response:
+                async for chunk in _stream_chunks(response, self.model):
+                    yield chunk
+        except httpx.HTTPError as exc:
+            raise LlmBackendError(str(exc)) from exc
+
+
+@dataclass
+class _Job:
+    request: LlmRequest
+    future: asyncio.Future
+    deadline: float
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    sink: Optional[asyncio.Queue] = None
+
+
+class _Batcher:
+    # Requests that arrive within one window are sent to the server together, at most batch_size at a time, so a
+    # server with that many parallel slots decodes them as one batch. Identical waiting requests share a job.
+    # One batcher per event loop, like the pooled HTTP clients.
+    def __init__(self, backend: "LocalBackend"):
+        self.backend = backend
+        self.loop = asyncio.get_running_loop()
+        self._queue: Deque[_Job] = deque()
+        self._waiting: Dict[str, _Job] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, request: LlmRequest, sink: Optional[asyncio.Queue] = None) -> _Job:
+        settings = get_settings()
+        key = request.key() if sink is None else None
+        if key is not None and key in self._waiting:
+            return self._waiting[key]
+        if len(self._queue) >= settings.local_llm_queue_max:
+            LLM_REJECTED.labels(self.backend.provider, "queue_full").inc()
+            raise LlmBusy("local LLM queue is full")
+        job = _Job(
+            request=request,
+            future=self.loop.create_future(),
+            deadline=time.monotonic() + settings.local_llm_request_timeout_seconds,
+            sink=sink,
+        )
+        # Waiters may give up before the job runs; retrieve the outcome so asyncio does not log it as lost.
+        job.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._queue.append(job)
+        if key is not None:
+            self._waiting[key] = job
+            job.future.add_done_callback(lambda _: self._waiting.pop(key, None))
+        if self._task is None or self._task.done():
+            self._task = self.loop.create_task(self._dispatch())
+        self._wakeup.set()
+        return job
+
+    async def _dispatch(self) -> None:
+        settings = get_settings()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                if len(self._queue) < settings.local_llm_batch_size:
+                    await asyncio.sleep(settings.local_llm_batch_window_ms / 1000)
+                batch: List[_Job] = []
+                while self._queue and len(batch) < settings.local_llm_batch_size:
+                    job = self._queue.popleft()
+                    if job.future.done():
+                        continue
+                    if time.monotonic() > job.deadline:
+                        LLM_REJECTED.labels(self.backend.provider, "timeout").inc()
+                        job.future.set_exception(LlmBusy("timed out waiting for the local LLM"))
+                        if job.sink is not None:
+                            job.sink.put_nowait(None)
+                        continue
+                    batch.append(job)
+                if not batch:
+                    continue
+                LLM_BATCH_SIZE.labels(self.backend.provider).observe(len(batch))
+                started = time.perf_counter()
+                for job in batch:
+                    LLM_QUEUE_SECONDS.labels(self.backend.provider).observe(started - job.enqueued_at)
+                await asyncio.gather(*(self._run(job) for job in batch))
+
+    async def _run(self, job: _Job) -> None:
+        try:
+            result = await self.backend._send(job.request, job.sink)
+        except Exception as exc:
+            error = exc if isinstance(exc, LlmBackendError) else LlmBackendError(str(exc))
+            if not job.future.done():
+                job.future.set_exception(error)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            if job.sink is not None:
+                job.sink.put_nowait(None)
+
+
+async def _close_state(client: httpx.AsyncClient, batcher: _Batcher) -> None:
+    # Either step raises "Event loop is closed" when the batcher's loop is gone; the sockets are released anyway.
+    if batcher._task is not None:
+        with contextlib.suppress(RuntimeError):
+            batcher._task.cancel()
+    with contextlib.suppress(RuntimeError):
+        await client.aclose()
+
+
+class LocalBackend(LlmBackend):
+    # An OpenAI-compatible server on the host (llama.cpp llama-server, vLLM, Ollama) for sites without
+    # internet access. Calls are admitted through a bounded queue and dispatched in small batches.
+    provider = "local_llm"
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._batcher: _Batcher | None = None
+        self._retiring: set[asyncio.Task] = set()
+
+    @property
+    def model(self) -> str:
+        return get_settings().local_llm_model
+
+    def available(self) -> bool:
+        return bool(get_settings().local_llm_base_url)
+
+    def _loop_state(self) -> tuple[httpx.AsyncClient, _Batcher]:
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.loop is not loop:
+            if self._client is not None and self._batcher is not None:
+                self._retire(self._client, self._batcher)
+            settings = get_settings()
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.local_llm_timeout_seconds, connect=5.0),
+                limits=httpx.Limits(max_connections=settings.local_llm_batch_size * 2),
+            )
+            self._batcher = _Batcher(self)
+        return self._client, self._batcher
+
+    def _retire(self, client: httpx.AsyncClient, batcher: _Batcher) -> None:
+        # The previous loop's client still holds its pooled sockets. Close it on that loop while it runs; once the
+        # loop is closed, aclose() still releases the sockets before failing to schedule its callbacks there.
+        closing = _close_state(client, batcher)
+        if batcher.loop.is_running() and not batcher.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(closing, batcher.loop)
+        else:
+            task = asyncio.get_running_loop().create_task(closing)
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+
+    async def _send(self, request: LlmRequest, sink: Optional[asyncio.Queue]) -> LlmCompletion:
+        client, _ = self._loop_state()
+        url = f"{get_settings().local_llm_base_url.rstrip('/')}/chat/completions"
+        try:
+            if sink is None:
+                response = await client.post(url, json=_completion_payload(self.model, request))
+                return _completion_from(response.raise_for_status().json(), self.model)
+            parts: List[str] = []
+            model = self.model
+            async with client.stream("POST", url, json=_completion_payload(self.model, request, True)) as response:
+                response.raise_for_status()
+                async for chunk in _stream_chunks(response, model):
+                    model = chunk.model
+                    parts.append(chunk.text)
+                    sink.put_nowait(chunk)
+            return LlmCompletion(text="".join(parts).strip(), model=model)
+        except (httpx.HTTPError, ValueError) as exc:
+            raise LlmBackendError(str(exc)) from exc
+
+    async def complete(self, request: LlmRequest) -> LlmCompletion:
+        _, batcher = self._loop_state()
+        job = batcher.enqueue(request)
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), get_settings().local_llm_request_timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            LLM_REJECTED.labels(self.provider, "timeout").inc()
+            raise LlmBusy("timed out waiting for the local LLM") from exc
+
+    async def stream(self, request: LlmRequest) -> AsyncIterator[LlmCompletion]:
+        _, batcher = self._loop_state()
+        sink: asyncio.Queue = asyncio.Queue()
+        job = batcher.enqueue(request, sink)
+        timeout = get_settings().local_llm_request_timeout_seconds
+        while True:
+            try:
+                chunk = await asyncio.wait_for(sink.get(), timeout)
+            except asyncio.TimeoutError as exc:
+                job.future.cancel()
+                LLM_REJECTED.labels(self.provider, "timeout").inc()
+                raise LlmBusy("timed out waiting for the local LLM") from exc
+            if chunk is None:
+                break
+            yield chunk
+        await job.future
+
+    async def close(self) -> None:
+        if self._client is not None and self._batcher is not None and self._batcher.loop is asyncio.get_running_loop():
+            await _close_state(self._client, self._batcher)
+        self._client = None
+        self._batcher = None
+
+
+_backends: Dict[str, LlmBackend] = {}
+
+
+def llm_backend() -> LlmBackend:
+    name = get_settings().llm_backend
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _backends[name] = LocalBackend() if name == "local" else GatewayBackend()
+    return backend
+
+
+async def close_llm_backends() -> None:
+    for backend in _backends.values():
+        if isinstance(backend, LocalBackend):
+            await backend.close()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+
+from app.core.config import get_settings
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 10.0
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def llm_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # uvicorn runs one loop per worker, so this is built once; pooled connections cannot cross event loops,
+    # which only matters for harnesses that start a loop per request.
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            http2=settings.openrouter_http2,
+            timeout=httpx.Timeout(settings.openrouter_timeout_seconds, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.openrouter_max_connections,
+                max_keepalive_connections=settings.openrouter_max_keepalive_connections,
+                keepalive_expiry=settings.openrouter_keepalive_expiry_seconds,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_llm_client() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None = None) -> float:
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER_SECONDS)
+    return get_settings().openrouter_retry_backoff_seconds * (2**attempt) * (0.5 + random.random())
+
+
+async def post_with_retry(url: str, **kwargs: Any) -> httpx.Response:
+    retries = get_settings().openrouter_max_retries
+    for attempt in range(retries + 1):
+        try:
+            response = await llm_client().post(url, **kwargs)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            await asyncio.sleep(_retry_delay(attempt, response))
+            continue
+        return response.raise_for_status()
+    raise AssertionError("unreachable")
+
+
+@asynccontextmanager
+async def stream_with_retry(url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+    # Retries only happen before the first byte of the body; once tokens flow, a failure is final.
+    client = llm_client()
+    retries = get_settings().openrouter_max_retries
+    for attempt in range(retries + 1):
+        try:
+            response = await client.send(client.build_request("POST", url, **kwargs), stream=True)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUSES and attempt < retries:
+            await response.aclose()
+            await asyncio.sleep(_retry_delay(attempt, response))
+            continue
+        try:
+            yield response.raise_for_status()
+        finally:
+            await response.aclose()
+        return
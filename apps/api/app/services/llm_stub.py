@@ -32,5 +32,6 @@ def explain_release_decision(run_id: str, context: Dict[str, Any]) -> Dict[str,
         "reasons": reasons,
         "warnings": warnings,
         "satisfaction_by_sector": satisfaction,
+        "provider": "rule_engine",
         "model": "local-rule-based-stub",
     }
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# Soft-constraint weights, relative to a fully unmet day for a weight-1 sector (cost 1). Storage and release
+# bounds are enforced exactly afterwards by repair(); the penalties only keep the optimum close to them.
+STORAGE_PENALTY = 10.0
+RELEASE_PENALTY = 10.0
+TERMINAL_PENALTY = 1.0
+SMOOTHING = 0.1
+SPILL_COST = 0.01
+REGULARIZATION = 1e-9
+
+
+@dataclass
+class MpcProblem:
+    inflow: np.ndarray  # (T,)
+    demands: np.ndarray  # (T, S), strictly positive
+    weights: np.ndarray  # (S,)
+    min_allocations: np.ndarray  # (T, S), e.g. the environmental minimum flow
+    storage: float
+    # Bounds are scalars or (T,) arrays, e.g. a seasonal safety envelope.
+    min_storage: Union[float, np.ndarray]
+    max_storage: Union[float, np.ndarray]
+    min_release: Union[float, np.ndarray]
+    max_release: Union[float, np.ndarray]
+    target_storage: float
+    previous_release: Optional[float] = None
+
+
+@dataclass
+class MpcSolution:
+    release: np.ndarray  # (T,)
+    allocations: np.ndarray  # (T, S)
+    spill: np.ndarray  # (T,)
+    storage: np.ndarray  # (T,) end-of-day storage
+    objective: float
+    iterations: int
+    converged: bool
+
+
+class _Allocator:
+    # Splits a day's release between sectors to minimise sum_s w_s * ((d_s - a_s) / d_s)^2 with
+    # min_s <= a_s <= d_s. The optimum is a_s = d_s - mu / (2 c_s), clipped, for one water price mu per day, so
+    # the total allocated is piecewise linear in mu: precompute it at every breakpoint and interpolate.
+    def __init__(self, problem: MpcProblem):
+        self.demands = problem.demands
+        self.lower = np.minimum(problem.min_allocations, problem.demands)
+        self.cost = problem.weights / problem.demands**2
+        price_at_lower = 2 * self.cost * (self.demands - self.lower)
+        self.prices = np.sort(np.concatenate([np.zeros_like(price_at_lower), price_at_lower], axis=1), axis=1)
+        self.totals = self._allocate(self.prices[:, :, None]).sum(axis=2)  # (T, K), non-increasing in K
+        self.upper_total = self.demands.sum(axis=1)
+        self.lower_total = self.lower.sum(axis=1)
+
+    def _allocate(self, price: np.ndarray) -> np.ndarray:
+        demands, lower, cost = (
+            (self.demands, self.lower, self.cost) if price.ndim == 2 else (
+                self.demands[:, None, :], self.lower[:, None, :], self.cost[:, None, :]
+            )
+        )
+        return np.clip(demands - price / (2 * cost), lower, demands)
+
+    def price(self, total: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Water price mu(total) and its slope -d mu / d total on the active segment.
+        rows = np.arange(len(total))
+        segment = np.clip((self.totals < total[:, None]).argmax(axis=1), 1, self.totals.shape[1] - 1)
+        segment = np.where((self.totals >= total[:, None]).all(axis=1), self.totals.shape[1] - 1, segment)
+        high_total, low_total = self.totals[rows, segment - 1], self.totals[rows, segment]
+        low_price, high_price = self.prices[rows, segment - 1], self.prices[rows, segment]
+        width = np.maximum(high_total - low_total, 1e-12)
+        slope = (high_price - low_price) / width
+        price = low_price + (high_total - total) * slope
+        return price, np.where(high_total - low_total > 1e-12, slope, 0.0)
+
+    def allocations(self, release: np.ndarray) -> np.ndarray:
+        total = np.clip(release, self.lower_total, self.upper_total)
+        price, _ = self.price(total)
+        return self._allocate(price[:, None])
+
+
+class _Objective:
+    def __init__(self, problem: MpcProblem):
+        self.problem = problem
+        self.allocator = _Allocator(problem)
+        self.scale = max(float(problem.demands.sum(axis=1).mean()), 1.0)
+        horizon = len(problem.inflow)
+        self.index = np.arange(horizon)
+        self.latest = np.maximum.outer(self.index, self.index)
+        difference = np.eye(horizon) - np.eye(horizon, k=-1)
+        if problem.previous_release is None:
+            difference = difference[1:]
+        self.smoothing_hessian = 2 * SMOOTHING / self.scale**2 * difference.T @ difference
+
+    def shortfall(self, allocations: np.ndarray) -> float:
+        met = np.minimum(allocations, self.problem.demands)
+        return float((self.problem.weights * ((self.problem.demands - met) / self.problem.demands) ** 2).sum())
+
+    def __call__(self, release: np.ndarray, derivatives: bool = True):
+        problem, allocator, scale = self.problem, self.allocator, self.scale
+        inv = 1.0 / scale**2
+
+        total = np.clip(release, allocator.lower_total, allocator.upper_total)
+        price, slope = allocator.price(total)
+        allocations = allocator._allocate(price[:, None])
+        spill = np.maximum(release - allocator.upper_total, 0.0)
+        deficit = np.maximum(allocator.lower_total - release, 0.0)
+
+        storage = problem.storage + np.cumsum(problem.inflow - release)
+        low = np.maximum(problem.min_storage - storage, 0.0)
+        high = np.maximum(storage - problem.max_storage, 0.0)
+        over = np.maximum(release - problem.max_release, 0.0)
+        under = np.maximum(problem.min_release - release, 0.0)
+        carry = max(problem.target_storage - storage[-1], 0.0)
+        previous = release[0] if problem.previous_release is None else problem.previous_release
+        steps = np.diff(release, prepend=previous)
+
+        value = float(
+            self.shortfall(allocations)
+            + SPILL_COST * spill.sum() / scale
+            + RELEASE_PENALTY * inv * ((deficit**2).sum() + (over**2).sum() + (under**2).sum())
+            + STORAGE_PENALTY * inv * ((low**2).sum() + (high**2).sum())
+            + TERMINAL_PENALTY * inv * carry**2
+            + SMOOTHING * inv * (steps**2).sum()
+        )
+        if not derivatives:
+            return value
+
+        # Storage on day k falls by one unit for every unit released on any day t <= k.
+        d_storage = 2 * STORAGE_PENALTY * inv * (high - low)
+        d_storage[-1] -= 2 * TERMINAL_PENALTY * inv * carry
+        curvature = 2 * STORAGE_PENALTY * inv * ((low > 0) | (high > 0))
+        curvature[-1] += 2 * TERMINAL_PENALTY * inv * (carry > 0)
+
+        gradient = -np.cumsum(d_storage[::-1])[::-1]
+        gradient += -price * ((release > allocator.lower_total) & (release < allocator.upper_total))
+        gradient += SPILL_COST / scale * (release > allocator.upper_total)
+        gradient += 2 * RELEASE_PENALTY * inv * (over - under - deficit)
+        smooth = 2 * SMOOTHING * inv * steps
+        gradient += smooth
+        gradient[:-1] -= smooth[1:]
+        if problem.previous_release is None:
+            gradient[0] -= smooth[0]
+
+        inside = (release > allocator.lower_total) & (release < allocator.upper_total)
+        diagonal = slope * inside + 2 * RELEASE_PENALTY * inv * ((over > 0) | (under > 0) | (deficit > 0))
+        hessian = np.cumsum(curvature[::-1])[::-1][self.latest] + self.smoothing_hessian
+        hessian[self.index, self.index] += diagonal + REGULARIZATION
+        return value, gradient, hessian
+
+
+def shift_release(release: np.ndarray, days: int, horizon: int) -> np.ndarray:
+    # Receding horizon: drop the days already executed and repeat the last planned day to fill the new tail.
+    remaining = release[days:]
+    if len(remaining) == 0:
+        raise ValueError("previous plan does not reach the new horizon")
+    if len(remaining) < horizon:
+        remaining = np.concatenate([remaining, np.repeat(remaining[-1:], horizon - len(remaining))])
+    return remaining[:horizon]
+
+
+def score(problem: MpcProblem, release: np.ndarray, allocations: np.ndarray) -> float:
+    # The objective of any plan, e.g. the rule planner's, on the same terms that solve() minimises.
+    objective = _Objective(problem)
+    optimal = objective.allocator.allocations(release)
+    return objective(release, derivatives=False) - objective.shortfall(optimal) + objective.shortfall(allocations)
+
+
+def _solution(problem: MpcProblem, objective: _Objective, release: np.ndarray, iterations: int, converged: bool):
+    allocations = objective.allocator.allocations(release)
+    return MpcSolution(
+        release=release,
+        allocations=allocations,
+        spill=release - allocations.sum(axis=1),
+        storage=problem.storage + np.cumsum(problem.inflow - release),
+        objective=objective(release, derivatives=False),
+        iterations=iterations,
+        converged=converged,
+    )
+
+
+def solve(
+    problem: MpcProblem,
+    initial_release: Optional[np.ndarray] = None,
+    *,
+    max_iterations: int = 50,
+    tolerance: float = 1e-6,
+) -> MpcSolution:
+    # The per-day sector split has a closed form (see _Allocator), which leaves one variable per day: the
+    # release. The objective in those T variables is convex and piecewise quadratic, so a Newton step with
+    # backtracking converges in a few iterations; a warm start from yesterday's plan often needs one or two.
+    objective = _Objective(problem)
+    if initial_release is None:
+        release = np.clip(objective.allocator.upper_total, problem.min_release, problem.max_release).astype(float)
+    else:
+        release = np.asarray(initial_release, dtype=float).copy()
+
+    value, gradient, hessian = objective(release)
+    for iteration in range(1, max_iterations + 1):
+        step = np.linalg.solve(hessian, -gradient)
+        decrease = float(gradient @ step)
+        if -decrease <= tolerance * max(abs(value), 1.0):
+            return _solution(problem, objective, release, iteration, True)
+        size = 1.0
+        while size > 1e-8:
+            candidate = release + size * step
+            candidate_value = objective(candidate, derivatives=False)
+            if candidate_value <= value + 1e-4 * size * decrease:
+                break
+            size /= 2
+        # Near a kink the Newton decrement can stall while the objective no longer moves.
+        stalled = value - candidate_value <= tolerance * max(abs(value), 1.0)
+        release = candidate
+        value, gradient, hessian = objective(release)
+        if stalled:
+            return _solution(problem, objective, release, iteration, True)
+    return _solution(problem, objective, release, max_iterations, False)
+
+
+def repair(problem: MpcProblem, solution: MpcSolution) -> MpcSolution:
+    # Forward pass that makes release and storage bounds hold exactly, with the same precedence as the rule
+    # planner: release limits first, then the storage floor, then the ceiling.
+    release = solution.release.copy()
+    horizon = len(release)
+    bounds = zip(
+        problem.inflow.tolist(),
+        *(
+            np.broadcast_to(np.asarray(bound, dtype=float), (horizon,)).tolist()
+            for bound in (problem.min_release, problem.max_release, problem.min_storage, problem.max_storage)
+        ),
+    )
+    level = problem.storage
+    for day, (inflow, min_release, max_release, min_storage, max_storage) in enumerate(bounds):
+        target = min(max(release[day], min_release), max_release)
+        if level + inflow - target < min_storage:
+            target = min(max(level + inflow - min_storage, min_release), max_release)
+        if level + inflow - target > max_storage:
+            target = min(max(level + inflow - max_storage, min_release), max_release)
+        release[day] = target
+        level += inflow - target
+    return _solution(problem, _Objective(problem), release, solution.iterations, solution.converged)
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models import DownstreamNode, Reservoir, TimeseriesPoint
+from app.services import mpc
+from app.services.constraints import effective_limits, timelines
+
+# Water delivered to these node types returns to the river and reaches the next reservoir downstream.
+NON_CONSUMPTIVE_NODES = {"environment"}
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+class NetworkTopologyError(ValueError):
+    pass
+
+
+@dataclass
+class NodeSpec:
+    id: str
+    name: str
+    node_type: str
+    weight: float
+    demand: float
+    min_allocation: float = 0.0
+
+
+@dataclass
+class ReservoirSpec:
+    id: str
+    name: str
+    inflow: np.ndarray  # (T,) local inflow, before anything arriving from upstream
+    storage: float
+    min_storage: np.ndarray  # (T,) per-day bounds from the reservoir's constraint timeline
+    max_storage: np.ndarray
+    min_release: float
+    max_release: np.ndarray
+    downstream_id: Optional[str] = None
+    nodes: List[NodeSpec] = field(default_factory=list)
+
+
+@dataclass
+class ReservoirPlan:
+    reservoir_id: str
+    inflow: np.ndarray
+    release: np.ndarray
+    storage: np.ndarray
+    allocations: np.ndarray  # (T, nodes)
+    outflow: np.ndarray  # what continues downstream
+    iterations: int
+    solve_ms: float
+
+
+def _clip(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def _series_values(
+    db: Session, entity_type: str, metric: str, codes: List[str]
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    latest_ts = (
+        db.query(TimeseriesPoint.entity_id, func.max(TimeseriesPoint.ts).label("ts"))
+        .filter(TimeseriesPoint.entity_type == entity_type, TimeseriesPoint.metric == metric)
+        .filter(TimeseriesPoint.entity_id.in_(codes))
+        .group_by(TimeseriesPoint.entity_id)
+        .subquery()
+    )
+    latest = dict(
+        db.query(TimeseriesPoint.entity_id, TimeseriesPoint.value)
+        .join(latest_ts, (TimeseriesPoint.entity_id == latest_ts.c.entity_id) & (TimeseriesPoint.ts == latest_ts.c.ts))
+        .filter(TimeseriesPoint.entity_type == entity_type, TimeseriesPoint.metric == metric)
+        .all()
+    )
+    average = dict(
+        db.query(TimeseriesPoint.entity_id, func.avg(TimeseriesPoint.value))
+        .filter(TimeseriesPoint.entity_type == entity_type, TimeseriesPoint.metric == metric)
+        .filter(TimeseriesPoint.entity_id.in_(codes))
+        .group_by(TimeseriesPoint.entity_id)
+        .all()
+    )
+    return latest, average
+
+
+def load_network(
+    db: Session,
+    start: datetime,
+    *,
+    inflow_profile: np.ndarray,
+    sector_demands: Dict[str, float],
+    weights: Dict[str, float],
+    constraints: Dict[str, Any],
+) -> List[ReservoirSpec]:
+    # Storage and local inflow come from each reservoir's own series (entity_id = Reservoir.code); per-day
+    # storage bounds and release ceiling from its seasonal SafetyConstraint timeline. Nodes without a reservoir
+    # belong to the only reservoir when there is just one.
+    reservoirs = db.query(Reservoir).order_by(Reservoir.name).all()
+    nodes = db.query(DownstreamNode).order_by(DownstreamNode.priority, DownstreamNode.name).all()
+    envelopes = timelines.get_many(db, [reservoir.id for reservoir in reservoirs])
+    horizon = len(inflow_profile)
+
+    codes = [reservoir.code for reservoir in reservoirs if reservoir.code]
+    storage_now, _ = _series_values(db, "reservoir", "storage", codes)
+    _, inflow_average = _series_values(db, "hydrology", "inflow", codes)
+
+    nodes_by_reservoir: Dict[str, List[DownstreamNode]] = defaultdict(list)
+    for node in nodes:
+        owner = node.reservoir_id or (reservoirs[0].id if len(reservoirs) == 1 else None)
+        if owner is not None:
+            nodes_by_reservoir[owner].append(node)
+    nodes_per_type: Dict[str, int] = defaultdict(int)
+    for node in nodes:
+        if node.demand is None:
+            nodes_per_type[node.node_type] += 1
+
+    min_env_flow = float(constraints.get("min_env_flow", 22.0))
+    overrides = constraints.get("reservoirs") or {}
+    specs: List[ReservoirSpec] = []
+    for reservoir in reservoirs:
+        node_specs = [
+            NodeSpec(
+                id=node.id,
+                name=node.name,
+                node_type=node.node_type,
+                # An explicit weight (by node name, then type) wins; otherwise priority 1 weighs most.
+                weight=max(0.1, float(weights.get(node.name, weights.get(node.node_type, 1 / max(node.priority, 1))))),
+                demand=float(
+                    node.demand
+                    if node.demand is not None
+                    else sector_demands.get(node.node_type, 0.0) / nodes_per_type[node.node_type]
+                ),
+                min_allocation=min_env_flow if node.node_type == "environment" else 0.0,
+            )
+            for node in nodes_by_reservoir.get(reservoir.id, [])
+        ]
+        override = overrides.get(reservoir.name) or {}
+        min_storage, max_storage, max_release = effective_limits(
+            envelopes[reservoir.id],
+            reservoir,
+            start,
+            horizon,
+            min_storage=float(override.get("min_storage", 0.0)),
+            max_storage=float(override.get("max_storage", reservoir.storage_capacity)),
+            max_release=float(override.get("max_release", np.inf)),
+        )
+        specs.append(
+            ReservoirSpec(
+                id=reservoir.id,
+                name=reservoir.name,
+                inflow=float(inflow_average.get(reservoir.code, 0.0)) * inflow_profile,
+                storage=float(storage_now.get(reservoir.code, 0.5 * reservoir.storage_capacity)),
+                min_storage=min_storage,
+                max_storage=max_storage,
+                min_release=float(override.get("min_release", sum(n.min_allocation for n in node_specs))),
+                max_release=max_release,
+                downstream_id=reservoir.downstream_reservoir_id,
+                nodes=node_specs,
+            )
+        )
+    return specs
+
+
+def subnetworks(reservoirs: List[ReservoirSpec]) -> List[List[ReservoirSpec]]:
+    # Connected components of the downstream links, each ordered upstream first. Components share no water,
+    # so they can be solved independently.
+    by_id = {reservoir.id: reservoir for reservoir in reservoirs}
+    parent = {reservoir.id: reservoir.id for reservoir in reservoirs}
+
+    def root(node: str) -> str:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    upstream_count: Dict[str, int] = defaultdict(int)
+    for reservoir in reservoirs:
+        if reservoir.downstream_id in by_id:
+            parent[root(reservoir.id)] = root(reservoir.downstream_id)
+            upstream_count[reservoir.downstream_id] += 1
+
+    components: Dict[str, List[ReservoirSpec]] = defaultdict(list)
+    for reservoir in reservoirs:
+        components[root(reservoir.id)].append(reservoir)
+
+    ordered: List[List[ReservoirSpec]] = []
+    for members in components.values():
+        ready = [reservoir for reservoir in members if upstream_count[reservoir.id] == 0]
+        order: List[ReservoirSpec] = []
+        while ready:
+            reservoir = ready.pop()
+            order.append(reservoir)
+            if reservoir.downstream_id in by_id:
+                upstream_count[reservoir.downstream_id] -= 1
+                if upstream_count[reservoir.downstream_id] == 0:
+                    ready.append(by_id[reservoir.downstream_id])
+        if len(order) != len(members):
+            # Reservoirs on a downstream cycle never run out of upstream neighbours, so none of them is ever ready.
+            placed = {reservoir.id for reservoir in order}
+            cycle = sorted(reservoir.name for reservoir in members if reservoir.id not in placed)
+            raise NetworkTopologyError(f"Downstream links form a cycle through: {', '.join(cycle)}")
+        ordered.append(order)
+    return ordered
+
+
+def _pass_through(reservoir: ReservoirSpec, inflow: np.ndarray) -> np.ndarray:
+    # A reservoir with no nodes of its own keeps its storage where it is, within its bounds.
+    release = np.empty_like(inflow)
+    level = reservoir.storage
+    bounds = zip(
+        inflow.tolist(), reservoir.min_storage.tolist(), reservoir.max_storage.tolist(), reservoir.max_release.tolist()
+    )
+    for day, (day_inflow, min_storage, max_storage, max_release) in enumerate(bounds):
+        target = _clip(day_inflow, level + day_inflow - max_storage, level + day_inflow - min_storage)
+        release[day] = _clip(target, reservoir.min_release, max_release)
+        level += day_inflow - release[day]
+    return release
+
+
+def solve_subnetwork(reservoirs: List[ReservoirSpec]) -> List[ReservoirPlan]:
+    # Upstream first: whatever a reservoir releases and its nodes do not consume is inflow to the next one.
+    arriving: Dict[str, np.ndarray] = defaultdict(lambda: 0.0)
+    plans: List[ReservoirPlan] = []
+    for reservoir in reservoirs:
+        start = time.perf_counter()
+        inflow = reservoir.inflow + arriving[reservoir.id]
+        horizon = len(inflow)
+        iterations = 0
+        if reservoir.nodes:
+            problem = mpc.MpcProblem(
+                inflow=inflow,
+                demands=np.tile([max(node.demand, 1e-6) for node in reservoir.nodes], (horizon, 1)),
+                weights=np.array([node.weight for node in reservoir.nodes]),
+                min_allocations=np.tile([node.min_allocation for node in reservoir.nodes], (horizon, 1)),
+                storage=reservoir.storage,
+                min_storage=reservoir.min_storage,
+                max_storage=reservoir.max_storage,
+                min_release=reservoir.min_release,
+                max_release=np.minimum(reservoir.max_release, 1e12),
+                target_storage=(float(reservoir.min_storage[-1]) + reservoir.storage) / 2,
+            )
+            solution = mpc.repair(problem, mpc.solve(problem))
+            release, allocations, iterations = solution.release, solution.allocations, solution.iterations
+        else:
+            release = _pass_through(reservoir, inflow)
+            allocations = np.zeros((horizon, 0))
+        consumptive = [node.node_type not in NON_CONSUMPTIVE_NODES for node in reservoir.nodes]
+        outflow = release - allocations[:, consumptive].sum(axis=1)
+        if reservoir.downstream_id is not None:
+            arriving[reservoir.downstream_id] = arriving[reservoir.downstream_id] + np.maximum(outflow, 0.0)
+        plans.append(
+            ReservoirPlan(
+                reservoir_id=reservoir.id,
+                inflow=inflow,
+                release=release,
+                storage=reservoir.storage + np.cumsum(inflow - release),
+                allocations=allocations,
+                outflow=outflow,
+                iterations=iterations,
+                solve_ms=(time.perf_counter() - start) * 1000,
+            )
+        )
+    return plans
+
+
+def _network_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Each worker solves whole subnetworks; one BLAS thread per process avoids oversubscribing cores.
+            for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+                os.environ.setdefault(name, "1")
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_network_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def solve_network(reservoirs: List[ReservoirSpec], workers: int | None = None) -> Tuple[List[ReservoirPlan], int]:
+    workers = get_settings().optimization_workers if workers is None else workers
+    groups = subnetworks(reservoirs)
+    if workers <= 0 or len(groups) < 2:
+        return [plan for group in groups for plan in solve_subnetwork(group)], len(groups)
+    # Largest subnetworks first so a long cascade does not start last.
+    groups.sort(key=len, reverse=True)
+    results = _network_executor(workers).map(solve_subnetwork, groups)
+    return [plan for group in results for plan in group], len(groups)
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import httpx
-
-from app.core.config import get_settings
+from app.services import chat_cache, chat_context
+from app.services.llm_backends import LlmBackendError, LlmBusy, LlmRequest, llm_backend
+from app.utils.text import KeywordMatcher, normalize_text
 
 PROJECT_KEYWORDS = {
     "سد",
@@ -62,18 +62,17 @@ SCOPE_REJECTION = (
 BUILDER_REPLY = "این سامانه توسط مرکز راهبری پژوهش و پیشرفت هوش مصنوعی جهاددانشگاهی طراحی و ساخته شده است."
 
 
-def _normalize_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text.strip().lower())
+# Built once at import; PROJECT_KEYWORDS can grow to thousands of terms without slowing the per-message check.
+SCOPE_MATCHER = KeywordMatcher(PROJECT_KEYWORDS)
+BUILDER_PATTERN = re.compile("|".join(f"(?:{pattern})" for pattern in BUILDER_PATTERNS))
 
 
-def _is_builder_question(message: str) -> bool:
-    normalized = _normalize_text(message)
-    return any(re.search(pattern, normalized) for pattern in BUILDER_PATTERNS)
+def _is_builder_question(normalized: str) -> bool:
+    return BUILDER_PATTERN.search(normalized) is not None
 
 
-def _is_in_scope(message: str) -> bool:
-    normalized = _normalize_text(message)
-    return any(keyword in normalized for keyword in PROJECT_KEYWORDS)
+def _is_in_scope(normalized: str) -> bool:
+    return SCOPE_MATCHER.contains_any(normalized)
 
 
 def _system_prompt() -> str:
@@ -86,8 +85,15 @@ def _system_prompt() -> str:
     )
 
 
-async def generate_chat_response(message: str, history: List[Dict[str, str]] | None = None) -> Dict[str, Any]:
-    if _is_builder_question(message):
+CONTEXT_PREFIX = "داده‌های جاری سامانه (در صورت ارتباط با سوال، از همین اعداد استفاده کنید):"
+LLM_ERROR_ANSWER = "در ارتباط با سرویس پاسخ هوشمند خطا رخ داد. لطفا چند دقیقه دیگر دوباره تلاش کنید."
+LLM_BUSY_ANSWER = "سرویس پاسخ هوشمند در حال حاضر مشغول است. لطفا چند لحظه دیگر دوباره تلاش کنید."
+EMPTY_ANSWER = "پاسخ معتبری از مدل دریافت نشد."
+
+
+def _rule_reply(message: str) -> Dict[str, Any] | None:
+    normalized = normalize_text(message)
+    if _is_builder_question(normalized):
         return {
             "answer": BUILDER_REPLY,
             "in_scope": True,
@@ -95,7 +101,7 @@ async def generate_chat_response(message: str, history: List[Dict[str, str]] | N
             "model": "ownership-policy",
         }
 
-    if not _is_in_scope(message):
+    if not _is_in_scope(normalized):
         return {
             "answer": SCOPE_REJECTION,
             "in_scope": False,
@@ -103,8 +109,7 @@ async def generate_chat_response(message: str, history: List[Dict[str, str]] | N
             "model": "scope-guard",
         }
 
-    settings = get_settings()
-    if not settings.openrouter_api_key:
+    if not llm_backend().available():
         return {
             "answer": (
                 "پاسخ این سوال در دامنه پروژه است، اما سرویس پاسخ هوشمند در حال حاضر در دسترس نیست. "
@@ -114,51 +119,104 @@ async def generate_chat_response(message: str, history: List[Dict[str, str]] | N
             "provider": "rule_engine",
             "model": "missing-llm-config",
         }
+    return None
+
 
+def _safe_history(history: List[Dict[str, str]] | None) -> List[Dict[str, str]]:
     safe_history = []
     for item in (history or [])[-8:]:
         role = item.get("role", "")
         content = item.get("content", "").strip()
         if role in {"user", "assistant"} and content:
             safe_history.append({"role": role, "content": content[:3000]})
+    return safe_history
 
+
+def _chat_request(message: str, safe_history: List[Dict[str, str]], context: str = "") -> LlmRequest:
     messages = [{"role": "system", "content": _system_prompt()}]
+    if context:
+        messages.append({"role": "system", "content": f"{CONTEXT_PREFIX}\n{context}"})
     messages.extend(safe_history)
     messages.append({"role": "user", "content": message})
+    return LlmRequest(messages=messages, max_tokens=450, temperature=0.2)
 
-    headers = {
-        "Authorization": f"Bearer {settings.openrouter_api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": settings.openrouter_site_url,
-        "X-Title": settings.openrouter_app_name,
-    }
-    payload = {
-        "model": settings.openrouter_model,
-        "messages": messages,
-        "temperature": 0.2,
-        "max_tokens": 450,
-    }
 
+def _answers_current_data(cache_key: Optional[chat_cache.ChatCacheKey], context_watermark: Optional[str]) -> bool:
+    # Right after the data moves the context still comes from the previous snapshot; such an answer is served
+    # once but not cached under the new watermark.
+    return cache_key is not None and cache_key.watermark == context_watermark
+
+
+def _failure_answer(exc: LlmBackendError) -> str:
+    return LLM_BUSY_ANSWER if isinstance(exc, LlmBusy) else LLM_ERROR_ANSWER
+
+
+async def generate_chat_response(message: str, history: List[Dict[str, str]] | None = None) -> Dict[str, Any]:
+    reply = _rule_reply(message)
+    if reply is not None:
+        return reply
+
+    backend = llm_backend()
+    safe_history = _safe_history(history)
+    cache_key = await chat_cache.cache_key_for(message, safe_history)
+    cached = await chat_cache.lookup(cache_key)
+    if cached is not None:
+        return cached
+
+    context, context_watermark = await chat_context.context_for(message)
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
-    except httpx.HTTPError:
-        return {
-            "answer": "در ارتباط با سرویس پاسخ هوشمند خطا رخ داد. لطفا چند دقیقه دیگر دوباره تلاش کنید.",
-            "in_scope": True,
-            "provider": "llm_gateway",
-            "model": settings.openrouter_model,
-        }
+        completion = await backend.complete(_chat_request(message, safe_history, context))
+    except LlmBackendError as exc:
+        return {"answer": _failure_answer(exc), "in_scope": True, "provider": backend.provider, "model": backend.model}
 
-    answer = (
-        data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        or "پاسخ معتبری از مدل دریافت نشد."
-    )
-    return {
-        "answer": answer,
+    result = {
+        "answer": completion.text or EMPTY_ANSWER,
         "in_scope": True,
-        "provider": "llm_gateway",
-        "model": data.get("model", settings.openrouter_model),
+        "provider": backend.provider,
+        "model": completion.model,
     }
+    if completion.text and _answers_current_data(cache_key, context_watermark):
+        await chat_cache.store(cache_key, result)
+    return result
+
+
+async def stream_chat_response(
+    message: str, history: List[Dict[str, str]] | None = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    reply = _rule_reply(message)
+    if reply is not None:
+        yield "meta", {key: reply[key] for key in ("in_scope", "provider", "model")}
+        yield "token", {"delta": reply["answer"]}
+        yield "done", reply
+        return
+
+    backend = llm_backend()
+    safe_history = _safe_history(history)
+    cache_key = await chat_cache.cache_key_for(message, safe_history)
+    cached = await chat_cache.lookup(cache_key)
+    if cached is not None:
+        yield "meta", {key: cached[key] for key in ("in_scope", "provider", "model", "cached")}
+        yield "token", {"delta": cached["answer"]}
+        yield "done", cached
+        return
+
+    context, context_watermark = await chat_context.context_for(message)
+    model = backend.model
+    yield "meta", {"in_scope": True, "provider": backend.provider, "model": model}
+
+    parts: List[str] = []
+    try:
+        async for chunk in backend.stream(_chat_request(message, safe_history, context)):
+            model = chunk.model
+            parts.append(chunk.text)
+            yield "token", {"delta": chunk.text}
+    except LlmBackendError as exc:
+        code = "llm_busy" if isinstance(exc, LlmBusy) else "llm_unavailable"
+        yield "error", {"code": code, "message": _failure_answer(exc)}
+        return
+
+    answer = "".join(parts).strip()
+    result = {"answer": answer or EMPTY_ANSWER, "in_scope": True, "provider": backend.provider, "model": model}
+    if answer and _answers_current_data(cache_key, context_watermark):
+        await chat_cache.store(cache_key, result)
+    yield "done", result
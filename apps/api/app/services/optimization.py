@@ -1,19 +1,33 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from io import BytesIO
-from typing import Any, Dict, List
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.db.models import OptimizationRun, ReleasePlan, SectorDemand, TimeseriesPoint
+from app.core.metrics import OPTIMIZATION_RUNS, OPTIMIZATION_SOLVE_SECONDS
+from app.db.models import (
+    ForecastPoint,
+    ForecastRun,
+    OptimizationRun,
+    ReleasePlan,
+    Reservoir,
+    SectorDemand,
+    TimeseriesPoint,
+)
+from app.services import mpc
+from app.services.constraints import effective_limits, primary_reservoir, timelines
+from app.services.network import load_network, solve_network
 
 SCENARIO_INFLOW = {"wet": 1.2, "normal": 1.0, "dry": 0.75}
 SCENARIO_DEMAND = {"wet": 0.95, "normal": 1.0, "dry": 1.1}
 SECTORS = ["drinking", "environment", "industry", "agriculture"]
+# How many recent runs to scan for the forecast and the previous MPC plan to start from.
+MPC_LOOKBACK_RUNS = 20
 
 
 def _latest_storage(db: Session) -> float:
@@ -50,60 +64,108 @@ def _clamp(val: float, low: float, high: float) -> float:
     return max(low, min(high, val))
 
 
-def run_optimization(
-    db: Session,
-    *,
-    name: str,
-    horizon_days: int,
-    scenario: str,
-    weights: Dict[str, float],
-    constraints: Dict[str, Any],
-    created_by: str | None,
-) -> OptimizationRun:
-    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+def _seasonal(day_index: int) -> float:
+    return 1.0 + 0.08 * (1 if day_index % 14 < 7 else -1)
 
-    inflow_base = _avg_inflow(db)
-    demand_base = _avg_sector_demands(db)
-    storage = _latest_storage(db)
 
-    min_env_flow = float(constraints.get("min_env_flow", 22.0))
-    min_release = float(constraints.get("min_release", 40.0))
-    max_release = float(constraints.get("max_release", 260.0))
-    min_storage = float(constraints.get("min_storage", 280.0))
-    max_storage = float(constraints.get("max_storage", 1150.0))
+def _day(value: datetime) -> date:
+    return value.date()
 
-    # Ensure all sectors have a positive weight.
-    sector_weights = {s: max(0.1, float(weights.get(s, 1.0))) for s in SECTORS}
 
-    inflow_mult = SCENARIO_INFLOW.get(scenario, 1.0)
-    demand_mult = SCENARIO_DEMAND.get(scenario, 1.0)
+def _day_risk(avg_satisfaction: float, projected: float, max_storage: float) -> Tuple[float, float, float]:
+    drought_risk = max(0.0, 1.0 - avg_satisfaction)
+    flood_risk = _clamp((projected - (0.9 * max_storage)) / (0.1 * max_storage), 0.0, 1.0)
+    risk_index = _clamp((0.65 * drought_risk) + (0.35 * flood_risk), 0.0, 1.0)
+    return drought_risk, flood_risk, risk_index
 
-    run = OptimizationRun(
-        name=name,
-        params={
-            "horizon_days": horizon_days,
-            "scenario": scenario,
-            "weights": sector_weights,
-            "constraints": constraints,
-        },
-        status="completed",
-        created_by=created_by,
-        completed_at=datetime.now(timezone.utc),
-    )
-    db.add(run)
-    db.flush()
 
+def _forecast_inflow(db: Session, scenario: str, now: datetime, horizon_days: int) -> Tuple[Optional[List[float]], str]:
+    # The newest completed inflow forecast for this scenario, else the newest "normal" one scaled to it. Days
+    # past the forecast's own horizon repeat its last value.
+    runs = (
+        db.query(ForecastRun)
+        .filter(ForecastRun.entity == "inflow", ForecastRun.status == "completed")
+        .order_by(ForecastRun.created_at.desc())
+        .limit(MPC_LOOKBACK_RUNS)
+        .all()
+    )
+    run = next((r for r in runs if r.scenario == scenario), None)
+    ratio = 1.0
+    if run is None:
+        run = next((r for r in runs if r.scenario == "normal"), None)
+        ratio = SCENARIO_INFLOW.get(scenario, 1.0)
+    if run is None:
+        return None, "historical_average"
+
+    rows = (
+        db.query(ForecastPoint.ts, ForecastPoint.predicted_value)
+        .filter(ForecastPoint.run_id == run.id)
+        .order_by(ForecastPoint.ts.asc())
+        .all()
+    )
+    values = [max(0.0, float(value) * ratio) for ts, value in rows if _day(ts) > _day(now)][:horizon_days]
+    if not values:
+        return None, "historical_average"
+    values += [values[-1]] * (horizon_days - len(values))
+    return values, f"forecast:{run.id}"
+
+
+def _previous_mpc_plan(db: Session, scenario: str, now: datetime) -> Tuple[Optional[List[float]], Optional[float]]:
+    # Yesterday's MPC solution, minus the days already executed, is the starting point for today's re-solve;
+    # its release for today anchors the smoothing term.
+    runs = (
+        db.query(OptimizationRun)
+        .filter(OptimizationRun.status == "completed")
+        .order_by(OptimizationRun.created_at.desc())
+        .limit(MPC_LOOKBACK_RUNS)
+        .all()
+    )
+    run = next(
+        (r for r in runs if (r.params or {}).get("mode") == "mpc" and (r.params or {}).get("scenario") == scenario),
+        None,
+    )
+    if run is None:
+        return None, None
+    rows = release_plan_rows(db, run.id)
+    today = _day(now)
+    previous = next((row.release_value for row in rows if _day(row.ts) == today), None)
+    upcoming = [row.release_value for row in rows if _day(row.ts) > today]
+    return upcoming or None, previous
+
+
+def _plan_horizon(
+    run_id: str,
+    now: datetime,
+    horizon_days: int,
+    *,
+    inflow_base: float,
+    sector_demands: Dict[str, float],
+    storage: float,
+    sector_weights: Dict[str, float],
+    min_env_flow: float,
+    min_release: float,
+    max_release: float | np.ndarray,
+    min_storage: float | np.ndarray,
+    max_storage: float | np.ndarray,
+    inflow_series: Optional[List[float]] = None,
+) -> Tuple[List[ReleasePlan], Dict[str, List[float]], List[float], List[float]]:
     plans: List[ReleasePlan] = []
     satisfaction_accumulator = {s: [] for s in SECTORS}
     flood_risk_points: List[float] = []
     drought_risk_points: List[float] = []
+    # Storage bounds and the release ceiling are scalars or per-day arrays (the seasonal safety envelope).
+    max_releases, min_storages, max_storages = (
+        np.broadcast_to(np.asarray(bound, dtype=float), (horizon_days,)).tolist()
+        for bound in (max_release, min_storage, max_storage)
+    )
 
     for day_index in range(horizon_days):
         ts = now + timedelta(days=day_index + 1)
+        max_release = max_releases[day_index]
+        min_storage, max_storage = min_storages[day_index], max_storages[day_index]
 
-        seasonal = 1.0 + 0.08 * (1 if day_index % 14 < 7 else -1)
-        inflow = inflow_base * inflow_mult * seasonal
-        demands = {s: demand_base[s] * demand_mult for s in SECTORS}
+        inflow = inflow_series[day_index] if inflow_series is not None else inflow_base * _seasonal(day_index)
+        demands = dict(sector_demands)
         demands["environment"] = max(demands["environment"], min_env_flow)
 
         target_release = sum(demands.values())
@@ -138,16 +200,14 @@ def run_optimization(
             satisfaction_accumulator[sector].append(satisfaction)
 
         avg_satisfaction = sum(satisfaction_accumulator[s][-1] for s in SECTORS) / len(SECTORS)
-        drought_risk = max(0.0, 1.0 - avg_satisfaction)
-        flood_risk = _clamp((projected - (0.9 * max_storage)) / (0.1 * max_storage), 0.0, 1.0)
-        risk_index = _clamp((0.65 * drought_risk) + (0.35 * flood_risk), 0.0, 1.0)
+        drought_risk, flood_risk, risk_index = _day_risk(avg_satisfaction, projected, max_storage)
 
         drought_risk_points.append(drought_risk)
         flood_risk_points.append(flood_risk)
 
         plans.append(
             ReleasePlan(
-                run_id=run.id,
+                run_id=run_id,
                 ts=ts,
                 release_value=round(release, 3),
                 sector_allocations={k: round(v, 3) for k, v in allocations.items()},
@@ -157,25 +217,315 @@ def run_optimization(
         )
         storage = projected
 
-    db.add_all(plans)
+    return plans, satisfaction_accumulator, drought_risk_points, flood_risk_points
+
+
+def _mpc_problem(
+    horizon_days: int,
+    *,
+    inflow_series: List[float],
+    sector_demands: Dict[str, float],
+    storage: float,
+    sector_weights: Dict[str, float],
+    min_env_flow: float,
+    min_release: float,
+    max_release: float | np.ndarray,
+    min_storage: float | np.ndarray,
+    max_storage: float | np.ndarray,
+    target_storage: float,
+    previous_release: Optional[float] = None,
+) -> mpc.MpcProblem:
+    demands = dict(sector_demands)
+    demands["environment"] = max(demands["environment"], min_env_flow)
+    return mpc.MpcProblem(
+        inflow=np.asarray(inflow_series, dtype=float),
+        demands=np.tile([max(demands[s], 1e-6) for s in SECTORS], (horizon_days, 1)),
+        weights=np.array([sector_weights[s] for s in SECTORS]),
+        min_allocations=np.tile([min_env_flow if s == "environment" else 0.0 for s in SECTORS], (horizon_days, 1)),
+        storage=storage,
+        min_storage=min_storage,
+        max_storage=max_storage,
+        min_release=min_release,
+        max_release=max_release,
+        target_storage=target_storage,
+        previous_release=previous_release,
+    )
+
+
+def _plan_mpc(
+    run_id: str,
+    now: datetime,
+    horizon_days: int,
+    *,
+    initial_release: Optional[List[float]] = None,
+    **problem_inputs: Any,
+) -> Tuple[List[ReleasePlan], Dict[str, List[float]], List[float], List[float], Dict[str, Any]]:
+    problem = _mpc_problem(horizon_days, **problem_inputs)
+    initial = None if initial_release is None else mpc.shift_release(np.asarray(initial_release), 0, horizon_days)
+
+    start = time.perf_counter()
+    solution = mpc.repair(problem, mpc.solve(problem, initial))
+    elapsed = time.perf_counter() - start
+    OPTIMIZATION_SOLVE_SECONDS.labels("warm" if initial is not None else "cold").observe(elapsed)
+
+    plans: List[ReleasePlan] = []
+    satisfaction_accumulator = {s: [] for s in SECTORS}
+    flood_risk_points: List[float] = []
+    drought_risk_points: List[float] = []
+    max_storages = np.broadcast_to(np.asarray(problem.max_storage, dtype=float), (horizon_days,)).tolist()
+    for day_index in range(horizon_days):
+        allocations = {s: float(solution.allocations[day_index, i]) for i, s in enumerate(SECTORS)}
+        for i, sector in enumerate(SECTORS):
+            satisfaction_accumulator[sector].append(min(1.0, allocations[sector] / float(problem.demands[day_index, i])))
+        projected = float(solution.storage[day_index])
+        avg_satisfaction = sum(satisfaction_accumulator[s][-1] for s in SECTORS) / len(SECTORS)
+        drought_risk, flood_risk, risk_index = _day_risk(avg_satisfaction, projected, max_storages[day_index])
+        drought_risk_points.append(drought_risk)
+        flood_risk_points.append(flood_risk)
+        plans.append(
+            ReleasePlan(
+                run_id=run_id,
+                ts=now + timedelta(days=day_index + 1),
+                release_value=round(float(solution.release[day_index]), 3),
+                sector_allocations={k: round(v, 3) for k, v in allocations.items()},
+                storage_projection=round(projected, 3),
+                risk_index=round(risk_index, 3),
+            )
+        )
+
+    solver = {
+        "method": "mpc_newton",
+        "iterations": solution.iterations,
+        "converged": solution.converged,
+        "solve_ms": round(elapsed * 1000, 3),
+        "warm_started": initial is not None,
+        "objective": round(solution.objective, 6),
+        "spill": round(float(np.maximum(solution.spill, 0.0).sum()), 3),
+    }
+    return plans, satisfaction_accumulator, drought_risk_points, flood_risk_points, solver
+
+
+def _plan_network(
+    db: Session,
+    run_id: str,
+    now: datetime,
+    horizon_days: int,
+    *,
+    inflow_profile: np.ndarray,
+    sector_demands: Dict[str, float],
+    weights: Dict[str, float],
+    constraints: Dict[str, Any],
+) -> Tuple[List[ReleasePlan], Dict[str, List[float]], List[float], List[float], Dict[str, Any]]:
+    reservoirs = load_network(
+        db, now, inflow_profile=inflow_profile, sector_demands=sector_demands, weights=weights, constraints=constraints
+    )
+    start = time.perf_counter()
+    results, subnetwork_count = solve_network(reservoirs)
+    elapsed = time.perf_counter() - start
+    by_id = {reservoir.id: reservoir for reservoir in reservoirs}
 
+    plans: List[ReleasePlan] = []
+    node_types = sorted({node.node_type for reservoir in reservoirs for node in reservoir.nodes}, key=_sector_order)
+    supplied = {node_type: np.zeros(horizon_days) for node_type in node_types}
+    demanded = {node_type: np.zeros(horizon_days) for node_type in node_types}
+    node_satisfaction: Dict[str, float] = {}
+    day_flood = np.zeros(horizon_days)
+    for result in results:
+        reservoir = by_id[result.reservoir_id]
+        demands = np.array([node.demand for node in reservoir.nodes])
+        met = np.minimum(result.allocations, demands) / np.maximum(demands, 1e-6)
+        for index, node in enumerate(reservoir.nodes):
+            supplied[node.node_type] += np.minimum(result.allocations[:, index], node.demand)
+            demanded[node.node_type] += node.demand
+            node_satisfaction[node.name] = round(float(met[:, index].mean()), 3)
+        for day_index in range(horizon_days):
+            avg_satisfaction = float(met[day_index].mean()) if reservoir.nodes else 1.0
+            projected = float(result.storage[day_index])
+            _, flood_risk, risk_index = _day_risk(avg_satisfaction, projected, float(reservoir.max_storage[day_index]))
+            day_flood[day_index] = max(day_flood[day_index], flood_risk)
+            allocations = {node.name: float(result.allocations[day_index, i]) for i, node in enumerate(reservoir.nodes)}
+            by_type: Dict[str, float] = defaultdict(float)
+            for node in reservoir.nodes:
+                by_type[node.node_type] += allocations[node.name]
+            plans.append(
+                ReleasePlan(
+                    run_id=run_id,
+                    ts=now + timedelta(days=day_index + 1),
+                    reservoir_id=reservoir.id,
+                    release_value=round(float(result.release[day_index]), 3),
+                    sector_allocations={k: round(v, 3) for k, v in by_type.items()},
+                    node_allocations={k: round(v, 3) for k, v in allocations.items()},
+                    storage_projection=round(projected, 3),
+                    risk_index=round(risk_index, 3),
+                )
+            )
+
+    satisfaction_accumulator = {
+        node_type: np.minimum(supplied[node_type] / np.maximum(demanded[node_type], 1e-6), 1.0).tolist()
+        for node_type in node_types
+    }
+    drought_risk_points = [
+        max(0.0, 1.0 - sum(satisfaction_accumulator[t][day] for t in node_types) / max(len(node_types), 1))
+        for day in range(horizon_days)
+    ]
+    network = {
+        "method": "network_mpc",
+        "reservoirs": len(reservoirs),
+        "nodes": len(node_satisfaction),
+        "subnetworks": subnetwork_count,
+        "solve_ms": round(elapsed * 1000, 3),
+        "iterations": sum(result.iterations for result in results),
+        "satisfaction_by_node": node_satisfaction,
+    }
+    return plans, satisfaction_accumulator, drought_risk_points, day_flood.tolist(), network
+
+
+def _sector_order(node_type: str) -> Tuple[int, str]:
+    return (SECTORS.index(node_type) if node_type in SECTORS else len(SECTORS), node_type)
+
+
+def _satisfaction(satisfaction_accumulator: Dict[str, List[float]]) -> Tuple[Dict[str, float], float]:
     satisfaction_by_sector = {
         s: round(sum(vals) / len(vals), 3) if vals else 0.0 for s, vals in satisfaction_accumulator.items()
     }
-    overall_satisfaction = round(sum(satisfaction_by_sector.values()) / len(SECTORS), 3)
+    overall = sum(satisfaction_by_sector.values()) / len(satisfaction_by_sector) if satisfaction_by_sector else 0.0
+    return satisfaction_by_sector, round(overall, 3)
+
+
+def run_optimization(
+    db: Session,
+    *,
+    name: str,
+    horizon_days: int,
+    scenario: str,
+    weights: Dict[str, float],
+    constraints: Dict[str, Any],
+    created_by: str | None,
+    mode: str = "rule",
+) -> OptimizationRun:
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    inflow_base = _avg_inflow(db)
+    demand_base = _avg_sector_demands(db)
+    storage = _latest_storage(db)
+
+    min_env_flow = float(constraints.get("min_env_flow", 22.0))
+    min_release = float(constraints.get("min_release", 40.0))
+    max_release = float(constraints.get("max_release", 260.0))
+    min_storage = float(constraints.get("min_storage", 280.0))
+    max_storage = float(constraints.get("max_storage", 1150.0))
+    if mode != "network":
+        # The request's limits, tightened day by day by the reservoir's seasonal safety envelope. Network runs
+        # resolve the envelope of every reservoir themselves.
+        reservoir = primary_reservoir(db)
+        if reservoir is not None:
+            min_storage, max_storage, max_release = effective_limits(
+                timelines.get(db, reservoir.id),
+                reservoir,
+                now,
+                horizon_days,
+                min_storage=min_storage,
+                max_storage=max_storage,
+                max_release=max_release,
+            )
+
+    # Ensure all sectors have a positive weight.
+    sector_weights = {s: max(0.1, float(weights.get(s, 1.0))) for s in SECTORS}
+
+    inflow_mult = SCENARIO_INFLOW.get(scenario, 1.0)
+    demand_mult = SCENARIO_DEMAND.get(scenario, 1.0)
+
+    inflow_series = None
+    inflow_source = "historical_average"
+    initial_release = previous_release = None
+    if mode == "mpc":
+        inflow_series, inflow_source = _forecast_inflow(db, scenario, now, horizon_days)
+        initial_release, previous_release = _previous_mpc_plan(db, scenario, now)
+        if inflow_series is None:
+            inflow_series = [inflow_base * inflow_mult * _seasonal(day_index) for day_index in range(horizon_days)]
+
+    run = OptimizationRun(
+        name=name,
+        params={
+            "horizon_days": horizon_days,
+            "scenario": scenario,
+            "mode": mode,
+            "weights": sector_weights,
+            "constraints": constraints,
+        },
+        status="completed",
+        created_by=created_by,
+        completed_at=datetime.now(timezone.utc),
+    )
+    db.add(run)
+    db.flush()
+
+    horizon_inputs = dict(
+        sector_demands={s: demand_base[s] * demand_mult for s in SECTORS},
+        storage=storage,
+        sector_weights=sector_weights,
+        min_env_flow=min_env_flow,
+        min_release=min_release,
+        max_release=max_release,
+        min_storage=min_storage,
+        max_storage=max_storage,
+    )
+    rule_plan = None
+    if mode != "network":
+        rule_plan = _plan_horizon(
+            run.id, now, horizon_days, inflow_base=inflow_base * inflow_mult, inflow_series=inflow_series, **horizon_inputs
+        )
+    solver = network = None
+    if mode == "network":
+        plans, satisfaction_accumulator, drought_risk_points, flood_risk_points, network = _plan_network(
+            db,
+            run.id,
+            now,
+            horizon_days,
+            inflow_profile=np.array([inflow_mult * _seasonal(day_index) for day_index in range(horizon_days)]),
+            sector_demands=horizon_inputs["sector_demands"],
+            weights=weights,
+            constraints=constraints,
+        )
+    elif mode == "mpc":
+        # Without a target the solver would drain the reservoir to the floor by the end of every horizon; by
+        # default it should hand over at least half of today's headroom above the floor.
+        final_min_storage = float(np.asarray(min_storage, dtype=float).reshape(-1)[-1])
+        target_storage = float(constraints.get("target_storage", (final_min_storage + storage) / 2))
+        plans, satisfaction_accumulator, drought_risk_points, flood_risk_points, solver = _plan_mpc(
+            run.id,
+            now,
+            horizon_days,
+            inflow_series=inflow_series,
+            target_storage=target_storage,
+            initial_release=initial_release,
+            previous_release=previous_release,
+            **horizon_inputs,
+        )
+        solver["inflow_source"] = inflow_source
+    else:
+        plans, satisfaction_accumulator, drought_risk_points, flood_risk_points = rule_plan
+
+    db.add_all(plans)
+
+    satisfaction_by_sector, overall_satisfaction = _satisfaction(satisfaction_accumulator)
     drought_risk = round(sum(drought_risk_points) / len(drought_risk_points), 3) if drought_risk_points else 0.0
     flood_risk = round(sum(flood_risk_points) / len(flood_risk_points), 3) if flood_risk_points else 0.0
 
-    baseline_satisfaction = max(0.0, overall_satisfaction - 0.08)
+    if solver is None:
+        baseline_method, baseline_satisfaction = "traditional_rule_curve_mock", max(0.0, overall_satisfaction - 0.08)
+    else:
+        # The MPC plan is compared against the rule planner run on the same forecast inflow.
+        baseline_method, baseline_satisfaction = "traditional_rule_curve", _satisfaction(rule_plan[1])[1]
 
-    run.summary = {
+    summary = {
         "overall_satisfaction": overall_satisfaction,
         "satisfaction_by_sector": satisfaction_by_sector,
         "drought_risk": drought_risk,
         "flood_risk": flood_risk,
         "env_flow_compliance": 1.0,
         "baseline": {
-            "method": "traditional_rule_curve_mock",
+            "method": baseline_method,
             "overall_satisfaction": round(baseline_satisfaction, 3),
             "delta": round(overall_satisfaction - baseline_satisfaction, 3),
         },
@@ -193,70 +543,60 @@ def run_optimization(
             },
         ],
     }
+    if solver is not None:
+        summary["solver"] = solver
+    if network is not None:
+        summary["network"] = network
+    run.summary = summary
 
     db.commit()
     db.refresh(run)
+    OPTIMIZATION_RUNS.labels(scenario).inc()
     return run
 
 
 def release_plan_rows(db: Session, run_id: str) -> List[ReleasePlan]:
-    return db.query(ReleasePlan).filter(ReleasePlan.run_id == run_id).order_by(ReleasePlan.ts.asc()).all()
+    return (
+        db.query(ReleasePlan)
+        .filter(ReleasePlan.run_id == run_id)
+        .order_by(ReleasePlan.ts.asc(), ReleasePlan.reservoir_id.asc())
+        .all()
+    )
+
+
+def reservoir_names(db: Session, reservoir_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+    ids = {reservoir_id for reservoir_id in reservoir_ids if reservoir_id}
+    if not ids:
+        return {}
+    return dict(db.query(Reservoir.id, Reservoir.name).filter(Reservoir.id.in_(ids)).all())
+
 
+def _csv_field(value: str) -> str:
+    if any(char in value for char in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
-def export_release_plan_csv(rows: List[ReleasePlan]) -> str:
-    lines = ["ts,release_value,storage_projection,risk_index,drinking,environment,industry,agriculture"]
+
+def export_release_plan_csv(rows: List[ReleasePlan], reservoirs: Dict[str, str] | None = None) -> str:
+    # Network runs have one row per reservoir and day, so their export names the reservoir on each row.
+    network = any(row.reservoir_id for row in rows)
+    header = ["ts", "release_value", "storage_projection", "risk_index", *SECTORS]
+    if network:
+        header.insert(1, "reservoir")
+    lines = [",".join(header)]
     for row in rows:
         alloc = row.sector_allocations or {}
-        line = ",".join(
-            [
-                row.ts.isoformat(),
-                f"{row.release_value:.3f}",
-                f"{row.storage_projection:.3f}",
-                f"{row.risk_index:.3f}",
-                f"{float(alloc.get('drinking', 0.0)):.3f}",
-                f"{float(alloc.get('environment', 0.0)):.3f}",
-                f"{float(alloc.get('industry', 0.0)):.3f}",
-                f"{float(alloc.get('agriculture', 0.0)):.3f}",
-            ]
-        )
-        lines.append(line)
+        fields = [
+            row.ts.isoformat(),
+            f"{row.release_value:.3f}",
+            f"{row.storage_projection:.3f}",
+            f"{row.risk_index:.3f}",
+            f"{float(alloc.get('drinking', 0.0)):.3f}",
+            f"{float(alloc.get('environment', 0.0)):.3f}",
+            f"{float(alloc.get('industry', 0.0)):.3f}",
+            f"{float(alloc.get('agriculture', 0.0)):.3f}",
+        ]
+        if network:
+            fields.insert(1, _csv_field((reservoirs or {}).get(row.reservoir_id, row.reservoir_id or "")))
+        lines.append(",".join(fields))
     return "\n".join(lines)
-
-
-def export_release_plan_pdf(run: OptimizationRun, rows: List[ReleasePlan]) -> bytes:
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    y = height - 50
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawString(40, y, f"Golestan -> Voshmgir Release Plan Report (Run: {run.id})")
-    y -= 18
-    pdf.setFont("Helvetica", 10)
-    pdf.drawString(40, y, f"Scenario: {run.params.get('scenario', 'normal')} | Horizon: {run.params.get('horizon_days', '-')} days")
-    y -= 18
-    pdf.drawString(40, y, f"Overall satisfaction: {run.summary.get('overall_satisfaction', 0)}")
-    y -= 24
-
-    pdf.setFont("Helvetica-Bold", 9)
-    pdf.drawString(40, y, "Date")
-    pdf.drawString(160, y, "Release")
-    pdf.drawString(230, y, "Storage")
-    pdf.drawString(300, y, "Risk")
-    y -= 12
-    pdf.setFont("Helvetica", 8)
-
-    for row in rows[:28]:
-        if y < 40:
-            pdf.showPage()
-            y = height - 40
-        pdf.drawString(40, y, row.ts.strftime("%Y-%m-%d"))
-        pdf.drawString(160, y, f"{row.release_value:.1f}")
-        pdf.drawString(230, y, f"{row.storage_projection:.1f}")
-        pdf.drawString(300, y, f"{row.risk_index:.2f}")
-        y -= 11
-
-    pdf.showPage()
-    pdf.save()
-    buffer.seek(0)
-    return buffer.read()
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, or_
+from sqlalchemy.orm import Session
+
+from app.db.models import RefreshToken
+
+
+def purge_expired_refresh_tokens(db: Session, now: datetime | None = None) -> int:
+    # /auth/refresh rejects unknown hashes too, so revoked rows carry no information once they are gone.
+    cutoff = now or datetime.now(timezone.utc)
+    result = db.execute(delete(RefreshToken).where(or_(RefreshToken.expires_at < cutoff, RefreshToken.is_revoked.is_(True))))
+    db.commit()
+    return result.rowcount
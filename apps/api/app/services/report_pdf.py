@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import Any, Dict, List
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+SECTORS = ["drinking", "environment", "industry", "agriculture"]
+ROWS_PER_PAGE = 58
+RESERVOIR_NAME_CHARS = 18
+
+
+def _line_chart(rows: List[Dict[str, Any]], width: float, height: float) -> Drawing:
+    drawing = Drawing(width, height)
+    drawing.add(String(0, height - 12, "Release and storage projection", fontName="Helvetica-Bold", fontSize=9))
+
+    plot = LinePlot()
+    plot.x = 40
+    plot.y = 25
+    plot.width = width - 60
+    plot.height = height - 50
+    release = [(i + 1, float(row["release_value"])) for i, row in enumerate(rows)]
+    storage = [(i + 1, float(row["storage_projection"])) for i, row in enumerate(rows)]
+    plot.data = [release or [(0, 0.0)], storage or [(0, 0.0)]]
+    plot.lines[0].strokeColor = colors.HexColor("#1d4ed8")
+    plot.lines[1].strokeColor = colors.HexColor("#059669")
+    plot.xValueAxis.valueMin = 1
+    plot.xValueAxis.valueMax = max(len(rows), 2)
+    plot.xValueAxis.labels.fontSize = 7
+    plot.yValueAxis.labels.fontSize = 7
+    drawing.add(plot)
+
+    drawing.add(String(width - 150, height - 12, "blue: release", fontSize=7, fillColor=colors.HexColor("#1d4ed8")))
+    drawing.add(String(width - 80, height - 12, "green: storage", fontSize=7, fillColor=colors.HexColor("#059669")))
+    return drawing
+
+
+def _satisfaction_chart(satisfaction: Dict[str, Any], width: float, height: float) -> Drawing:
+    drawing = Drawing(width, height)
+    drawing.add(String(0, height - 12, "Average satisfaction by sector", fontName="Helvetica-Bold", fontSize=9))
+
+    chart = VerticalBarChart()
+    chart.x = 40
+    chart.y = 25
+    chart.width = width - 60
+    chart.height = height - 50
+    chart.data = [[float(satisfaction.get(s, 0.0)) for s in SECTORS]]
+    chart.categoryAxis.categoryNames = SECTORS
+    chart.categoryAxis.labels.fontSize = 7
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = 1
+    chart.valueAxis.labels.fontSize = 7
+    chart.bars[0].fillColor = colors.HexColor("#0891b2")
+    drawing.add(chart)
+    return drawing
+
+
+def _table_columns(network: bool) -> List[float]:
+    # Network plans have one row per reservoir and day, so their table gains a reservoir column.
+    if network:
+        return [40, 95, 185, 230, 275, 310, 360, 425, 475]
+    return [40, 110, 165, 220, 265, 330, 405, 470]
+
+
+def _table_header(pdf: canvas.Canvas, y: float, network: bool) -> float:
+    labels = ["Date", "Release", "Storage", "Risk", "Drinking", "Environment", "Industry", "Agriculture"]
+    if network:
+        labels.insert(1, "Reservoir")
+    pdf.setFont("Helvetica-Bold", 8)
+    for x, label in zip(_table_columns(network), labels):
+        pdf.drawString(x, y, label)
+    pdf.setFont("Helvetica", 8)
+    return y - 12
+
+
+def _page_footer(pdf: canvas.Canvas, page: int, total_pages: int, run_id: str) -> None:
+    pdf.setFont("Helvetica", 7)
+    pdf.drawString(40, 20, f"Run {run_id}")
+    pdf.drawRightString(A4[0] - 40, 20, f"Page {page} / {total_pages}")
+
+
+def render_release_plan_pdf(
+    run: Dict[str, Any], rows: List[Dict[str, Any]], reservoirs: Dict[str, str] | None = None
+) -> bytes:
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    params = run.get("params") or {}
+    summary = run.get("summary") or {}
+    total_pages = 1 + (len(rows) + ROWS_PER_PAGE - 1) // ROWS_PER_PAGE
+    network = any(row.get("reservoir_id") for row in rows)
+
+    y = height - 50
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(40, y, f"Golestan -> Voshmgir Release Plan Report (Run: {run['id']})")
+    y -= 18
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(40, y, f"Scenario: {params.get('scenario', 'normal')} | Horizon: {params.get('horizon_days', '-')} days")
+    y -= 15
+    pdf.drawString(
+        40,
+        y,
+        f"Overall satisfaction: {summary.get('overall_satisfaction', 0)} | "
+        f"Drought risk: {summary.get('drought_risk', 0)} | Flood risk: {summary.get('flood_risk', 0)}",
+    )
+    y -= 15
+    if rows:
+        releases = [float(r["release_value"]) for r in rows]
+        pdf.drawString(
+            40,
+            y,
+            f"Total release: {sum(releases):.1f} | Peak release: {max(releases):.1f} | "
+            f"Final storage: {float(rows[-1]['storage_projection']):.1f}",
+        )
+    y -= 10
+
+    chart_width = width - 80
+    renderPDF.draw(_line_chart(rows, chart_width, 230), pdf, 40, y - 240)
+    y -= 250
+    renderPDF.draw(_satisfaction_chart(summary.get("satisfaction_by_sector") or {}, chart_width, 200), pdf, 40, y - 210)
+    _page_footer(pdf, 1, total_pages, run["id"])
+
+    for page_index in range(total_pages - 1):
+        pdf.showPage()
+        page_rows = rows[page_index * ROWS_PER_PAGE : (page_index + 1) * ROWS_PER_PAGE]
+        y = _table_header(pdf, height - 40, network)
+        for row in page_rows:
+            alloc = row.get("sector_allocations") or {}
+            cells = [
+                str(row["ts"])[:10],
+                f"{float(row['release_value']):.1f}",
+                f"{float(row['storage_projection']):.1f}",
+                f"{float(row['risk_index']):.2f}",
+                *(f"{float(alloc.get(sector, 0.0)):.1f}" for sector in SECTORS),
+            ]
+            if network:
+                reservoir_id = row.get("reservoir_id") or ""
+                cells.insert(1, (reservoirs or {}).get(reservoir_id, reservoir_id)[:RESERVOIR_NAME_CHARS])
+            for x, cell in zip(_table_columns(network), cells):
+                pdf.drawString(x, y, cell)
+            y -= 12.5
+        _page_footer(pdf, page_index + 2, total_pages, run["id"])
+
+    pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return buffer.read()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List
+
+from app.core.config import get_settings
+
+# Bump whenever the layout changes so cached files from an older template are not served.
+REPORT_TEMPLATE_VERSION = 3
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+class ReportRenderTimeout(RuntimeError):
+    pass
+
+
+def _report_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            settings = get_settings()
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.report_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_report_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def report_cache_path(run_id: str) -> Path:
+    settings = get_settings()
+    return Path(settings.report_cache_dir) / f"release-plan-{run_id}-v{REPORT_TEMPLATE_VERSION}.pdf"
+
+
+def cached_report_path(run_id: str) -> Path | None:
+    path = report_cache_path(run_id)
+    return path if path.is_file() else None
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def build_release_plan_report(
+    run: Dict[str, Any], rows: List[Dict[str, Any]], reservoirs: Dict[str, str] | None = None
+) -> Path:
+    # reportlab lives in report_pdf so the API process only imports it once a report is actually rendered.
+    from app.services.report_pdf import render_release_plan_pdf
+
+    settings = get_settings()
+    path = report_cache_path(run["id"])
+
+    if settings.report_workers > 0:
+        future = _report_executor().submit(render_release_plan_pdf, run, rows, reservoirs)
+        try:
+            content = future.result(timeout=settings.report_render_timeout_seconds)
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise ReportRenderTimeout(f"Report rendering exceeded {settings.report_render_timeout_seconds}s") from exc
+    else:
+        content = render_release_plan_pdf(run, rows, reservoirs)
+
+    _write_atomic(path, content)
+    return path
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.metrics import SCENARIO_RUNS
 from app.db.models import Scenario, ScenarioResult, SectorDemand, TimeseriesPoint
+from app.services.constraints import effective_limits, primary_reservoir, timelines
 
 
 SCENARIO_FACTORS = {
@@ -16,6 +19,49 @@ SCENARIO_FACTORS = {
 }
 
 
+def _simulate_points(
+    now: datetime,
+    horizon: int,
+    *,
+    inflow: float,
+    demand: float,
+    max_release: float | np.ndarray,
+    storage: float,
+    min_storage: float | np.ndarray = 300.0,
+    max_storage: float | np.ndarray = 1100.0,
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    points: List[Dict[str, Any]] = []
+    shortage_days = 0
+    spill_days = 0
+    # Scalars or per-day arrays from the reservoir's seasonal safety envelope.
+    bounds = zip(
+        *(
+            np.broadcast_to(np.asarray(bound, dtype=float), (horizon,)).tolist()
+            for bound in (max_release, min_storage, max_storage)
+        )
+    )
+
+    for i, (day_max_release, day_min_storage, day_max_storage) in enumerate(bounds):
+        ts = now + timedelta(days=i + 1)
+        release = min(day_max_release, max(50.0, demand))
+
+        storage = storage + inflow - release
+        if storage < day_min_storage:
+            shortage_days += 1
+        if storage > day_max_storage:
+            spill_days += 1
+
+        points.append(
+            {
+                "ts": ts.isoformat(),
+                "inflow": round(inflow, 3),
+                "release": round(release, 3),
+                "storage": round(storage, 3),
+            }
+        )
+    return points, shortage_days, spill_days
+
+
 def simulate_scenario(db: Session, scenario: Scenario) -> ScenarioResult:
     params = scenario.params or {}
     horizon = int(params.get("horizon_days", 14))
@@ -38,30 +84,27 @@ def simulate_scenario(db: Session, scenario: Scenario) -> ScenarioResult:
     )
 
     now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    points: List[Dict[str, Any]] = []
-    shortage_days = 0
-    spill_days = 0
-
-    for i in range(horizon):
-        ts = now + timedelta(days=i + 1)
-        inflow = inflow_base * factors["inflow"] * manual_inflow_adj
-        demand = demand_base * 4 * factors["demand"]
-        release = min(manual_safety_max_release, max(50.0, demand))
-
-        storage = storage + inflow - release
-        if storage < 300:
-            shortage_days += 1
-        if storage > 1100:
-            spill_days += 1
-
-        points.append(
-            {
-                "ts": ts.isoformat(),
-                "inflow": round(inflow, 3),
-                "release": round(release, 3),
-                "storage": round(storage, 3),
-            }
+    limits = dict(max_release=manual_safety_max_release)
+    reservoir = primary_reservoir(db)
+    if reservoir is not None:
+        min_storage, max_storage, max_release = effective_limits(
+            timelines.get(db, reservoir.id),
+            reservoir,
+            now,
+            horizon,
+            min_storage=300.0,
+            max_storage=1100.0,
+            max_release=manual_safety_max_release,
         )
+        limits = dict(max_release=max_release, min_storage=min_storage, max_storage=max_storage)
+    points, shortage_days, spill_days = _simulate_points(
+        now,
+        horizon,
+        inflow=inflow_base * factors["inflow"] * manual_inflow_adj,
+        demand=demand_base * 4 * factors["demand"],
+        storage=storage,
+        **limits,
+    )
 
     result = ScenarioResult(
         scenario_id=scenario.id,
@@ -80,4 +123,5 @@ def simulate_scenario(db: Session, scenario: Scenario) -> ScenarioResult:
     db.add(result)
     db.commit()
     db.refresh(result)
+    SCENARIO_RUNS.inc()
     return result
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import csv
+import io
 import math
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from uuid import uuid4
 
 import numpy as np
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.core.security import get_password_hash
 from app.db.models import (
     AlertRule,
@@ -20,6 +25,7 @@ from app.db.models import (
     RolePermission,
     SafetyConstraint,
     Scenario,
+    SeedMarker,
     SectorDemand,
     Station,
     TimeseriesPoint,
@@ -32,6 +38,11 @@ from app.services.forecasting import run_forecast
 from app.services.optimization import run_optimization
 from app.services.scenario import simulate_scenario
 
+# Bump whenever the seeded RBAC, users, static entities or demo data change, so existing databases run the
+# full reconcile once more; otherwise startup only reads the marker row.
+SEED_VERSION = 2
+SEED_MARKER = "demo"
+
 PERMISSIONS: List[Dict[str, str]] = [
     {"name": "overview.read", "module": "overview", "description": "Read overview dashboard"},
     {"name": "live.read", "module": "live", "description": "Read live monitoring"},
@@ -112,240 +123,376 @@ DEMO_USERS = [
 ]
 
 
-def _ensure_permissions_roles(db: Session) -> Dict[str, Role]:
-    perm_by_name: Dict[str, Permission] = {}
-    for perm_payload in PERMISSIONS:
-        perm = db.query(Permission).filter(Permission.name == perm_payload["name"]).first()
-        if not perm:
-            perm = Permission(**perm_payload)
-            db.add(perm)
-            db.flush()
-        perm_by_name[perm.name] = perm
-
-    roles: Dict[str, Role] = {}
-    for role_name in ROLE_MATRIX:
-        role = db.query(Role).filter(Role.name == role_name).first()
-        if not role:
-            role = Role(name=role_name, description=f"{role_name.title()} role")
-            db.add(role)
-            db.flush()
-        roles[role_name] = role
-
-    for role_name, perm_names in ROLE_MATRIX.items():
-        role = roles[role_name]
-        existing = {rp.permission_id for rp in role.permissions}
-        for perm_name in perm_names:
-            perm = perm_by_name[perm_name]
-            if perm.id not in existing:
-                db.add(RolePermission(role_id=role.id, permission_id=perm.id))
+STATIONS = [
+    ("Golestan Upstream Gauge", "river_gauge", 37.2, 55.5),
+    ("Voshmgir Downstream Gauge", "river_gauge", 37.4, 55.9),
+    ("Met Station A", "meteorology", 37.3, 55.6),
+]
+DOWNSTREAM_NODES = [
+    ("Urban Drinking Intake", "drinking", 1),
+    ("Environmental Reach-1", "environment", 2),
+    ("Industrial Hub", "industry", 3),
+    ("Agriculture Canal", "agriculture", 4),
+]
+CROP_PATTERNS = [
+    ("Gorgan Plain", "Wheat", 18000, "autumn"),
+    ("Gorgan Plain", "Rice", 12000, "summer"),
+    ("Aqqala", "Cotton", 9500, "spring"),
+]
+DATASETS = [
+    ("hydrology_daily", "hydrology", "Inflow/outflow and river gauge measurements"),
+    ("meteorology_daily", "meteorology", "Temperature, precipitation, evaporation, humidity, snow storage"),
+    ("reservoir_daily", "reservoir", "Reservoir level and storage daily status"),
+    ("demand_daily", "demand", "Sectoral water demand by day"),
+]
+ALERT_RULES = [
+    ("Flood Risk Inflow", "inflow", ">", 220.0, "high"),
+    ("Low Storage Alert", "storage", "<", 320.0, "high"),
+]
+
 
+def _reconcile(
+    db: Session,
+    model,
+    keys: Tuple[str, ...],
+    desired: List[Dict[str, Any]],
+    prepare: Callable[[Dict[str, Any]], Dict[str, Any]] | None = None,
+    backfill: Tuple[str, ...] = (),
+) -> Dict[tuple, str]:
+    # One SELECT of the natural keys, an in-memory diff, and one executemany INSERT for whatever is missing.
+    # `backfill` columns are also set on existing rows where they are still NULL (rows seeded before the
+    # column existed), with one executemany UPDATE; values set since are left alone.
+    columns = [getattr(model, key) for key in keys + backfill]
+    ids: Dict[tuple, str] = {}
+    current: Dict[tuple, tuple] = {}
+    for row in db.execute(select(*columns, model.id)):
+        key = tuple(row[: len(keys)])
+        ids[key], current[key] = row[-1], tuple(row[len(keys) : -1])
+    missing: List[Dict[str, Any]] = []
+    stale: List[Dict[str, Any]] = []
+    for payload in desired:
+        key = tuple(payload[k] for k in keys)
+        if key in ids:
+            values = {
+                column: payload[column]
+                for column, value in zip(backfill, current[key])
+                if value is None and payload.get(column) is not None
+            }
+            if values:
+                stale.append({"id": ids[key], **values})
+            continue
+        row = {"id": str(uuid4()), **(prepare(payload) if prepare else payload)}
+        ids[key] = row["id"]
+        missing.append(row)
+    if missing:
+        db.execute(insert(model), missing)
+    if stale:
+        db.execute(update(model), stale)
+    return ids
+
+
+def _ensure_permissions_roles(db: Session) -> Dict[str, str]:
+    perm_ids = _reconcile(db, Permission, ("name",), PERMISSIONS)
+    role_ids = _reconcile(
+        db,
+        Role,
+        ("name",),
+        [{"name": role_name, "description": f"{role_name.title()} role"} for role_name in ROLE_MATRIX],
+    )
+    _reconcile(
+        db,
+        RolePermission,
+        ("role_id", "permission_id"),
+        [
+            {"role_id": role_ids[(role_name,)], "permission_id": perm_ids[(perm_name,)]}
+            for role_name, perm_names in ROLE_MATRIX.items()
+            for perm_name in perm_names
+        ],
+    )
+    db.commit()
+    return {role_name: role_id for (role_name,), role_id in role_ids.items()}
+
+
+def _new_user(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Hashing is the expensive part of a user row, so it only happens for users that are actually missing.
+    demo = next(user for user in DEMO_USERS if user["username"] == payload["username"])
+    return {**payload, "hashed_password": get_password_hash(demo["password"]), "is_active": True}
+
+
+def _ensure_users(db: Session, role_ids: Dict[str, str]) -> None:
+    user_ids = _reconcile(
+        db,
+        User,
+        ("username",),
+        [{"username": user["username"], "full_name": user["full_name"]} for user in DEMO_USERS],
+        prepare=_new_user,
+    )
+    _reconcile(
+        db,
+        UserRole,
+        ("user_id", "role_id"),
+        [{"user_id": user_ids[(user["username"],)], "role_id": role_ids[user["role"]]} for user in DEMO_USERS],
+    )
     db.commit()
-    return roles
-
-
-def _ensure_users(db: Session, roles: Dict[str, Role]) -> None:
-    for user_payload in DEMO_USERS:
-        user = db.query(User).filter(User.username == user_payload["username"]).first()
-        if not user:
-            user = User(
-                username=user_payload["username"],
-                full_name=user_payload["full_name"],
-                hashed_password=get_password_hash(user_payload["password"]),
-                is_active=True,
-            )
-            db.add(user)
-            db.flush()
 
-        role = roles[user_payload["role"]]
-        linked = db.query(UserRole).filter(UserRole.user_id == user.id, UserRole.role_id == role.id).first()
-        if not linked:
-            db.add(UserRole(user_id=user.id, role_id=role.id))
 
+def _ensure_static_entities(db: Session) -> None:
+    reservoir_ids = _reconcile(
+        db,
+        Reservoir,
+        ("name",),
+        [
+            {
+                "name": "Golestan Dam",
+                "code": "golestan",
+                "river": "Gorganrood",
+                "max_level": 130.0,
+                "min_level": 95.0,
+                "storage_capacity": 1200,
+            }
+        ],
+        backfill=("code",),
+    )
+    _reconcile(
+        db,
+        SafetyConstraint,
+        ("reservoir_id",),
+        [
+            {
+                "reservoir_id": reservoir_ids[("Golestan Dam",)],
+                "min_level": 97.0,
+                "max_level": 128.0,
+                "max_release": 280.0,
+                "notes": "Demo envelope with flood-season attention",
+                "season": "all",
+            }
+        ],
+    )
+    _reconcile(
+        db,
+        Station,
+        ("name",),
+        [{"name": name, "station_type": stype, "latitude": lat, "longitude": lon} for name, stype, lat, lon in STATIONS],
+    )
+    _reconcile(
+        db,
+        DownstreamNode,
+        ("name",),
+        [
+            {"name": name, "node_type": ntype, "priority": priority, "reservoir_id": reservoir_ids[("Golestan Dam",)]}
+            for name, ntype, priority in DOWNSTREAM_NODES
+        ],
+        backfill=("reservoir_id",),
+    )
+    _reconcile(
+        db,
+        CropPattern,
+        ("region", "crop", "season"),
+        [
+            {"region": region, "crop": crop, "area": area, "season": season}
+            for region, crop, area, season in CROP_PATTERNS
+        ],
+    )
+    _reconcile(
+        db,
+        Scenario,
+        ("name",),
+        [
+            {"name": climate, "params": {"climate": climate.lower(), "horizon_days": 14}, "status": "ready"}
+            for climate in ("Wet", "Normal", "Dry")
+        ],
+    )
+    dataset_ids = _reconcile(
+        db,
+        Dataset,
+        ("name",),
+        [
+            {
+                "name": name,
+                "category": category,
+                "description": description,
+                "latest_version": 1,
+                "current_status": "active",
+            }
+            for name, category, description in DATASETS
+        ],
+    )
+    _reconcile(
+        db,
+        DatasetVersion,
+        ("dataset_id", "version"),
+        [
+            {
+                "dataset_id": dataset_ids[(name,)],
+                "version": 1,
+                "file_name": f"{name}_seed.csv",
+                "record_count": 0,
+                "quality_report": {"rows": 0, "missing_cells": 0, "duplicate_rows": 0, "outliers": 0, "quality_score": 100},
+            }
+            for name, _, _ in DATASETS
+        ],
+    )
+    _reconcile(
+        db,
+        AlertRule,
+        ("name",),
+        [
+            {"name": name, "metric": metric, "operator": op, "threshold": threshold, "severity": severity, "is_active": True}
+            for name, metric, op, threshold, severity in ALERT_RULES
+        ],
+    )
     db.commit()
 
 
-def _ensure_static_entities(db: Session) -> None:
-    reservoir = db.query(Reservoir).filter(Reservoir.name == "Golestan Dam").first()
-    if not reservoir:
-        reservoir = Reservoir(name="Golestan Dam", river="Gorganrood", max_level=130.0, min_level=95.0, storage_capacity=1200)
-        db.add(reservoir)
-        db.flush()
-
-    if not db.query(SafetyConstraint).filter(SafetyConstraint.reservoir_id == reservoir.id).first():
-        db.add(
-            SafetyConstraint(
-                reservoir_id=reservoir.id,
-                min_level=97.0,
-                max_level=128.0,
-                max_release=280.0,
-                notes="Demo envelope with flood-season attention",
-                season="all",
-            )
-        )
-
-    stations = [
-        ("Golestan Upstream Gauge", "river_gauge", 37.2, 55.5),
-        ("Voshmgir Downstream Gauge", "river_gauge", 37.4, 55.9),
-        ("Met Station A", "meteorology", 37.3, 55.6),
-    ]
-    for name, stype, lat, lon in stations:
-        if not db.query(Station).filter(Station.name == name).first():
-            db.add(Station(name=name, station_type=stype, latitude=lat, longitude=lon))
-
-    nodes = [
-        ("Urban Drinking Intake", "drinking", 1),
-        ("Environmental Reach-1", "environment", 2),
-        ("Industrial Hub", "industry", 3),
-        ("Agriculture Canal", "agriculture", 4),
-    ]
-    for name, ntype, priority in nodes:
-        if not db.query(DownstreamNode).filter(DownstreamNode.name == name).first():
-            db.add(DownstreamNode(name=name, node_type=ntype, priority=priority))
-
-    crop_patterns = [
-        ("Gorgan Plain", "Wheat", 18000, "autumn"),
-        ("Gorgan Plain", "Rice", 12000, "summer"),
-        ("Aqqala", "Cotton", 9500, "spring"),
-    ]
-    for region, crop, area, season in crop_patterns:
-        if not db.query(CropPattern).filter(CropPattern.region == region, CropPattern.crop == crop, CropPattern.season == season).first():
-            db.add(CropPattern(region=region, crop=crop, area=area, season=season))
-
-    for climate in ("Wet", "Normal", "Dry"):
-        if not db.query(Scenario).filter(Scenario.name == climate).first():
-            db.add(
-                Scenario(
-                    name=climate,
-                    params={"climate": climate.lower(), "horizon_days": 14},
-                    status="ready",
-                )
-            )
+# Column order of the per-day noise matrix. It matches the order in which the original per-value
+# ``rng.normal`` calls consumed the generator, so the data for seed 1402 is unchanged.
+NOISE_COLUMNS = (
+    "inflow",
+    "temperature",
+    "precipitation",
+    "evaporation",
+    "humidity",
+    "snow_storage",
+    "drinking",
+    "environment",
+    "industry",
+    "agriculture",
+    "outflow",
+    "network_index",
+)
+TIMESERIES_SERIES = (
+    ("hydrology", "golestan", "inflow"),
+    ("hydrology", "golestan", "outflow"),
+    ("meteorology", "met-a", "precipitation"),
+    ("meteorology", "met-a", "temperature"),
+    ("meteorology", "met-a", "evaporation"),
+    ("meteorology", "met-a", "humidity"),
+    ("meteorology", "met-a", "snow_storage"),
+    ("reservoir", "golestan", "level"),
+    ("reservoir", "golestan", "storage"),
+    ("downstream", "network", "operation_index"),
+)
+TIMESERIES_COPY_COLUMNS = ("id", "entity_type", "entity_id", "metric", "ts", "value", "quality_flag", "source")
+SECTOR_DEMAND_COPY_COLUMNS = ("id", "sector", "ts", "value", "scenario")
+LOAD_CHUNK_ROWS = 50_000
+
+
+def _seed_series(rng: np.random.Generator, days: int, seasonal: np.ndarray) -> Dict[str, List[float]]:
+    noise = rng.standard_normal((days, len(NOISE_COLUMNS)))
+    z = {name: noise[:, i] for i, name in enumerate(NOISE_COLUMNS)}
+
+    # ``rng.normal(0, s)`` is ``s * standard_normal()``, so scaling the shared draw reproduces it exactly.
+    inflow = np.maximum(25.0, 120 + (55 * seasonal) + 8 * z["inflow"])
+    temperature = 18 + (14 * seasonal) + 2.5 * z["temperature"]
+    precipitation = np.maximum(0.0, 3 + (6 * (1 - seasonal)) + 1.2 * z["precipitation"])
+    evaporation = np.maximum(0.5, 2 + (4 * seasonal) + 0.8 * z["evaporation"])
+    humidity = np.clip(58 + (14 * (1 - seasonal)) + 5 * z["humidity"], 20, 98)
+    snow_storage = np.maximum(0.0, 35 * (1 - np.maximum(0, seasonal)) + 2.0 * z["snow_storage"])
+
+    drinking = np.maximum(30.0, 56 + 2.0 * z["drinking"])
+    environment = np.maximum(18.0, 26 + 1.5 * z["environment"])
+    industry = np.maximum(22.0, 34 + 3.0 * z["industry"])
+    agriculture = np.maximum(40.0, 85 + (25 * seasonal) + 6.0 * z["agriculture"])
+
+    total_release = drinking + environment + industry + agriculture
+    outflow = np.maximum(35.0, total_release * (0.95 + 0.03 * z["outflow"]))
+    network_index = np.clip(0.75 + 0.08 * z["network_index"], 0.4, 1.0)
+
+    # Storage carries over day to day with clipping, so it stays a scalar recurrence.
+    storage = np.empty(days)
+    current = 760.0
+    for i, (day_inflow, day_outflow) in enumerate(zip(inflow.tolist(), outflow.tolist())):
+        current = float(np.clip(current + day_inflow - day_outflow, 250, 1180))
+        storage[i] = current
+    level = 95 + ((storage - 250) / (1180 - 250)) * 35
+
+    columns = {
+        "inflow": inflow,
+        "outflow": outflow,
+        "precipitation": precipitation,
+        "temperature": temperature,
+        "evaporation": evaporation,
+        "humidity": humidity,
+        "snow_storage": snow_storage,
+        "level": level,
+        "storage": storage,
+        "operation_index": network_index,
+        "drinking": drinking,
+        "environment": environment,
+        "industry": industry,
+        "agriculture": agriculture,
+        "inflow_marker": inflow * 1.05,
+    }
+    # Python's round() (not np.round) keeps the stored values identical to the original generator.
+    return {name: [round(v, 3) for v in values.tolist()] for name, values in columns.items()}
+
+
+def _seed_rows(years: int) -> Tuple[List[tuple], List[tuple]]:
+    rng = np.random.default_rng(seed=1402)
+
+    days = years * 365
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    stamps = [start + timedelta(days=i) for i in range(days)]
+    seasonal = np.array([math.sin((2 * math.pi * ts.timetuple().tm_yday) / 365.0) for ts in stamps])
+    series = _seed_series(rng, days, seasonal)
+
+    ts_rows: List[tuple] = []
+    demand_rows: List[tuple] = []
+    for i, ts in enumerate(stamps):
+        for entity_type, entity_id, metric in TIMESERIES_SERIES:
+            ts_rows.append((str(uuid4()), entity_type, entity_id, metric, ts, series[metric][i], "good", "seed"))
+
+        for sector in ("drinking", "environment", "industry", "agriculture"):
+            demand_rows.append((str(uuid4()), sector, ts, series[sector][i], "normal"))
 
-    datasets = [
-        ("hydrology_daily", "hydrology", "Inflow/outflow and river gauge measurements"),
-        ("meteorology_daily", "meteorology", "Temperature, precipitation, evaporation, humidity, snow storage"),
-        ("reservoir_daily", "reservoir", "Reservoir level and storage daily status"),
-        ("demand_daily", "demand", "Sectoral water demand by day"),
-    ]
-    for name, category, description in datasets:
-        ds = db.query(Dataset).filter(Dataset.name == name).first()
-        if not ds:
-            ds = Dataset(name=name, category=category, description=description, latest_version=1, current_status="active")
-            db.add(ds)
-            db.flush()
-            db.add(
-                DatasetVersion(
-                    dataset_id=ds.id,
-                    version=1,
-                    file_name=f"{name}_seed.csv",
-                    record_count=0,
-                    quality_report={"rows": 0, "missing_cells": 0, "duplicate_rows": 0, "outliers": 0, "quality_score": 100},
+        if i % 180 == 0:
+            quality_flag = "suspect" if i % 3 == 0 else "good"
+            ts_rows.append(
+                (
+                    str(uuid4()),
+                    "hydrology",
+                    "golestan",
+                    "inflow",
+                    ts + timedelta(hours=1),
+                    series["inflow_marker"][i],
+                    quality_flag,
+                    "seed-duplicate-marker",
                 )
             )
+    return ts_rows, demand_rows
 
-    default_rules = [
-        ("Flood Risk Inflow", "inflow", ">", 220.0, "high"),
-        ("Low Storage Alert", "storage", "<", 320.0, "high"),
-    ]
-    for name, metric, op, threshold, severity in default_rules:
-        if not db.query(AlertRule).filter(AlertRule.name == name).first():
-            db.add(AlertRule(name=name, metric=metric, operator=op, threshold=threshold, severity=severity, is_active=True))
 
-    db.commit()
+def _copy_rows(db: Session, table: str, columns: Iterable[str], rows: List[tuple]) -> None:
+    raw = db.connection().connection.dbapi_connection
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    with raw.cursor() as cursor:
+        for offset in range(0, len(rows), LOAD_CHUNK_ROWS):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            for row in rows[offset : offset + LOAD_CHUNK_ROWS]:
+                writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
 
 
-def _generate_timeseries(db: Session) -> None:
-    has_any = db.query(TimeseriesPoint.id).first()
-    if has_any:
+def _bulk_load(db: Session, model, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, model.__tablename__, columns, rows)
         return
+    table = model.__table__
+    for offset in range(0, len(rows), LOAD_CHUNK_ROWS):
+        chunk = rows[offset : offset + LOAD_CHUNK_ROWS]
+        db.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
 
-    rng = np.random.default_rng(seed=1402)
 
-    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=5 * 365)
-    days = 5 * 365
-    storage = 760.0
-
-    ts_rows: List[TimeseriesPoint] = []
-    demand_rows: List[SectorDemand] = []
-
-    for i in range(days):
-        ts = start + timedelta(days=i)
-        day_of_year = ts.timetuple().tm_yday
-        seasonal = math.sin((2 * math.pi * day_of_year) / 365.0)
-
-        inflow = 120 + (55 * seasonal) + rng.normal(0, 8)
-        inflow = max(25.0, inflow)
-
-        temperature = 18 + (14 * seasonal) + rng.normal(0, 2.5)
-        precipitation = max(0.0, 3 + (6 * (1 - seasonal)) + rng.normal(0, 1.2))
-        evaporation = max(0.5, 2 + (4 * seasonal) + rng.normal(0, 0.8))
-        humidity = float(np.clip(58 + (14 * (1 - seasonal)) + rng.normal(0, 5), 20, 98))
-        snow_storage = max(0.0, 35 * (1 - max(0, seasonal)) + rng.normal(0, 2.0))
-
-        drinking = max(30.0, 56 + rng.normal(0, 2.0))
-        environment = max(18.0, 26 + rng.normal(0, 1.5))
-        industry = max(22.0, 34 + rng.normal(0, 3.0))
-        agriculture = max(40.0, 85 + (25 * seasonal) + rng.normal(0, 6.0))
-
-        total_release = drinking + environment + industry + agriculture
-        outflow = max(35.0, total_release * (0.95 + rng.normal(0, 0.03)))
-
-        storage = storage + inflow - outflow
-        storage = float(np.clip(storage, 250, 1180))
-        level = 95 + ((storage - 250) / (1180 - 250)) * 35
-
-        network_index = float(np.clip(0.75 + rng.normal(0, 0.08), 0.4, 1.0))
-
-        ts_rows.extend(
-            [
-                TimeseriesPoint(entity_type="hydrology", entity_id="golestan", metric="inflow", ts=ts, value=round(float(inflow), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="hydrology", entity_id="golestan", metric="outflow", ts=ts, value=round(float(outflow), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="meteorology", entity_id="met-a", metric="precipitation", ts=ts, value=round(float(precipitation), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="meteorology", entity_id="met-a", metric="temperature", ts=ts, value=round(float(temperature), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="meteorology", entity_id="met-a", metric="evaporation", ts=ts, value=round(float(evaporation), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="meteorology", entity_id="met-a", metric="humidity", ts=ts, value=round(float(humidity), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="meteorology", entity_id="met-a", metric="snow_storage", ts=ts, value=round(float(snow_storage), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="reservoir", entity_id="golestan", metric="level", ts=ts, value=round(float(level), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="reservoir", entity_id="golestan", metric="storage", ts=ts, value=round(float(storage), 3), quality_flag="good", source="seed"),
-                TimeseriesPoint(entity_type="downstream", entity_id="network", metric="operation_index", ts=ts, value=round(float(network_index), 3), quality_flag="good", source="seed"),
-            ]
-        )
-
-        if i % 3 == 0:
-            quality_flag = "suspect"
-        else:
-            quality_flag = "good"
-
-        for sector, value in (
-            ("drinking", drinking),
-            ("environment", environment),
-            ("industry", industry),
-            ("agriculture", agriculture),
-        ):
-            demand_rows.append(
-                SectorDemand(
-                    sector=sector,
-                    ts=ts,
-                    value=round(float(value), 3),
-                    scenario="normal",
-                )
-            )
-
-        if i % 180 == 0:
-            ts_rows.append(
-                TimeseriesPoint(
-                    entity_type="hydrology",
-                    entity_id="golestan",
-                    metric="inflow",
-                    ts=ts + timedelta(hours=1),
-                    value=round(float(inflow * 1.05), 3),
-                    quality_flag=quality_flag,
-                    source="seed-duplicate-marker",
-                )
-            )
+def _generate_timeseries(db: Session, years: int) -> None:
+    has_any = db.query(TimeseriesPoint.id).first()
+    if has_any:
+        return
 
-    db.bulk_save_objects(ts_rows)
-    db.bulk_save_objects(demand_rows)
+    ts_rows, demand_rows = _seed_rows(years)
+    _bulk_load(db, TimeseriesPoint, TIMESERIES_COPY_COLUMNS, ts_rows)
+    _bulk_load(db, SectorDemand, SECTOR_DEMAND_COPY_COLUMNS, demand_rows)
     db.commit()
 
 
@@ -393,9 +540,19 @@ def _ensure_demo_runs(db: Session) -> None:
         evaluate_alert_rules(db)
 
 
-def ensure_seed_data(db: Session) -> None:
-    roles = _ensure_permissions_roles(db)
-    _ensure_users(db, roles)
+def ensure_seed_data(db: Session, years: int | None = None) -> None:
+    marker = db.get(SeedMarker, SEED_MARKER)
+    if marker is not None and marker.version >= SEED_VERSION:
+        return
+
+    role_ids = _ensure_permissions_roles(db)
+    _ensure_users(db, role_ids)
     _ensure_static_entities(db)
-    _generate_timeseries(db)
+    _generate_timeseries(db, years if years is not None else get_settings().seed_years)
     _ensure_demo_runs(db)
+
+    if marker is None:
+        db.add(SeedMarker(name=SEED_MARKER, version=SEED_VERSION))
+    else:
+        marker.version = SEED_VERSION
+    db.commit()
@@ -1,8 +1,35 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Dict, Optional
 
+import orjson
 from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.db.query_stats import add_serialization_time
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class TimedJSONResponse(JSONResponse):
+    # Default response class; only the final encode is timed, not FastAPI's ``jsonable_encoder`` pass.
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        try:
+            return self.encode(content)
+        finally:
+            add_serialization_time(time.perf_counter() - start)
+
+    def encode(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+class FastJSONResponse(TimedJSONResponse):
+    # orjson encodes datetimes natively (same ISO-8601 text as ``isoformat()``), so handlers can pass
+    # raw column values and skip ``jsonable_encoder`` entirely.
+    def encode(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
 
 
 def success_response(request: Request, data: Any, pagination: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -15,6 +42,21 @@ def success_response(request: Request, data: Any, pagination: Optional[Dict[str,
     return payload
 
 
+def fast_success_response(
+    request: Request, data: Any, pagination: Optional[Dict[str, Any]] = None
+) -> FastJSONResponse:
+    return FastJSONResponse(success_response(request, data, pagination))
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    # orjson never emits raw newlines, so the payload always fits on one "data:" line.
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data, option=ORJSON_OPTIONS) + b"\n\n"
+
+
+def rows_to_dicts(fields: tuple[str, ...], rows) -> list[Dict[str, Any]]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
 def pagination_payload(page: int, page_size: int, total: int) -> Dict[str, Any]:
     total_pages = max((total + page_size - 1) // page_size, 1)
     return {
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List
+
+# Arabic-keyboard letters folded to their Persian forms, Arabic-Indic and Persian digits to ASCII, ZWNJ to a
+# space (so "پیش‌بینی" and "پیش بینی" agree), and diacritics, tatweel and bidi marks dropped.
+_PERSIAN_TRANSLATION = str.maketrans(
+    {
+        "\u064a": "\u06cc",  # Arabic yeh
+        "\u0649": "\u06cc",  # alef maksura
+        "\u0643": "\u06a9",  # Arabic kaf
+        "\u0629": "\u0647",  # teh marbuta
+        "\u200c": " ",  # zero-width non-joiner
+        **{chr(0x0660 + i): str(i) for i in range(10)},
+        **{chr(0x06F0 + i): str(i) for i in range(10)},
+        **{chr(code): None for code in range(0x064B, 0x0653)},
+        "\u0640": None,  # tatweel
+        "\u200d": None,
+        "\u200e": None,
+        "\u200f": None,
+    }
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower().translate(_PERSIAN_TRANSLATION)).strip()
+
+
+class KeywordMatcher:
+    # Aho-Corasick automaton: one pass over the text finds every keyword occurrence, so the cost depends on
+    # the message length and not on how many keywords there are. Keywords go through normalize_text, and
+    # the text passed in is expected to be normalized already.
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for keyword in {normalize_text(keyword) for keyword in keywords} - {""}:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _states(self, text: str):
+        goto, fail = self._goto, self._fail
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield state
+
+    def contains_any(self, text: str) -> bool:
+        output = self._output
+        return any(output[state] for state in self._states(text))
+
+    def find_all(self, text: str) -> List[str]:
+        output = self._output
+        found: List[str] = []
+        for state in self._states(text):
+            found.extend(output[state])
+        return found
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+API_DIR = Path(__file__).resolve().parents[1]
+if str(API_DIR) not in sys.path:
+    sys.path.insert(0, str(API_DIR))
+
+
+def configure_env(database_url: str | None = None) -> None:
+    os.environ.setdefault("DATABASE_URL", database_url or f"sqlite:///{API_DIR / 'bench.db'}")
+    os.environ.setdefault("DEMO_AUTO_SEED", "false")
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize_ms(samples: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+    }
+
+
+def seeded_client():
+    from fastapi.testclient import TestClient
+
+    from app.db.init_db import create_all
+    from app.db.session import SessionLocal
+    from app.main import app
+    from app.services.seeding import ensure_seed_data
+
+    create_all()
+    db = SessionLocal()
+    try:
+        ensure_seed_data(db)
+    finally:
+        db.close()
+    return TestClient(app)
+
+
+def login_headers(client, username: str = "admin", password: str = "admin123") -> Dict[str, str]:
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+def emit(result: Dict[str, Any], output: str | None) -> None:
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    print(text)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Concurrency sweep: async read routes vs threadpool-bound sync routes, with /health probed under load.
+
+Runs in-process over ASGI by default (SQLite + aiosqlite); pass --base-url to drive a live uvicorn
+server backed by PostgreSQL/asyncpg instead.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _common import configure_env, emit, login_headers, seeded_client, summarize_ms
+
+TARGETS = {
+    "async_timeseries": "/timeseries?metric=inflow&page=1&page_size=50",
+    "async_alerts": "/alerts?page=1&page_size=50",
+    "sync_datasets": "/datasets?page=1&page_size=50",
+}
+
+
+async def _drive(client: httpx.AsyncClient, url: str, headers, concurrency: int, requests_per_worker: int):
+    latencies: list[float] = []
+    health: list[float] = []
+    errors = 0
+    stop = asyncio.Event()
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                ok = response.status_code < 400
+            except Exception:
+                # In-process transports re-raise server errors such as pool checkout timeouts.
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    async def probe() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency": summarize_ms(latencies),
+        "health_under_load": summarize_ms(health),
+    }
+
+
+async def _run(args) -> dict:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=120)
+        with httpx.Client(base_url=args.base_url) as sync_client:
+            headers = login_headers(sync_client)
+    else:
+        configure_env()
+        headers = login_headers(seeded_client())
+        from app.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+    results = {}
+    async with client:
+        for name in args.targets:
+            results[name] = [
+                await _drive(client, TARGETS[name], headers, level, args.requests_per_worker)
+                for level in args.concurrency
+            ]
+
+    if not args.base_url:
+        from app.db.session import dispose_async_engines
+
+        await dispose_async_engines()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 40, 80, 160, 320])
+    parser.add_argument("--requests-per-worker", type=int, default=5)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args))
+    emit({"benchmark": "async_concurrency", "threadpool_tokens": 40, "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Cost of the chatbot's live-data context: snapshot rebuild (once per data change) vs per-message assembly.
+
+Assembly runs on every LLM-bound message and must stay well under 5 ms; the rebuild runs in a background
+thread when the data watermark moves.
+
+  python benchmarks/bench_chat_context.py --messages 2000 --max-tokens 600
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from _common import configure_env, emit, seeded_client, summarize_ms
+
+QUESTIONS = [
+    "حجم فعلی مخزن سد گلستان چقدر است؟",
+    "پیش‌بینی دبی ورودی هفته آینده چیست؟",
+    "هشدارهای باز کدام‌اند؟",
+    "چرا سهم کشاورزی در برنامه رهاسازی کاهش یافت؟",
+    "What is the forecast inflow for the dry scenario?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rebuilds", type=int, default=20)
+    parser.add_argument("--max-tokens", type=int, default=600)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_env()
+    seeded_client()
+    from app.services.chat_context import context_store
+
+    rebuild_ms = []
+    for _ in range(args.rebuilds):
+        start = time.perf_counter()
+        snapshot = context_store.refresh()
+        rebuild_ms.append((time.perf_counter() - start) * 1000)
+
+    assemble_ms = []
+    for i in range(args.messages):
+        start = time.perf_counter()
+        context = snapshot.render(QUESTIONS[i % len(QUESTIONS)], args.max_tokens)
+        assemble_ms.append((time.perf_counter() - start) * 1000)
+
+    emit(
+        {
+            "benchmark": "chat_context",
+            "sections": len(snapshot.sections),
+            "context_chars": len(context),
+            "rebuild": summarize_ms(rebuild_ms),
+            "assemble": summarize_ms(assemble_ms),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
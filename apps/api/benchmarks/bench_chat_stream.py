@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Chatbot latency against a paced mock LLM: time to first token for /chatbot/message vs its SSE variant.
+
+The buffered endpoint can only answer once the whole completion is in, so its first byte arrives at
+roughly first-token latency + n_tokens * token interval; the stream should track first-token latency.
+
+  python benchmarks/bench_chat_stream.py --requests 40 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import httpx
+
+from _common import configure_env, emit, login_headers, seeded_client, summarize_ms
+from mock_llm import start_mock_llm
+
+QUESTION = "برای سناریوی خشکسالی، رهاسازی سد گلستان چقدر باشد؟"
+
+
+async def _buffered(client: httpx.AsyncClient, headers) -> tuple[float, float]:
+    start = time.perf_counter()
+    response = await client.post("/chatbot/message", json={"message": QUESTION}, headers=headers)
+    response.raise_for_status()
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, elapsed
+
+
+async def _streamed(client: httpx.AsyncClient, headers) -> tuple[float, float]:
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", "/chatbot/message/stream", json={"message": QUESTION}, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_token is None and line == "event: token":
+                first_token = (time.perf_counter() - start) * 1000
+    total = (time.perf_counter() - start) * 1000
+    return first_token if first_token is not None else total, total
+
+
+async def _drive(client, headers, call, requests: int, concurrency: int) -> dict:
+    first: list[float] = []
+    total: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            ttft, elapsed = await call(client, headers)
+            first.append(ttft)
+            total.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        "requests": len(total),
+        "throughput_rps": round(len(total) / (time.perf_counter() - started), 2),
+        "time_to_first_token": summarize_ms(first),
+        "total": summarize_ms(total),
+    }
+
+
+def _serve_app() -> tuple:
+    import uvicorn
+
+    from app.main import app
+
+    # httpx.ASGITransport buffers whole responses, so streaming has to go through a real socket.
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-api", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _run(args, base_url: str) -> dict:
+    with httpx.Client(base_url=base_url, timeout=120) as sync_client:
+        headers = login_headers(sync_client)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        await _buffered(client, headers)
+        return {
+            "buffered": await _drive(client, headers, _buffered, args.requests, args.concurrency),
+            "stream": await _drive(client, headers, _streamed, args.requests, args.concurrency),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_llm(first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+    os.environ.update(OPENROUTER_API_KEY="mock", OPENROUTER_BASE_URL=base_url)
+    configure_env()
+    seeded_client()
+    api, api_url = _serve_app()
+    try:
+        results = asyncio.run(_run(args, api_url))
+    finally:
+        api.should_exit = True
+        server.shutdown()
+    emit(
+        {
+            "benchmark": "chat_stream",
+            "mock": {"first_token_ms": args.first_token_ms, "token_ms": args.token_ms},
+            "results": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Cold-start timing: interpreter + `import app.main` + startup hooks until /health and /ready answer.
+
+Every sample is a fresh Python process. "fresh" samples start from an empty database, so they include the
+full seed; "seeded" samples reuse it and should only pay for the seed-marker lookup. Exits non-zero when
+the median seeded import-plus-ready time exceeds --budget-ms, so it can gate autoscaling-sensitive changes.
+
+  python benchmarks/bench_cold_start.py --runs 5 --budget-ms 2500
+  python benchmarks/bench_cold_start.py --background-seed
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from _common import API_DIR, emit
+
+HEAVY_MODULES = ("pandas", "reportlab", "pyarrow", "numpy", "httpx")
+READY_POLL_SECONDS = 0.25
+
+
+def _child() -> None:
+    started = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    imported = time.perf_counter()
+    with TestClient(app) as client:
+        started_up = time.perf_counter()
+        client.get("/health").raise_for_status()
+        healthy = time.perf_counter()
+        # A tight poll loop competes with the seeding thread for the GIL; probes are seconds apart in practice.
+        while client.get("/ready").status_code != 200:
+            time.sleep(READY_POLL_SECONDS)
+        ready = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "import_ms": round((imported - started) * 1000, 1),
+                "startup_ms": round((started_up - imported) * 1000, 1),
+                "health_ms": round((healthy - started) * 1000, 1),
+                "ready_ms": round((ready - started) * 1000, 1),
+                "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+            }
+        )
+    )
+
+
+def _sample(database_url: str, background: bool) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update(
+        DATABASE_URL=database_url,
+        DEMO_AUTO_SEED="true",
+        SEED_IN_BACKGROUND="true" if background else "false",
+        REPORT_WORKERS="0",
+    )
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child"], env=env, capture_output=True, text=True, cwd=API_DIR, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _summary(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    keys = ("import_ms", "startup_ms", "health_ms", "ready_ms", "process_ms")
+    return {
+        "runs": len(samples),
+        **{f"median_{key}": round(statistics.median(s[key] for s in samples), 1) for key in keys},
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fresh-runs", type=int, default=1)
+    parser.add_argument("--background-seed", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=2500.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh: List[Dict[str, Any]] = []
+        for i in range(args.fresh_runs):
+            path = Path(tmp) / f"fresh-{i}.db"
+            fresh.append(_sample(f"sqlite:///{path}", args.background_seed))
+        seeded_url = f"sqlite:///{Path(tmp) / f'fresh-{args.fresh_runs - 1}.db'}"
+        seeded = [_sample(seeded_url, args.background_seed) for _ in range(args.runs)]
+
+    result = {
+        "benchmark": "cold_start",
+        "background_seed": args.background_seed,
+        "budget_ms": args.budget_ms,
+        "fresh": _summary(fresh),
+        "seeded": _summary(seeded),
+    }
+    emit(result, args.output)
+    if result["seeded"]["median_ready_ms"] > args.budget_ms:
+        raise SystemExit(f"seeded cold start {result['seeded']['median_ready_ms']}ms exceeds {args.budget_ms}ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""/llm/explain latency with a model behind it: first call per (run, context) vs repeat calls served from storage.
+
+The default-context explanation is built in the background when a run is created, so operators opening a
+fresh run should already see the stored-path latency; only new context overrides pay for generation.
+
+  python benchmarks/bench_explain.py --repeats 50 --first-token-ms 400
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from _common import configure_env, emit, login_headers, seeded_client, summarize_ms
+from mock_llm import start_mock_llm
+
+
+def _timed(client, run_id: str, context: dict, headers) -> float:
+    start = time.perf_counter()
+    response = client.post("/llm/explain", json={"run_id": run_id, "context": context}, headers=headers)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--overrides", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_llm(first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+    os.environ.update(LLM_BACKEND="local", LOCAL_LLM_BASE_URL=base_url, LOCAL_LLM_BATCH_WINDOW_MS="0")
+    configure_env()
+    client = seeded_client()
+    headers = login_headers(client)
+    try:
+        start = time.perf_counter()
+        response = client.post(
+            "/optimization/run",
+            json={"name": "bench explain", "horizon_days": 30, "scenario": "normal", "weights": {}, "constraints": {}},
+            headers=headers,
+        )
+        response.raise_for_status()
+        create_ms = (time.perf_counter() - start) * 1000
+        run_id = response.json()["data"]["id"]
+
+        stored = [_timed(client, run_id, {}, headers) for _ in range(args.repeats)]
+        generated = [_timed(client, run_id, {"drought_risk": 0.5 + i / 100}, headers) for i in range(args.overrides)]
+        repeated_overrides = [
+            _timed(client, run_id, {"drought_risk": 0.5 + i / 100}, headers) for i in range(args.overrides)
+        ]
+    finally:
+        server.shutdown()
+
+    emit(
+        {
+            "benchmark": "explain",
+            "mock": {"first_token_ms": args.first_token_ms, "token_ms": args.token_ms},
+            # TestClient runs background tasks before returning, so this includes the precompute.
+            "create_run_with_precompute_ms": round(create_ms, 3),
+            "default_context_stored": summarize_ms(stored),
+            "new_override_generated": summarize_ms(generated),
+            "repeated_override_stored": summarize_ms(repeated_overrides),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Daily forecast refresh: continuing from the stored model state vs rebuilding it from the whole history.
+
+Each simulated day appends one observation per series, then refreshes every entity and scenario. The
+incremental path reads only the rows after the latest run's window; the full path rescans everything.
+
+  python benchmarks/bench_forecast_refresh.py --days 30 --seed-years 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from datetime import timedelta
+
+from _common import configure_env, emit, summarize_ms
+
+ENTITIES = ("inflow", "demand", "state")
+SCENARIOS = ("wet", "normal", "dry")
+
+
+def _append_day(db, day) -> None:
+    from app.db.models import SectorDemand, TimeseriesPoint
+
+    db.add_all(
+        [
+            TimeseriesPoint(entity_type="hydrology", entity_id="golestan", metric="inflow", ts=day, value=118.0),
+            TimeseriesPoint(entity_type="reservoir", entity_id="golestan", metric="storage", ts=day, value=702.0),
+            *(SectorDemand(sector=sector, ts=day, value=50.0) for sector in ("drinking", "environment", "industry")),
+        ]
+    )
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed-years", type=int, default=5)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SEED_YEARS", str(args.seed_years))
+    configure_env()
+    from app.db.init_db import create_all
+    from app.db.models import TimeseriesPoint
+    from app.db.session import SessionLocal
+    from app.services.forecasting import _refresh_state, run_forecast, train_forecast_model
+    from app.services.seeding import ensure_seed_data
+
+    create_all()
+    db = SessionLocal()
+    try:
+        ensure_seed_data(db)
+        for entity in ENTITIES:
+            train_forecast_model(db, entity)
+        last = db.query(TimeseriesPoint.ts).order_by(TimeseriesPoint.ts.desc()).limit(1).scalar()
+
+        refresh, incremental, full = [], [], []
+        for offset in range(1, args.days + 1):
+            _append_day(db, last + timedelta(days=offset))
+            start = time.perf_counter()
+            for entity in ENTITIES:
+                for scenario in SCENARIOS:
+                    run_forecast(db, entity, args.horizon, scenario)
+            refresh.append((time.perf_counter() - start) * 1000)
+            for entity in ENTITIES:
+                start = time.perf_counter()
+                _refresh_state(db, entity)
+                incremental.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                _refresh_state(db, entity, full=True)
+                full.append((time.perf_counter() - start) * 1000)
+    finally:
+        db.close()
+
+    emit(
+        {
+            "benchmark": "forecast_refresh",
+            "days": args.days,
+            "seed_years": args.seed_years,
+            "series_per_day": len(ENTITIES) * len(SCENARIOS),
+            "daily_refresh": summarize_ms(refresh),
+            "state_incremental": summarize_ms(incremental),
+            "state_full_rebuild": summarize_ms(full),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
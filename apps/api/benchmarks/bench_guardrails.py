@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Per-message cost of the chatbot scope/builder guardrails as the keyword list grows.
+
+Compares the compiled matcher (Aho-Corasick over normalized keywords + one combined builder regex)
+with the previous approach (normalize per check, `keyword in text` for every keyword, one re.search
+per builder pattern). Synthetic Persian terms pad the real keyword list to each size.
+
+  python benchmarks/bench_guardrails.py --sizes 0 1000 5000 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import timeit
+from typing import Callable, Dict, List
+
+from _common import configure_env, emit
+
+PERSIAN_LETTERS = "ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+MESSAGES = [
+    "حجم فعلی مخزن سد گلستان چقدر است؟",
+    "چرا سهم کشاورزی در برنامه رهاسازی این هفته کاهش یافت و چه سناریویی پیشنهاد می‌شود؟",
+    "What is the optimization result for the dry scenario and how does it affect drinking demand?",
+    "هوای امروز تهران چطور است؟",
+    "tell me a joke about football " * 4,
+    "کی این سامانه را ساخت؟",
+]
+
+
+def _synthetic_terms(count: int) -> List[str]:
+    rng = random.Random(1402)
+    return ["".join(rng.choice(PERSIAN_LETTERS) for _ in range(rng.randint(4, 9))) for _ in range(count)]
+
+
+def _previous_checks(keywords: List[str], patterns: List[str]) -> Callable[[str], bool]:
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text.strip().lower())
+
+    def check(message: str) -> bool:
+        if any(re.search(pattern, normalize(message)) for pattern in patterns):
+            return True
+        normalized = normalize(message)
+        return any(keyword in normalized for keyword in keywords)
+
+    return check
+
+
+def _compiled_checks(keywords: List[str], patterns: List[str]) -> Callable[[str], bool]:
+    from app.utils.text import KeywordMatcher, normalize_text
+
+    matcher = KeywordMatcher(keywords)
+    builder = re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+    def check(message: str) -> bool:
+        normalized = normalize_text(message)
+        return builder.search(normalized) is not None or matcher.contains_any(normalized)
+
+    return check
+
+
+def _per_message_us(check: Callable[[str], bool], number: int) -> float:
+    seconds = min(timeit.repeat(lambda: [check(message) for message in MESSAGES], number=number, repeat=5))
+    return round(seconds / number / len(MESSAGES) * 1e6, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1_000, 5_000, 20_000])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_env()
+    from app.services.openrouter_chat import BUILDER_PATTERNS, PROJECT_KEYWORDS
+
+    results: Dict[str, Dict[str, float]] = {}
+    for size in args.sizes:
+        keywords = sorted(PROJECT_KEYWORDS) + _synthetic_terms(max(0, size - len(PROJECT_KEYWORDS)))
+        previous = _previous_checks(keywords, BUILDER_PATTERNS)
+        compiled = _compiled_checks(keywords, BUILDER_PATTERNS)
+        assert [previous(m) for m in MESSAGES] == [compiled(m) for m in MESSAGES]
+        results[str(len(keywords))] = {
+            "previous_us": _per_message_us(previous, args.number),
+            "compiled_us": _per_message_us(compiled, args.number),
+        }
+
+    emit({"benchmark": "guardrails", "messages": len(MESSAGES), "per_message": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the numerical service kernels, free of DB and HTTP noise.
+
+Each case is timed over calibrated rounds (min / median / mean per call) and then called once more under
+tracemalloc to record the peak allocation. --save stores the result as a baseline; --compare diffs the
+median and the allocation peak against it and exits non-zero past --tolerance.
+
+  python benchmarks/bench_kernels.py --save
+  python benchmarks/bench_kernels.py --compare
+  python benchmarks/bench_kernels.py -k optimization --compare
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from _common import configure_env, emit
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "kernels.json"
+SERIES_SIZES = (365, 3_650, 18_250)
+HORIZONS = (14, 90, 365)
+FRAME_ROWS = (1_000, 10_000, 100_000)
+
+
+def _series(size: int) -> List[float]:
+    rng = np.random.default_rng(1402)
+    days = np.arange(size)
+    return (120 + 55 * np.sin(2 * np.pi * days / 365.0) + rng.normal(0, 8, size)).round(3).tolist()
+
+
+def _frame(rows: int):
+    import pandas as pd
+
+    rng = np.random.default_rng(1402)
+    frame = pd.DataFrame(
+        {
+            "ts": pd.date_range("2000-01-01", periods=rows, freq="h"),
+            "inflow": rng.normal(120, 25, rows),
+            "outflow": rng.normal(110, 20, rows),
+            "storage": rng.normal(700, 90, rows),
+            "station": rng.choice(["met-a", "met-b", "met-c"], rows),
+        }
+    )
+    frame.loc[frame.sample(frac=0.01, random_state=1).index, "inflow"] = np.nan
+    return pd.concat([frame, frame.head(rows // 100)], ignore_index=True)
+
+
+def _cases() -> Dict[str, Callable[[], Any]]:
+    from app.services.data_quality import quality_report_from_dataframe
+    from app.services.forecasting import _advance, _empty_state, _forecast_points, _state_metrics
+    from app.services.optimization import SECTORS, _plan_horizon
+    from app.services.scenario import _simulate_points
+
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    cases: Dict[str, Callable[[], Any]] = {}
+
+    for size in SERIES_SIZES:
+        values = _series(size)
+        cases[f"forecast_state[{size}]"] = lambda values=values: _state_metrics(_advance(_empty_state(), values))
+        state = _advance(_empty_state(), values[:-1])
+        cases[f"forecast_state_update[{size}]"] = lambda state=state, values=values: _advance(state, values[-1:])
+
+    for horizon in HORIZONS:
+        cases[f"forecast_points[{horizon}]"] = lambda horizon=horizon: _forecast_points(
+            "bench", now, horizon, base=120.0, volatility=9.5, trend=0.02
+        )
+        cases[f"optimization_plan[{horizon}]"] = lambda horizon=horizon: _plan_horizon(
+            "bench",
+            now,
+            horizon,
+            inflow_base=135.0,
+            sector_demands={"drinking": 56.0, "environment": 26.0, "industry": 34.0, "agriculture": 85.0},
+            storage=760.0,
+            sector_weights={s: w for s, w in zip(SECTORS, (1.3, 1.2, 0.9, 0.8))},
+            min_env_flow=22.0,
+            min_release=40.0,
+            max_release=260.0,
+            min_storage=280.0,
+            max_storage=1150.0,
+        )
+        cases[f"scenario_points[{horizon}]"] = lambda horizon=horizon: _simulate_points(
+            now, horizon, inflow=150.0, demand=220.0, max_release=260.0, storage=700.0
+        )
+
+    for rows in FRAME_ROWS:
+        frame = _frame(rows)
+        cases[f"quality_report[{rows}]"] = lambda frame=frame: quality_report_from_dataframe(frame)
+
+    return cases
+
+
+def _calibrate(fn: Callable[[], Any], min_round_seconds: float) -> int:
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_seconds or iterations >= 1 << 20:
+            return iterations
+        iterations *= 2
+
+
+def _measure(fn: Callable[[], Any], rounds: int, min_round_seconds: float) -> Dict[str, Any]:
+    fn()
+    iterations = _calibrate(fn, min_round_seconds)
+    per_call: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "min_us": round(min(per_call), 2),
+        "median_us": round(statistics.median(per_call), 2),
+        "mean_us": round(statistics.fmean(per_call), 2),
+        "stdev_us": round(statistics.stdev(per_call), 2) if len(per_call) > 1 else 0.0,
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def _compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions: List[str] = []
+    for name, stats in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        time_delta = stats["median_us"] / before["median_us"] - 1 if before["median_us"] else 0.0
+        alloc_delta = stats["peak_alloc_kib"] / before["peak_alloc_kib"] - 1 if before["peak_alloc_kib"] else 0.0
+        flag = time_delta > tolerance or alloc_delta > tolerance
+        print(
+            f"{'REGRESSION' if flag else '          '} {name:<28} median {before['median_us']:>12.1f} -> "
+            f"{stats['median_us']:>12.1f} us ({time_delta:+.0%})  peak {before['peak_alloc_kib']:>10.1f} -> "
+            f"{stats['peak_alloc_kib']:>10.1f} KiB ({alloc_delta:+.0%})",
+            file=sys.stderr,
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="keyword", default=None, help="Only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-seconds", type=float, default=0.05)
+    parser.add_argument("--save", nargs="?", const=str(BASELINE_PATH), default=None)
+    parser.add_argument("--compare", nargs="?", const=str(BASELINE_PATH), default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_env()
+    results: Dict[str, Any] = {}
+    for name, fn in _cases().items():
+        if args.keyword and args.keyword not in name:
+            continue
+        results[name] = _measure(fn, args.rounds, args.min_round_seconds)
+
+    emit({"benchmark": "kernels", "results": results}, args.output)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stored = json.loads(path.read_text(encoding="utf-8")) if path.is_file() else {}
+        stored.update(results)
+        path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline: Dict[str, Any] = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = _compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Concurrent operators against a slot-limited local LLM: direct calls vs the batching LocalBackend.
+
+The mock server behaves like llama-server --parallel N on CPU (at most N completions at once). Operators ask a
+mix of distinct chat questions and repeated /llm/explain-style prompts for the same run; the backend coalesces
+the repeats, caps what is in flight at the server, and refuses work beyond its queue instead of letting
+latency grow without bound.
+
+  python benchmarks/bench_local_llm.py --operators 32 --requests 4 --slots 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from _common import configure_env, emit, summarize_ms
+from mock_llm import start_mock_llm
+
+
+def _request(i: int, repeat_every: int):
+    from app.services.llm_backends import LlmRequest
+
+    # Every repeat_every-th call is the same explanation prompt, as when several operators open one run.
+    content = "explain run seed-dry" if i % repeat_every == 0 else f"question {i}"
+    return LlmRequest(messages=[{"role": "user", "content": content}], max_tokens=64)
+
+
+async def _direct(base_url: str, args) -> dict:
+    from app.services.llm_backends import _completion_payload
+
+    latencies: list[float] = []
+    async with httpx.AsyncClient(timeout=600) as client:
+
+        async def operator(offset: int) -> None:
+            for n in range(args.requests):
+                start = time.perf_counter()
+                payload = _completion_payload("local", _request(offset * args.requests + n, args.repeat_every))
+                (await client.post(f"{base_url}/chat/completions", json=payload)).raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(operator(i) for i in range(args.operators)))
+    return {"elapsed_s": round(time.perf_counter() - started, 2), "latency": summarize_ms(latencies), "rejected": 0}
+
+
+async def _batched(args) -> dict:
+    from app.services.llm_backends import LlmBusy, LocalBackend
+
+    backend = LocalBackend()
+    latencies: list[float] = []
+    rejected = 0
+
+    async def operator(offset: int) -> None:
+        nonlocal rejected
+        for n in range(args.requests):
+            start = time.perf_counter()
+            try:
+                await backend.complete(_request(offset * args.requests + n, args.repeat_every))
+            except LlmBusy:
+                rejected += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(operator(i) for i in range(args.operators)))
+    await backend.close()
+    return {
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "latency": summarize_ms(latencies),
+        "rejected": rejected,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operators", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4, help="Requests per operator")
+    parser.add_argument("--repeat-every", type=int, default=3)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--queue-max", type=int, default=32)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_llm(first_token_ms=args.first_token_ms, token_ms=args.token_ms, slots=args.slots)
+    os.environ.update(
+        LLM_BACKEND="local",
+        LOCAL_LLM_BASE_URL=base_url,
+        LOCAL_LLM_BATCH_SIZE=str(args.slots),
+        LOCAL_LLM_QUEUE_MAX=str(args.queue_max),
+        LOCAL_LLM_REQUEST_TIMEOUT_SECONDS="600",
+    )
+    configure_env()
+    stats = server.RequestHandlerClass.stats
+    try:
+        direct = asyncio.run(_direct(base_url, args))
+        direct["server_requests"] = stats["requests"]
+        stats["requests"] = 0
+        batched = asyncio.run(_batched(args))
+        batched["server_requests"] = stats["requests"]
+    finally:
+        server.shutdown()
+
+    emit(
+        {
+            "benchmark": "local_llm",
+            "operators": args.operators,
+            "requests": args.operators * args.requests,
+            "mock": {"slots": args.slots, "first_token_ms": args.first_token_ms, "token_ms": args.token_ms},
+            "direct": direct,
+            "batched": batched,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
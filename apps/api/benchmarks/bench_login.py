@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Login burst: N users logging in at once, with /health probed while the hashing workers are busy.
+
+Every demo account logs in repeatedly, so each request pays one argon2 verify. Compare hashing
+configurations through the environment, e.g.
+
+  python benchmarks/bench_login.py --users 50
+  PASSWORD_HASH_WORKERS=0 python benchmarks/bench_login.py --users 50
+  ARGON2_MEMORY_COST_KIB=65536 ARGON2_TIME_COST=3 python benchmarks/bench_login.py
+
+Runs in-process over ASGI by default; pass --base-url to drive a live server.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _common import configure_env, emit, seeded_client, summarize_ms
+
+ACCOUNTS = (("admin", "admin123"), ("operator", "op123"), ("analyst", "an123"), ("viewer", "vi123"), ("auditor", "au123"))
+
+
+async def _drive(client: httpx.AsyncClient, users: int, logins_per_user: int) -> dict:
+    latencies: list[float] = []
+    health: list[float] = []
+    statuses: dict[int, int] = {}
+    stop = asyncio.Event()
+
+    async def user(index: int) -> None:
+        username, password = ACCOUNTS[index % len(ACCOUNTS)]
+        for _ in range(logins_per_user):
+            start = time.perf_counter()
+            try:
+                status = (await client.post("/auth/login", json={"username": username, "password": password})).status_code
+            except Exception:
+                status = 599
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def probe() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+
+    return {
+        "users": users,
+        "requests": len(latencies),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput_rps": round(statuses.get(200, 0) / elapsed, 2),
+        "latency": summarize_ms(latencies),
+        "health_under_load": summarize_ms(health),
+    }
+
+
+async def _run(args) -> dict:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=120)
+    else:
+        configure_env()
+        seeded_client()
+        from app.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+    async with client:
+        # One warm-up login per account so worker start-up and any rehash are not part of the burst.
+        for username, password in ACCOUNTS:
+            (await client.post("/auth/login", json={"username": username, "password": password})).raise_for_status()
+        result = await _drive(client, args.users, args.logins_per_user)
+
+    if not args.base_url:
+        from app.core.password_hashing import shutdown_password_executor
+        from app.db.session import dispose_async_engines
+
+        shutdown_password_executor()
+        await dispose_async_engines()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins-per-user", type=int, default=4)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    result = asyncio.run(_run(args))
+    if not args.base_url:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        result["hashing"] = {
+            "workers": settings.password_hash_workers,
+            "max_pending": settings.password_hash_max_pending,
+            "argon2": {
+                "time_cost": settings.argon2_time_cost,
+                "memory_cost_kib": settings.argon2_memory_cost_kib,
+                "parallelism": settings.argon2_parallelism,
+            },
+        }
+    emit({"benchmark": "login_burst", **result}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Network optimization scaling: a synthetic reservoir network solved inline and across worker processes.
+
+The network is --basins independent cascades of --reservoirs / --basins reservoirs each. Each reservoir feeds
+the next one down its cascade and serves three nodes of its own. Cascades are the unit of parallel work, so
+the speedup is bounded by min(workers, basins, cores). The first solve in each pool starts its workers and is
+not counted.
+
+  python benchmarks/bench_network.py --reservoirs 20 --basins 10 --horizon 365 --workers 0,1,2,4,8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from _common import configure_env, emit, summarize_ms
+
+
+def _network(reservoirs: int, basins: int, horizon: int):
+    from app.services.network import NodeSpec, ReservoirSpec
+
+    rng = np.random.default_rng(1402)
+    days = np.arange(horizon)
+    specs = []
+    per_basin = max(1, reservoirs // basins)
+    for index in range(reservoirs):
+        basin, position = divmod(index, per_basin)
+        downstream = f"r{index + 1}" if position < per_basin - 1 and index + 1 < reservoirs else None
+        capacity = rng.uniform(300, 1200)
+        specs.append(
+            ReservoirSpec(
+                id=f"r{index}",
+                name=f"Reservoir {basin}-{position}",
+                inflow=rng.uniform(20, 80) * (1 + 0.4 * np.sin(2 * np.pi * (days + rng.integers(365)) / 365)),
+                storage=0.6 * capacity,
+                min_storage=np.full(horizon, 0.2 * capacity),
+                max_storage=np.full(horizon, 0.95 * capacity),
+                min_release=8.0,
+                max_release=np.full(horizon, 0.3 * capacity),
+                downstream_id=downstream,
+                nodes=[
+                    NodeSpec(f"r{index}-env", f"env {index}", "environment", 1.2, rng.uniform(8, 15), 8.0),
+                    NodeSpec(f"r{index}-city", f"city {index}", "drinking", 1.3, rng.uniform(10, 30)),
+                    NodeSpec(f"r{index}-farm", f"farm {index}", "agriculture", 0.8, rng.uniform(20, 60)),
+                ],
+            )
+        )
+    return specs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservoirs", type=int, default=20)
+    parser.add_argument("--basins", type=int, default=10)
+    parser.add_argument("--horizon", type=int, default=365)
+    parser.add_argument("--workers", default="0,1,2,4,8")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_env()
+    from app.services import network
+
+    specs = _network(args.reservoirs, args.basins, args.horizon)
+    results = []
+    inline_ms = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        network.shutdown_network_executor()
+        plans, groups = network.solve_network(specs, workers)
+        samples = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            network.solve_network(specs, workers)
+            samples.append((time.perf_counter() - start) * 1000)
+        summary = summarize_ms(samples)
+        inline_ms = summary["p50_ms"] if workers == 0 else inline_ms
+        results.append(
+            {
+                "workers": workers,
+                **summary,
+                "speedup_vs_inline": round(inline_ms / summary["p50_ms"], 2) if inline_ms else None,
+            }
+        )
+    network.shutdown_network_executor()
+
+    emit(
+        {
+            "benchmark": "network",
+            "cpu_count": os.cpu_count(),
+            "reservoirs": len(specs),
+            "subnetworks": groups,
+            "horizon_days": args.horizon,
+            "mean_iterations": round(sum(plan.iterations for plan in plans) / len(plans), 2),
+            "results": results,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
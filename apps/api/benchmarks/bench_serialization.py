@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""p50/p99 latency of 500-row list pages: legacy dict+jsonable_encoder path vs the orjson tuple path."""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from _common import configure_env, emit, login_headers, seeded_client, summarize_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_env()
+    client = seeded_client()
+
+    from fastapi.encoders import jsonable_encoder
+
+    from app.db.reads import TIMESERIES_FIELDS
+    from app.db.models import TimeseriesPoint
+    from app.db.session import SessionLocal
+    from app.utils.responses import FastJSONResponse, rows_to_dicts
+
+    db = SessionLocal()
+    legacy, fast = [], []
+    try:
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            rows = db.query(TimeseriesPoint).order_by(TimeseriesPoint.ts.desc()).limit(args.page_size).all()
+            data = [
+                {
+                    "id": r.id,
+                    "entity_type": r.entity_type,
+                    "entity_id": r.entity_id,
+                    "metric": r.metric,
+                    "ts": r.ts.isoformat(),
+                    "value": r.value,
+                    "quality_flag": r.quality_flag,
+                    "source": r.source,
+                }
+                for r in rows
+            ]
+            json.dumps(jsonable_encoder({"request_id": "bench", "data": data}), ensure_ascii=False, separators=(",", ":"))
+            legacy.append((time.perf_counter() - start) * 1000)
+            db.expunge_all()
+
+            start = time.perf_counter()
+            columns = [getattr(TimeseriesPoint, name) for name in TIMESERIES_FIELDS]
+            rows = db.query(*columns).order_by(TimeseriesPoint.ts.desc()).limit(args.page_size).all()
+            FastJSONResponse({"request_id": "bench", "data": rows_to_dicts(TIMESERIES_FIELDS, rows)})
+            fast.append((time.perf_counter() - start) * 1000)
+    finally:
+        db.close()
+
+    headers = login_headers(client)
+    endpoint = []
+    url = f"/timeseries?page=1&page_size={args.page_size}"
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        endpoint.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+
+    emit(
+        {
+            "benchmark": "serialization",
+            "page_size": args.page_size,
+            "query_and_encode": {"legacy_orm_jsonable_encoder": summarize_ms(legacy), "orjson_tuples": summarize_ms(fast)},
+            "endpoint_get_timeseries": summarize_ms(endpoint),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Local stand-in for an OpenAI-compatible /chat/completions endpoint (OpenRouter, vLLM, llama.cpp ...).
+
+Answers both plain and "stream": true requests with a canned Persian reply, pacing tokens so streaming
+and time-to-first-token can be measured without a real key:
+
+  python benchmarks/mock_llm.py --port 8099 --first-token-ms 300 --token-ms 30
+  OPENROUTER_API_KEY=mock OPENROUTER_BASE_URL=http://127.0.0.1:8099/v1 uvicorn app.main:app
+
+--slots N mimics a CPU llama-server started with --parallel N: at most N completions run at once, the rest wait.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+REPLY = (
+    "بر اساس سناریوی نرمال، رهاسازی روزانه سد گلستان در محدوده ۱۲۰ تا ۱۴۰ مترمکعب بر ثانیه پیشنهاد می‌شود "
+    "تا حداقل دبی محیط‌زیستی و نیاز شرب تامین شود و تراز مخزن بالاتر از حد ایمنی بماند."
+)
+
+
+def _tokens(text: str) -> List[str]:
+    words = text.split(" ")
+    return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+
+def make_handler(first_token_ms: float, token_ms: float, fail_first: int = 0, slots: int = 0):
+    state = {"requests": 0}
+    lock = threading.Lock()
+    slot = threading.BoundedSemaphore(slots) if slots > 0 else None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        stats = state
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                state["requests"] += 1
+                failing = state["requests"] <= fail_first
+            if not self.path.endswith("/chat/completions") or failing:
+                self.send_response(404 if not failing else 503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if slot is None:
+                self._complete(body)
+                return
+            with slot:
+                self._complete(body)
+
+        def _complete(self, body) -> None:
+            model = body.get("model", "mock/llm")
+            tokens = _tokens(REPLY)
+            time.sleep(first_token_ms / 1000)
+            if not body.get("stream"):
+                time.sleep(token_ms * (len(tokens) - 1) / 1000)
+                payload = json.dumps(
+                    {"model": model, "choices": [{"message": {"role": "assistant", "content": "".join(tokens)}}]}
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            lines = [": OPENROUTER PROCESSING"]
+            lines += [
+                "data: " + json.dumps({"model": model, "choices": [{"delta": {"content": token}}]}) for token in tokens
+            ]
+            lines.append("data: [DONE]")
+            for i, line in enumerate(lines):
+                if i > 1:
+                    time.sleep(token_ms / 1000)
+                chunk = (line + "\n\n").encode("utf-8")
+                self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of concurrent operators would overflow the default listen backlog of 5 and get reset.
+    request_queue_size = 256
+
+
+def start_mock_llm(
+    port: int = 0, first_token_ms: float = 300, token_ms: float = 30, fail_first: int = 0, slots: int = 0
+):
+    server = _Server(("127.0.0.1", port), make_handler(first_token_ms, token_ms, fail_first, slots))
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests with 503")
+    parser.add_argument("--slots", type=int, default=0, help="Concurrent completions, 0 = unlimited")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_llm(args.port, args.first_token_ms, args.token_ms, args.fail_first, args.slots)
+    print(f"mock LLM listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
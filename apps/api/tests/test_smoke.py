@@ -1,15 +1,27 @@
+import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
 os.environ.setdefault("DEMO_AUTO_SEED", "false")
 os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000")
 
+import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 
+from app.core.auth_cache import principal_cache, revocations
+from app.core.config import get_settings
+from app.core.security import hash_token
 from app.db.init_db import create_all
+from app.db.models import RefreshToken, RunExplanation, User
+from app.db.query_stats import begin_request_stats, end_request_stats
 from app.db.session import SessionLocal
 from app.main import app
-from app.services.seeding import ensure_seed_data
+from app.services.chat_context import context_store
+from app.services.refresh_tokens import purge_expired_refresh_tokens
+from app.services.seeding import _ensure_permissions_roles, _ensure_static_entities, _ensure_users, ensure_seed_data
 
 
 create_all()
@@ -108,3 +120,781 @@ def test_invalid_or_expired_token_returns_401_not_500():
     assert refresh.status_code == 401
     refresh_body = refresh.json()
     assert refresh_body["error"]["code"] in {"invalid_token", "token_expired"}
+
+
+def test_release_plan_pdf_export_is_rendered_once_and_cached():
+    headers = _login()
+    optimization = client.post(
+        "/optimization/run",
+        json={"name": "pdf run", "horizon_days": 90, "scenario": "dry", "weights": {}, "constraints": {}},
+        headers=headers,
+    )
+    run_id = optimization.json()["data"]["id"]
+
+    first = client.get(f"/release-plans/{run_id}/export?format=pdf", headers=headers)
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.content.startswith(b"%PDF")
+
+    from app.services.reports import cached_report_path
+
+    assert cached_report_path(run_id) is not None
+    second = client.get(f"/release-plans/{run_id}/export?format=pdf", headers=headers)
+    assert second.status_code == 200
+    assert second.content == first.content
+
+
+def test_timeseries_arrow_and_parquet_round_trip():
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    from io import BytesIO
+    from uuid import uuid4
+
+    headers = _login()
+    entity_id = f"arrow-{uuid4()}"
+
+    exported = client.get("/exports/timeseries_points?format=arrow&metric=inflow", headers=headers)
+    assert exported.status_code == 200
+    table = ipc.open_stream(exported.content).read_all()
+    assert table.num_rows > 0
+    assert set(table.column("metric").to_pylist()) == {"inflow"}
+
+    parquet = client.get("/exports/sector_demands?format=parquet&sector=drinking", headers=headers)
+    assert parquet.status_code == 200
+    assert pq.read_table(BytesIO(parquet.content)).num_rows > 0
+
+    upload = pa.table(
+        {
+            "entity_type": ["hydrology", "hydrology"],
+            "entity_id": [entity_id, entity_id],
+            "metric": ["inflow", "inflow"],
+            "ts": pa.array([1_000_000, 2_000_000], type=pa.timestamp("s", tz="UTC")),
+            "value": [101.5, 99.25],
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, upload.schema) as writer:
+        writer.write_table(upload)
+    payload = sink.getvalue().to_pybytes()
+
+    first = client.post("/imports/timeseries_points", files={"file": ("points.arrows", payload)}, headers=headers)
+    assert first.status_code == 200
+    second = client.post("/imports/timeseries_points", files={"file": ("points.arrows", payload)}, headers=headers)
+    assert second.status_code == 200
+    assert first.json()["data"]["inserted"] == 2
+    assert second.json()["data"] == {**second.json()["data"], "inserted": 0, "skipped": 2}
+
+
+def test_read_layer_pages_match_filters_and_envelope():
+    headers = _login()
+
+    inflow = client.get("/timeseries?metric=inflow&page=1&page_size=250", headers=headers).json()
+    storage = client.get("/timeseries?metric=storage&page=2&page_size=5", headers=headers).json()
+    assert {row["metric"] for row in inflow["data"]} == {"inflow"}
+    assert {row["metric"] for row in storage["data"]} == {"storage"}
+    assert len(inflow["data"]) == 250
+    assert storage["pagination"]["page"] == 2 and len(storage["data"]) == 5
+    assert list(inflow["data"][0]) == ["id", "entity_type", "entity_id", "metric", "ts", "value", "quality_flag", "source"]
+
+    audit = client.get("/audit-logs?filter=auth.login&page_size=3", headers=headers).json()
+    assert audit["data"] and all(row["action"] == "auth.login" for row in audit["data"])
+
+    alerts = client.get("/alerts?page_size=5", headers=headers)
+    assert alerts.status_code == 200
+    assert "pagination" in alerts.json()
+
+
+def test_metrics_endpoint_exposes_pool_instrumentation():
+    client.get("/ready")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'db_pool_checkouts_total{engine="primary"}' in body
+    assert 'db_pool_checked_out{engine="primary"}' in body
+    assert "db_pool_checkout_wait_seconds_bucket" in body
+
+
+def test_metrics_endpoint_reports_route_latency_and_db_usage():
+    headers = _login()
+    client.get("/timeseries?metric=inflow&page=1&page_size=5", headers=headers)
+    client.post("/alerts/evaluate", headers=headers)
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/timeseries",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/timeseries",status="200"}' in body
+    queries = [
+        line for line in body.splitlines() if line.startswith('http_request_db_queries_sum{method="GET",route="/timeseries"}')
+    ]
+    assert queries and float(queries[0].split()[-1]) >= 2
+    assert 'http_request_db_rows_loaded_count{method="GET",route="/timeseries"}' in body
+    assert 'http_request_serialization_seconds_count{method="GET",route="/timeseries"}' in body
+    assert "alert_events_created_total" in body
+
+
+def test_query_profiler_flags_repeated_statement_shapes():
+    settings = get_settings()
+    headers = _login()
+    settings.sql_profile_enabled = True
+    try:
+        response = client.get("/roles?page=1&page_size=50", headers=headers)
+    finally:
+        settings.sql_profile_enabled = False
+
+    assert response.status_code == 200
+    profile = dict(part.split("=") for part in response.headers["X-Query-Profile"].split("; "))
+    assert int(profile["queries"]) > int(profile["distinct"])
+    assert int(profile["n_plus_one"]) >= 1
+    assert "X-Query-Profile" not in client.get("/health").headers
+
+
+def test_seed_marker_short_circuits_reseeding():
+    stats, token = begin_request_stats()
+    db = SessionLocal()
+    try:
+        ensure_seed_data(db)
+    finally:
+        db.close()
+        end_request_stats(token)
+    assert stats.queries == 1
+
+
+def test_static_reconcile_is_set_based_on_a_warm_database():
+    stats, token = begin_request_stats()
+    db = SessionLocal()
+    try:
+        role_ids = _ensure_permissions_roles(db)
+        _ensure_users(db, role_ids)
+        _ensure_static_entities(db)
+    finally:
+        db.close()
+        end_request_stats(token)
+    assert set(role_ids) == {"admin", "operator", "analyst", "viewer", "auditor"}
+    assert stats.queries <= 15
+
+
+def test_static_reconcile_backfills_columns_on_rows_seeded_earlier():
+    from sqlalchemy import update
+
+    from app.db.models import DownstreamNode, Reservoir
+
+    db = SessionLocal()
+    try:
+        db.execute(update(Reservoir).where(Reservoir.name == "Golestan Dam").values(code=None))
+        db.execute(update(DownstreamNode).where(DownstreamNode.name == "Industrial Hub").values(reservoir_id=None))
+        db.commit()
+        _ensure_static_entities(db)
+        golestan = db.query(Reservoir).filter(Reservoir.name == "Golestan Dam").one()
+        node = db.query(DownstreamNode).filter(DownstreamNode.name == "Industrial Hub").one()
+        assert golestan.code == "golestan" and node.reservoir_id == golestan.id
+    finally:
+        db.close()
+
+def test_cached_principal_and_refresh_token_revocation():
+    login = client.post("/auth/login", json={"username": "analyst", "password": "an123"}).json()["data"]
+    access_token, refresh_token = login["access_token"], login["refresh_token"]
+    assert client.get("/optimization/runs", headers={"Authorization": f"Bearer {access_token}"}).status_code == 200
+    assert principal_cache.get(access_token).username == "analyst"
+
+    revocations.invalidate_user(login["user"]["id"])
+    assert principal_cache.get(access_token) is None
+
+    assert client.post("/auth/logout", json={"refresh_token": refresh_token}).status_code == 200
+    assert revocations.is_revoked(hash_token(refresh_token))
+    refreshed = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert refreshed.status_code == 401
+
+    db = SessionLocal()
+    try:
+        assert purge_expired_refresh_tokens(db) >= 1
+        assert db.query(RefreshToken).filter(RefreshToken.token_hash == hash_token(refresh_token)).first() is None
+    finally:
+        db.close()
+
+
+def test_login_rehashes_passwords_made_with_old_argon2_parameters():
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == "auditor").first()
+        user.hashed_password = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__time_cost=1).hash("au123")
+        db.commit()
+    finally:
+        db.close()
+
+    _login("auditor", "au123")
+
+    db = SessionLocal()
+    try:
+        stored = db.query(User).filter(User.username == "auditor").first().hashed_password
+    finally:
+        db.close()
+    settings = get_settings()
+    assert f"m={settings.argon2_memory_cost_kib},t={settings.argon2_time_cost}" in stored
+    _login("auditor", "au123")
+
+
+class _MockLlmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests_seen += 1
+        self.server.last_body = body
+        if self.server.requests_seen <= self.server.failures:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if body.get("stream"):
+            chunks = [{"model": "mock/llm", "choices": [{"delta": {"content": token}}]} for token in ("رهاسازی ", "۱۲۰")]
+            payload = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            content_type = "text/event-stream"
+        else:
+            payload = json.dumps({"model": "mock/llm", "choices": [{"message": {"content": "رهاسازی ۱۲۰"}}]})
+            content_type = "application/json"
+        encoded = payload.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+class _MockLlmServer(ThreadingHTTPServer):
+    # OpenAI-compatible chat completions; the first `failures` requests get a 503.
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _MockLlmHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}/v1"
+        self.failures = 0
+        self.requests_seen = 0
+        self.last_body = None
+
+
+@pytest.fixture
+def mock_llm():
+    server = _MockLlmServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_chatbot_uses_pooled_gateway_with_retry_and_streams_sse(mock_llm, monkeypatch):
+    mock_llm.failures = 1
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "openrouter_retry_backoff_seconds", 0.01)
+    headers = _login()
+    question = {"message": "رهاسازی سد گلستان در سناریوی خشکسالی؟"}
+    answer = client.post("/chatbot/message", json=question, headers=headers)
+    streamed_question = {"message": "سناریوی سیلاب برای مخزن سد گلستان"}
+    with client.stream("POST", "/chatbot/message/stream", json=streamed_question, headers=headers) as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        events = [line.split(": ", 1)[1] for line in stream.iter_lines() if line.startswith("event: ")]
+
+    assert mock_llm.requests_seen == 3
+    assert answer.json()["data"] == {"answer": "رهاسازی ۱۲۰", "in_scope": True, "provider": "llm_gateway", "model": "mock/llm"}
+    assert events == ["meta", "token", "token", "done"]
+
+
+def _next_day() -> str:
+    from datetime import timedelta
+
+    from sqlalchemy import func
+
+    from app.db.models import TimeseriesPoint
+
+    db = SessionLocal()
+    try:
+        latest = db.query(func.max(TimeseriesPoint.ts)).scalar()
+    finally:
+        db.close()
+    return f"{(latest.replace(tzinfo=None) + timedelta(days=1)).isoformat()}Z"
+
+
+def test_chatbot_reuses_cached_answers_until_the_data_watermark_moves(mock_llm, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "chat_cache_similarity_threshold", 0.8)
+    monkeypatch.setattr(settings, "chat_cache_watermark_seconds", 0)
+    headers = _login()
+    ask = lambda message: client.post("/chatbot/message", json={"message": message}, headers=headers).json()["data"]
+    first = ask("حجم فعلی مخزن سد گلستان چقدر است؟")
+    exact = ask("حجم  فعلی مخزن سد گلستان چقدر است")
+    similar = ask("حجم فعلی مخزن سد گلستان چقدر است لطفا؟")
+    seen_before_new_data = mock_llm.requests_seen
+
+    # A point after the newest one moves the watermark on every run, even against a reused database.
+    point = {"entity_type": "hydrology", "entity_id": "golestan", "metric": "inflow", "ts": _next_day(), "value": 1.0}
+    client.post("/timeseries/bulk", json={"points": [point]}, headers=headers)
+    after_new_data = ask("حجم فعلی مخزن سد گلستان چقدر است؟")
+
+    assert "cached" not in first
+    assert exact["cached"] == "exact" and exact["answer"] == first["answer"]
+    assert similar["cached"] == "similar"
+    assert seen_before_new_data == 1
+    assert "cached" not in after_new_data
+    assert mock_llm.requests_seen == 2
+
+
+def test_chatbot_cache_is_invalidated_by_back_filled_points(mock_llm, monkeypatch):
+    from uuid import uuid4
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "chat_cache_watermark_seconds", 0)
+    context_store.refresh()
+    headers = _login()
+    question = {"message": "دبی ورودی سد گلستان"}
+    ask = lambda: client.post("/chatbot/message", json=question, headers=headers).json()["data"]
+    ask()
+    assert ask()["cached"] == "exact"
+
+    # Far older than the newest stored point, so only the point count can tell the data changed.
+    point = {
+        "entity_type": "hydrology",
+        "entity_id": f"backfill-{uuid4().hex[:8]}",
+        "metric": "inflow",
+        "ts": "2001-01-01T00:00:00Z",
+        "value": 1.0,
+    }
+    client.post("/timeseries/bulk", json={"points": [point]}, headers=headers)
+    assert "cached" not in ask()
+
+
+def test_chatbot_answers_without_the_cache_when_the_watermark_query_fails(mock_llm, monkeypatch):
+    from app.services import chat_cache
+
+    async def unavailable(db):
+        raise RuntimeError("read replica down")
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "chat_cache_watermark_seconds", 0)
+    monkeypatch.setattr(chat_cache, "adata_watermark", unavailable)
+    headers = _login()
+    ask = lambda: client.post("/chatbot/message", json={"message": "تراز فعلی مخزن سد گلستان"}, headers=headers)
+    first, second = ask(), ask()
+
+    assert first.status_code == second.status_code == 200
+    assert "cached" not in second.json()["data"]
+    assert mock_llm.requests_seen == 2
+
+
+def test_chatbot_scope_guard_normalizes_persian_variants():
+    from app.utils.text import KeywordMatcher, normalize_text
+
+    matcher = KeywordMatcher(["پیش‌بینی", "سد", "reservoir"])
+    assert matcher.find_all(normalize_text("پيش‌بيني RESERVOIR")) == ["پیش بینی", "reservoir"]
+    assert not matcher.contains_any(normalize_text("هوای امروز"))
+
+    headers = _login()
+    ask = lambda message: client.post("/chatbot/message", json={"message": message}, headers=headers).json()["data"]
+    assert ask("وضعيت ذخيره مخزن چطور است؟")["in_scope"] is True
+    assert ask("امروز فوتبال کي برد؟")["in_scope"] is False
+    assert ask("اين سامانه را كي ساخت؟")["model"] == "ownership-policy"
+
+
+def test_chatbot_prompt_carries_budgeted_live_data_context(mock_llm, monkeypatch):
+    snapshot = context_store.refresh()
+    tight = snapshot.render("هشدارهای بحران", 40)
+    assert tight.startswith("هشدار باز") and len(tight) // 3 + 1 <= 40
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    headers = _login()
+    client.post("/chatbot/message", json={"message": "تراز مخزن سد در این هفته"}, headers=headers)
+
+    context = mock_llm.last_body["messages"][1]
+    assert context["role"] == "system"
+    assert context["content"].splitlines()[1].startswith("آخرین مقادیر reservoir/golestan")
+
+
+def test_chatbot_does_not_cache_an_answer_built_from_the_previous_snapshot(mock_llm, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openrouter_api_key", "mock")
+    monkeypatch.setattr(settings, "openrouter_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "chat_cache_watermark_seconds", 0)
+    context_store.refresh()
+    headers = _login()
+    point = {"entity_type": "reservoir", "entity_id": "golestan", "metric": "storage", "ts": _next_day(), "value": 1.0}
+    client.post("/timeseries/bulk", json={"points": [point]}, headers=headers)
+    ask = lambda: client.post("/chatbot/message", json={"message": "حجم مخزن سد گلستان امروز"}, headers=headers).json()["data"]
+
+    stale = ask()
+    with context_store._refreshing:
+        pass
+    fresh, repeated = ask(), ask()
+
+    assert "cached" not in stale and "cached" not in fresh
+    assert repeated["cached"] == "exact"
+    assert mock_llm.requests_seen == 2
+
+
+def test_local_llm_backend_batches_coalesces_and_serves_explanations(mock_llm, monkeypatch):
+    import asyncio
+
+    from app.services.llm_backends import LlmBusy, LlmRequest, LocalBackend
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_backend", "local")
+    monkeypatch.setattr(settings, "local_llm_base_url", mock_llm.base_url)
+    monkeypatch.setattr(settings, "local_llm_queue_max", 3)
+    backend = LocalBackend()
+    ask = lambda text: backend.complete(LlmRequest(messages=[{"role": "user", "content": text}]))
+
+    async def burst():
+        answers = await asyncio.gather(*(ask("same") for _ in range(5)), ask("other"))
+        overflow = await asyncio.gather(*(ask(str(i)) for i in range(4)), return_exceptions=True)
+        await backend.close()
+        return answers, overflow
+
+    answers, overflow = asyncio.run(burst())
+    headers = _login()
+    # A new run, so its explanation is generated (in the background task) rather than found from earlier sessions.
+    body = {"name": "local llm", "horizon_days": 3, "scenario": "normal", "weights": {}, "constraints": {}}
+    run_id = client.post("/optimization/run", json=body, headers=headers).json()["data"]["id"]
+    explained = client.post("/llm/explain", json={"run_id": run_id}, headers=headers).json()["data"]
+
+    assert {answer.text for answer in answers} == {"رهاسازی ۱۲۰"}
+    assert [isinstance(result, LlmBusy) for result in overflow] == [False, False, False, True]
+    assert mock_llm.requests_seen == 2 + 3 + 1
+    assert explained["provider"] == "local_llm" and explained["explanation"] == "رهاسازی ۱۲۰"
+
+
+def test_local_llm_backend_closes_the_client_of_a_finished_loop(mock_llm, monkeypatch):
+    import asyncio
+
+    from app.services.llm_backends import LlmRequest, LocalBackend
+
+    monkeypatch.setattr(get_settings(), "local_llm_base_url", mock_llm.base_url)
+    backend = LocalBackend()
+    request = LlmRequest(messages=[{"role": "user", "content": "loop"}])
+
+    async def ask():
+        await backend.complete(request)
+        return backend._client
+
+    first = asyncio.run(ask())
+
+    async def ask_and_settle():
+        client = await ask()
+        await asyncio.gather(*backend._retiring)
+        await backend.close()
+        return client
+
+    second = asyncio.run(ask_and_settle())
+    assert first is not second and first.is_closed and second.is_closed
+
+
+def test_explanations_are_precomputed_per_run_and_served_from_storage():
+    headers = _login()
+    run = client.post(
+        "/optimization/run",
+        json={"name": "explained run", "horizon_days": 7, "scenario": "dry", "weights": {}, "constraints": {}},
+        headers=headers,
+    ).json()["data"]
+
+    def stored() -> int:
+        db = SessionLocal()
+        try:
+            return db.query(RunExplanation).filter(RunExplanation.run_id == run["id"]).count()
+        finally:
+            db.close()
+
+    assert stored() == 1
+    explain = lambda context: client.post("/llm/explain", json={"run_id": run["id"], "context": context}, headers=headers)
+    first, again = explain({}), explain({"scenario": "dry"})
+    assert first.json()["data"] == again.json()["data"] and stored() == 1
+
+    override = explain({"drought_risk": 0.9}).json()["data"]
+    assert stored() == 2
+    assert any("خشکسالی" in warning for warning in override["warnings"])
+
+
+def test_mpc_optimization_uses_forecast_inflow_and_warm_starts():
+    from app.db.models import OptimizationRun
+
+    # The first run below must be a cold start, so drop dry-scenario MPC runs left by earlier test sessions.
+    db = SessionLocal()
+    try:
+        for previous in db.query(OptimizationRun).all():
+            if (previous.params or {}).get("mode") == "mpc" and (previous.params or {}).get("scenario") == "dry":
+                db.delete(previous)
+        db.commit()
+    finally:
+        db.close()
+
+    headers = _login()
+    body = {"name": "mpc", "horizon_days": 21, "scenario": "dry", "mode": "mpc", "weights": {}, "constraints": {}}
+    first = client.post("/optimization/run", json=body, headers=headers).json()["data"]
+    second = client.post("/optimization/run", json=body, headers=headers).json()["data"]
+
+    solver = first["summary"]["solver"]
+    assert solver["converged"] and not solver["warm_started"]
+    assert solver["inflow_source"].startswith("forecast:")
+    assert second["summary"]["solver"]["warm_started"]
+    assert second["summary"]["solver"]["iterations"] <= solver["iterations"]
+    assert first["summary"]["baseline"]["method"] == "traditional_rule_curve"
+
+    rows = client.get(f"/release-plans/{first['id']}", headers=headers).json()["data"]["rows"]
+    assert len(rows) == 21
+    assert all(40 - 1e-6 <= row["release_value"] <= 260 + 1e-6 for row in rows)
+    # Like the rule planner, the release floor wins over the storage floor when inflow cannot cover both.
+    assert all(row["storage_projection"] >= 280 - 1e-3 or row["release_value"] <= 40 + 1e-6 for row in rows)
+    assert all(row["sector_allocations"]["environment"] >= 22 - 1e-3 for row in rows)
+
+
+def test_network_optimization_solves_cascades_per_node():
+    from uuid import uuid4
+
+    from app.db.models import DownstreamNode, Reservoir, SafetyConstraint
+
+    suffix = uuid4().hex[:8]
+    upper_node, lone_node = f"Upper Test Canal {suffix}", f"Lone Test Intake {suffix}"
+    db = SessionLocal()
+    try:
+        golestan = db.query(Reservoir).filter(Reservoir.name == "Golestan Dam").one()
+        upper = Reservoir(
+            name=f"Upper Test Dam {suffix}",
+            code=f"upper-{suffix}",
+            storage_capacity=300.0,
+            downstream_reservoir_id=golestan.id,
+        )
+        lone = Reservoir(name=f"Lone Test Dam {suffix}", code=f"lone-{suffix}", storage_capacity=200.0)
+        db.add_all([upper, lone])
+        db.flush()
+        db.add_all(
+            [
+                SafetyConstraint(reservoir_id=upper.id, min_level=100.0, max_level=128.0, max_release=90.0),
+                DownstreamNode(name=upper_node, node_type="agriculture", priority=4, reservoir_id=upper.id, demand=15.0),
+                DownstreamNode(name=lone_node, node_type="drinking", priority=1, reservoir_id=lone.id, demand=5.0),
+            ]
+        )
+        db.commit()
+        ids = {"golestan": golestan.id, "upper": upper.id, "lone": lone.id}
+    finally:
+        db.close()
+
+    try:
+        headers = _login()
+        body = {"name": "network", "horizon_days": 10, "scenario": "normal", "mode": "network", "weights": {}, "constraints": {}}
+        run = client.post("/optimization/run", json=body, headers=headers).json()["data"]
+        network = run["summary"]["network"]
+        assert network["reservoirs"] == 3 and network["subnetworks"] == 2
+        # No series of its own: no local inflow, and it starts half full, which covers ten days of its intake.
+        assert network["satisfaction_by_node"][lone_node] == 1.0
+        assert set(run["summary"]["satisfaction_by_sector"]) == {"drinking", "environment", "industry", "agriculture"}
+
+        rows = client.get(f"/release-plans/{run['id']}", headers=headers).json()["data"]["rows"]
+        assert len(rows) == 30
+        upper_rows = [row for row in rows if row["reservoir_id"] == ids["upper"]]
+        assert all(row["release_value"] <= 90.0 + 1e-6 for row in upper_rows)
+        assert all(set(row["node_allocations"]) == {upper_node} for row in upper_rows)
+        golestan_rows = [row for row in rows if row["reservoir_id"] == ids["golestan"]]
+        assert all(row["node_allocations"]["Environmental Reach-1"] >= 22 - 1e-3 for row in golestan_rows)
+
+        csv_lines = client.get(f"/release-plans/{run['id']}/export?format=csv", headers=headers).text.splitlines()
+        assert csv_lines[0].startswith("ts,reservoir,release_value")
+        assert len({tuple(line.split(",")[:2]) for line in csv_lines[1:]}) == 30
+        assert sum(line.split(",")[1] == f"Upper Test Dam {suffix}" for line in csv_lines[1:]) == 10
+        pdf = client.get(f"/release-plans/{run['id']}/export?format=pdf", headers=headers)
+        assert pdf.status_code == 200 and pdf.content.startswith(b"%PDF")
+
+        import pyarrow.ipc as ipc
+
+        exported = client.get(f"/exports/release_plans?format=arrow&run_id={run['id']}", headers=headers).content
+        table = ipc.open_stream(exported).read_all()
+        assert set(table.column("reservoir_id").to_pylist()) == set(ids.values())
+        exported_rows = table.to_pylist()
+        upper_allocations = [dict(row["node_allocations"]) for row in exported_rows if row["reservoir_id"] == ids["upper"]]
+        assert [set(allocations) for allocations in upper_allocations] == [{upper_node}] * 10
+
+        imported = client.post("/imports/release_plans", files={"file": ("plan.arrows", exported)}, headers=headers)
+        assert imported.json()["data"]["inserted"] == 30
+        rows = client.get(f"/release-plans/{run['id']}", headers=headers).json()["data"]["rows"]
+        copies = [row for row in rows if row["reservoir_id"] == ids["upper"]]
+        assert len(copies) == 20 and all(set(row["node_allocations"]) == {upper_node} for row in copies)
+    finally:
+        db = SessionLocal()
+        try:
+            test_reservoirs = [ids["upper"], ids["lone"]]
+            db.query(DownstreamNode).filter(DownstreamNode.reservoir_id.in_(test_reservoirs)).delete()
+            db.query(SafetyConstraint).filter(SafetyConstraint.reservoir_id.in_(test_reservoirs)).delete()
+            db.query(Reservoir).filter(Reservoir.id.in_(test_reservoirs)).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+def test_network_optimization_rejects_cyclic_downstream_links():
+    from uuid import uuid4
+
+    from app.db.models import Reservoir
+
+    suffix = uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        first = Reservoir(name=f"Cycle Test Dam A {suffix}", code=f"cycle-a-{suffix}", storage_capacity=100.0)
+        second = Reservoir(name=f"Cycle Test Dam B {suffix}", code=f"cycle-b-{suffix}", storage_capacity=100.0)
+        db.add_all([first, second])
+        db.flush()
+        first.downstream_reservoir_id, second.downstream_reservoir_id = second.id, first.id
+        db.commit()
+        ids = [first.id, second.id]
+    finally:
+        db.close()
+
+    try:
+        headers = _login()
+        body = {"name": "cyclic", "horizon_days": 5, "scenario": "normal", "mode": "network", "weights": {}, "constraints": {}}
+        response = client.post("/optimization/run", json=body, headers=headers)
+        assert response.status_code == 422
+        error = response.json()["error"]
+        assert error["code"] == "invalid_network"
+        assert f"Cycle Test Dam A {suffix}" in error["message"] and f"Cycle Test Dam B {suffix}" in error["message"]
+    finally:
+        db = SessionLocal()
+        try:
+            db.query(Reservoir).filter(Reservoir.id.in_(ids)).update({"downstream_reservoir_id": None})
+            db.query(Reservoir).filter(Reservoir.id.in_(ids)).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+def test_schema_upgrade_adds_new_columns_to_existing_tables(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+
+    from app.db.init_db import upgrade_schema
+
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE reservoirs (id VARCHAR(36) PRIMARY KEY, name VARCHAR(128))"))
+        conn.execute(text("INSERT INTO reservoirs (id, name) VALUES ('r1', 'Old Dam')"))
+    upgrade_schema(legacy)
+    upgrade_schema(legacy)
+
+    inspector = inspect(legacy)
+    columns = {column["name"] for column in inspector.get_columns("reservoirs")}
+    assert {"code", "downstream_reservoir_id", "storage_capacity"} <= columns
+    assert "ix_reservoirs_code" in {index["name"] for index in inspector.get_indexes("reservoirs")}
+    with legacy.connect() as conn:
+        assert conn.execute(text("SELECT name, code FROM reservoirs")).all() == [("Old Dam", None)]
+
+
+def test_schema_upgrade_adds_forecast_state_and_metric_index_to_existing_tables(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+
+    from app.db.init_db import upgrade_schema
+
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE forecast_runs (id VARCHAR(36) PRIMARY KEY, entity VARCHAR(32))"))
+        conn.execute(text("INSERT INTO forecast_runs (id, entity) VALUES ('f1', 'inflow')"))
+        conn.execute(text("CREATE TABLE timeseries_points (id VARCHAR(36) PRIMARY KEY, metric TEXT, ts DATETIME)"))
+    upgrade_schema(legacy)
+
+    inspector = inspect(legacy)
+    assert "state" in {column["name"] for column in inspector.get_columns("forecast_runs")}
+    assert "ix_ts_metric_ts" in {index["name"] for index in inspector.get_indexes("timeseries_points")}
+    # A run from before the change has no state, so the next refresh of its entity rebuilds from the full history.
+    with legacy.connect() as conn:
+        assert conn.execute(text("SELECT state FROM forecast_runs")).all() == [(None,)]
+
+
+def test_seasonal_safety_constraints_cap_release_and_refresh_on_edit():
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import text
+
+    from app.db.models import Reservoir, SafetyConstraint
+    from app.services.constraints import SEASON_MONTHS
+
+    def season_of(month: int) -> str:
+        return next(name for name, months in SEASON_MONTHS.items() if name != "all" and month in months)
+
+    season = season_of((datetime.now(timezone.utc) + timedelta(days=1)).month)
+    db = SessionLocal()
+    try:
+        golestan = db.query(Reservoir).filter(Reservoir.name == "Golestan Dam").one()
+        seasonal = SafetyConstraint(reservoir_id=golestan.id, min_level=97.0, max_level=128.0, max_release=150.0, season=season)
+        db.add(seasonal)
+        db.commit()
+        seasonal_id = seasonal.id
+    finally:
+        db.close()
+
+    headers = _login()
+    body = {"name": "seasonal", "horizon_days": 3, "scenario": "dry", "weights": {}, "constraints": {}}
+
+    def in_season_releases() -> list:
+        run = client.post("/optimization/run", json=body, headers=headers).json()["data"]
+        rows = client.get(f"/release-plans/{run['id']}", headers=headers).json()["data"]["rows"]
+        return [row["release_value"] for row in rows if season_of(int(row["ts"][5:7])) == season]
+
+    releases = in_season_releases()
+    assert releases and max(releases) <= 150.0 + 1e-6
+
+    db = SessionLocal()
+    try:
+        # A plain SQL edit (as from another worker or a console) reaches the next plan without any invalidation.
+        db.execute(text("UPDATE safety_constraints SET max_release = 120 WHERE id = :id"), {"id": seasonal_id})
+        db.commit()
+        assert max(in_season_releases()) <= 120.0 + 1e-6
+    finally:
+        db.query(SafetyConstraint).filter(SafetyConstraint.id == seasonal_id).delete()
+        db.commit()
+        db.close()
+
+
+def test_forecast_refresh_continues_from_stored_state():
+    from datetime import timedelta
+
+    from sqlalchemy import func
+
+    from app.db.models import ForecastRun, TimeseriesPoint
+
+    headers = _login()
+    forecast = lambda: client.post(
+        "/forecast/run", json={"entity": "inflow", "horizon_days": 7, "scenario": "normal"}, headers=headers
+    ).json()["data"]
+
+    def state(run_id: str) -> dict:
+        db = SessionLocal()
+        try:
+            return db.query(ForecastRun).filter(ForecastRun.id == run_id).one().state
+        finally:
+            db.close()
+
+    before = forecast()
+    db = SessionLocal()
+    try:
+        latest = db.query(func.max(TimeseriesPoint.ts)).filter(TimeseriesPoint.metric == "inflow").scalar()
+    finally:
+        db.close()
+    days = [latest.replace(tzinfo=None) + timedelta(days=offset) for offset in (1, 2)]
+    points = [
+        {"entity_type": "hydrology", "entity_id": "golestan", "metric": "inflow", "ts": f"{day.isoformat()}Z", "value": value}
+        for day, value in zip(days, (140.0, 150.0))
+    ]
+    client.post("/timeseries/bulk", json={"points": points}, headers=headers)
+    after = forecast()
+    assert after["data_window_end"].startswith(days[-1].isoformat())
+    assert state(after["id"])["count"] == state(before["id"])["count"] + 2
+    assert state(after["id"])["window"][-2:] == [140.0, 150.0]
+
+    # A full rebuild over the whole history lands on the same state and metrics.
+    rebuilt = client.post("/forecast/train", json={"entity": "inflow"}, headers=headers).json()["data"]
+    assert rebuilt["metrics"] == after["metrics"]
+    assert state(rebuilt["id"])["window"] == state(after["id"])["window"]